@@ -0,0 +1,109 @@
+"""Time self-collision checks: one interactive check per joint move, then a batch of configurations.
+
+The interactive part moves one joint and re-checks, as the viewer does on a slider drag;
+the batch part checks random joint vectors with CollisionChecker.check_configurations.
+--verify N first checks N random sphere/box/cylinder pairs per shape kind: GJK and
+gjk_intersect must agree with the exact sphere distance test (exit code 1 otherwise).
+
+    python benchmarks/bench_collision.py --links 1000 --configs 2000
+    python benchmarks/bench_collision.py --model robot.urdf --configs 10000
+    python benchmarks/bench_collision.py --verify 20000 --configs 0
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import Joint, Link, URDFModel
+from urdf_collision import BOX, CYLINDER, SPHERE, CollisionChecker, _gjk, gjk_intersect, sphere_overlap
+from urdf_kinematics import KinematicTree, joint_range, movable_joints, transforms
+
+
+def build_model(n_links, branches):
+    """Base link with `branches` serial arms of alternating box/cylinder/sphere collision shapes."""
+    model = URDFModel()
+    model.add_link(Link('base', 'box', (0.4, 0.4, 0.1), include_collision=True))
+    per = max(1, (n_links - 1) // branches)
+    for b in range(branches):
+        parent = 'base'
+        for k in range(per):
+            name = f"b{b}_l{k}"
+            model.add_link(Link(name, ('box', 'cylinder', 'sphere')[k % 3], (0.04, 0.04, 0.12),
+                                origin=(0.0, 0.0, 0.06), include_collision=True))
+            model.add_joint(Joint(f"b{b}_j{k}", 'revolute', parent, name, origin_xyz=(0.0, 0.0, 0.12) if k else
+                                  (0.15 * np.cos(2 * np.pi * b / branches), 0.15 * np.sin(2 * np.pi * b / branches), 0.05),
+                                  axis=(0.0, 1.0, 0.0) if k % 2 else (1.0, 0.0, 0.0), limit=(-0.3, 0.3)))
+            parent = name
+    return model
+
+def verify(count, rng):
+    """Random sphere-vs-shape pairs decided by GJK and gjk_intersect against sphere_overlap -> mismatches."""
+    def poses():
+        return transforms(rng.random((count, 3)), rng.uniform(-np.pi, np.pi, (count, 3)))
+    mismatches = 0
+    for kind, label in ((SPHERE, 'sphere'), (BOX, 'box'), (CYLINDER, 'cylinder')):
+        pa = poses(); pb = poses()
+        ra = rng.uniform(0.01, 0.5, count); half = rng.uniform(0.01, 0.4, (count, 3))
+        if kind == SPHERE: half[:] = half[:, :1]
+        if kind == CYLINDER: half[:, 1] = half[:, 0]
+        kinds_a = np.full(count, SPHERE); kinds_b = np.full(count, kind); half_a = np.repeat(ra[:, None], 3, axis=1)
+        exact = sphere_overlap(pa[:, :3, 3], ra, kinds_b, pb, half)
+        # pairs within rounding of touching may go either way
+        grown = sphere_overlap(pa[:, :3, 3], ra + 1e-9, kinds_b, pb, half)
+        shrunk = sphere_overlap(pa[:, :3, 3], ra - 1e-9, kinds_b, pb, half)
+        clear = grown == shrunk
+        for name, got in (('gjk', _gjk(kinds_a, pa, half_a, kinds_b, pb, half)),
+                          ('gjk_intersect', gjk_intersect(kinds_a, pa, half_a, kinds_b, pb, half))):
+            bad = int(((got != exact) & clear).sum())
+            print(f"verify sphere-{label:<9} {name:<14} {count} pairs, {int(exact.sum())} overlapping, {bad} mismatches")
+            mismatches += bad
+    return mismatches
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--links', type=int, default=1000)
+    ap.add_argument('--branches', type=int, default=8)
+    ap.add_argument('--moves', type=int, default=200, help="single-joint moves for the interactive timing")
+    ap.add_argument('--configs', type=int, default=2000, help="random configurations for the batch timing")
+    ap.add_argument('--model', help="URDF file to use instead of the generated arms")
+    ap.add_argument('--verify', type=int, default=0, metavar='N', help="first check N random pairs per shape kind against exact tests")
+    args = ap.parse_args(argv)
+    if args.verify and verify(args.verify, np.random.default_rng(1)): return 1
+
+    if args.model:
+        model = URDFModel(); model.load_from_file(args.model)
+    else:
+        model = build_model(args.links, args.branches)
+    tree = KinematicTree(model)
+    checker = CollisionChecker(model, tree)
+    joints = movable_joints(model)
+    names = [j.name for j in joints]
+    lo, hi = np.array([joint_range(j) for j in joints]).reshape(-1, 2).T
+    rng = np.random.default_rng(0)
+
+    t0 = time.perf_counter(); pairs = checker.check(); first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(args.moves):
+        if names:
+            i = int(rng.integers(len(names)))
+            tree.set_joint_position(names[i], rng.uniform(lo[i], hi[i]))
+        checker.check()
+    move = (time.perf_counter() - t0) / max(1, args.moves)
+
+    values = rng.uniform(lo, hi, (args.configs, len(names)))
+    t0 = time.perf_counter(); hits = checker.check_configurations(names, values); batch = time.perf_counter() - t0
+
+    print(f"links={len(model.links)} shapes={len(checker.names)} joints={len(names)}")
+    print(f"first check:  {first * 1000:.1f} ms ({len(pairs)} colliding pairs)")
+    print(f"joint move:   {move * 1000:.2f} ms per check  ->  {1.0 / move:.0f} checks/s")
+    print(f"batch:        {args.configs} configurations in {batch:.3f} s  ->  {args.configs / batch:.0f} configs/s, "
+          f"{int(hits.sum())} in collision")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
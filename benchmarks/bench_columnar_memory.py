@@ -0,0 +1,80 @@
+"""Measure the memory a URDFModel and a ColumnarURDFModel hold for the same serial chain.
+
+Each variant is built with tracemalloc running; what is still allocated once only the
+finished model is left (temporary Link/Joint objects and source models deleted, garbage
+collected) counts as its size. The chain has no inertia dicts, so the object model
+pays for its Link/Joint objects and tuples only. Three ways of building it:
+
+    add       model.add_link / add_joint, one element at a time
+    convert   URDFModel built first, then ColumnarURDFModel.from_model (source dropped)
+    parse     load_from_urdf_string on the exported URDF text
+
+    python benchmarks/bench_columnar_memory.py --links 20000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import Joint, Link, URDFModel
+from urdf_columnar import ColumnarURDFModel
+
+
+def build(model, n):
+    for i in range(n):
+        model.add_link(Link(f"l{i}", ('box', 'cylinder', 'sphere')[i % 3], (0.05, 0.05, 0.2), 1.0, origin=(0.0, 0.0, 0.1)))
+        if i:
+            model.add_joint(Joint(f"j{i}", 'revolute', f"l{i-1}", f"l{i}", origin_xyz=(0.0, 0.0, 0.2),
+                                  axis=(0.0, 1.0, 0.0), limit=(-1.5, 1.5)))
+    return model
+
+def convert(n):
+    src = build(URDFModel(), n)
+    model = ColumnarURDFModel.from_model(src)
+    del src
+    return model
+
+def parse(cls, text):
+    model = cls(); model.load_from_urdf_string(text)
+    return model
+
+def retained(make):
+    """Bytes still allocated by make() once it returned and garbage was collected (the model kept)."""
+    gc.collect()
+    tracemalloc.start()
+    model = make()
+    model._fragments = {}       # the XML fragment cache is not part of the model's data
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, len(model.links) + len(model.joints)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--links', type=int, default=20000)
+    args = ap.parse_args(argv)
+    n = args.links
+    text = build(URDFModel(), n).to_urdf_string()
+
+    rows = [('URDFModel', 'add', lambda: build(URDFModel(), n)),
+            ('ColumnarURDFModel', 'add', lambda: build(ColumnarURDFModel(), n)),
+            ('ColumnarURDFModel', 'convert', lambda: convert(n)),
+            ('URDFModel', 'parse', lambda: parse(URDFModel, text)),
+            ('ColumnarURDFModel', 'parse', lambda: parse(ColumnarURDFModel, text))]
+    base = {}
+    print(f"links={n} joints={n - 1} (bytes retained per link/joint, tracemalloc)")
+    for cls, how, make in rows:
+        size, count = retained(make)
+        per = size / count
+        if cls == 'URDFModel': base[how] = per
+        ref = 'add' if how == 'convert' else how
+        note = '' if cls == 'URDFModel' else f"  ({per / base[ref]:.2f}x URDFModel {ref})"
+        print(f"{cls:<18} {how:<8} {size / 1e6:8.1f} MB  {per:7.0f} B/element{note}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
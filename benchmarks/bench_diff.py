@@ -0,0 +1,77 @@
+"""Time the structural diff and three-way merge of large generated models.
+
+A random tree is edited twice: "ours" changes masses, renames links and moves subtrees
+to other parents, "theirs" changes sizes and removes leaves. The diff compares base and
+ours; the merge combines both edits on top of base.
+
+    python benchmarks/bench_diff.py --links 5000
+    python benchmarks/bench_diff.py --links 50000
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import Joint, Link, URDFModel
+from urdf_diff import diff_models, merge_models
+
+
+def build(n, rng):
+    model = URDFModel(); model.links['l0'] = Link('l0')
+    for i in range(1, n):
+        model.links[f'l{i}'] = Link(f'l{i}', rng.choice(['box', 'cylinder', 'sphere']), (0.1, 0.1, 0.1 + 0.001 * (i % 50)))
+        model.joints[f'j{i}'] = Joint(f'j{i}', 'revolute', f'l{rng.randrange(max(0, i - 20), i)}', f'l{i}',
+                                      origin_xyz=(0, 0, 0.1), limit=(-1, 1))
+    return model
+
+def clone(model):
+    c = URDFModel()
+    c.links = {n: copy.copy(l) for n, l in model.links.items()}
+    c.joints = {n: copy.copy(j) for n, j in model.joints.items()}
+    return c
+
+def edit_ours(model, rng, edits):
+    names = list(model.links)[1:]
+    for n in rng.sample(names, edits): model.links[n].mass = rng.random()
+    renamed = {n: n + '_r' for n in rng.sample(names, edits // 2)}
+    model.links = {renamed.get(n, n): l for n, l in model.links.items()}
+    for n, l in model.links.items(): l.name = n
+    for j in model.joints.values(): j.parent = renamed.get(j.parent, j.parent); j.child = renamed.get(j.child, j.child)
+    for n in rng.sample(list(model.joints), edits // 5): model.joints[n].parent = 'l0'
+
+def edit_theirs(model, rng, edits):
+    for n in rng.sample(list(model.links)[1:], edits): model.links[n].size = (0.2, 0.2, 0.2)
+    children = {j.parent for j in model.joints.values()}
+    for n in rng.sample(sorted(set(model.links) - children), edits // 10):
+        del model.links[n]
+        for jn in [jn for jn, j in model.joints.items() if j.child == n]: del model.joints[jn]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--links', type=int, default=5000)
+    ap.add_argument('--edits', type=int, default=500, help="links edited on each side")
+    args = ap.parse_args(argv)
+    rng = random.Random(0)
+    base = build(args.links, rng)
+    ours = clone(base); edit_ours(ours, rng, args.edits)
+    theirs = clone(base); edit_theirs(theirs, rng, args.edits)
+
+    t0 = time.perf_counter()
+    diff = diff_models(base, ours)
+    diff_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    result = merge_models(base, ours, theirs)
+    merge_time = time.perf_counter() - t0
+
+    print(f"links={args.links} edits={args.edits}")
+    print(f"diff:   {diff_time * 1000:.0f} ms  ({diff.summary()})")
+    print(f"merge:  {merge_time * 1000:.0f} ms  ({len(result.model.links)} links, {len(result.conflicts)} conflicts)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
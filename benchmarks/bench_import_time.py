@@ -0,0 +1,55 @@
+"""Check that importing the model layer stays fast and GUI-free.
+
+Each module is imported in a fresh interpreter several times; the median import time
+must stay under the budget and none of the GUI/GL/array stacks may be loaded.
+
+    python benchmarks/bench_import_time.py --budget-ms 50 --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['urdf_model', 'urdf_builder_gui', 'urdf_batch']
+FORBIDDEN = ['PyQt5', 'OpenGL', 'numpy']
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+{module}.URDFModel
+dt = time.perf_counter() - t
+print(json.dumps({{'seconds': dt, 'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, runs):
+    times = []; loaded = set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(module=module, forbidden=FORBIDDEN)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        r = json.loads(out)
+        times.append(r['seconds']); loaded.update(r['loaded'])
+    return statistics.median(times), sorted(loaded)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--budget-ms', type=float, default=50.0)
+    ap.add_argument('--runs', type=int, default=7)
+    args = ap.parse_args(argv)
+    failed = False
+    for module in MODULES:
+        median, loaded = measure(module, args.runs)
+        ok = median * 1000 <= args.budget_ms and not loaded
+        failed |= not ok
+        extra = f"  pulled in: {', '.join(loaded)}" if loaded else ""
+        print(f"{module:18s} {median * 1000:7.2f} ms  (budget {args.budget_ms:.0f} ms)  {'OK' if ok else 'FAIL'}{extra}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Replay a joint trajectory through forward kinematics headlessly and report the frame rate.
+
+Each frame does what the viewer does on a playback tick: set every joint value,
+recompute the dirty subtrees and fetch the world poses of all link visuals.
+
+    python benchmarks/bench_joint_playback.py --joints 100 --frames 10000
+    python benchmarks/bench_joint_playback.py --csv my_trajectory.csv --model robot.urdf
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import Joint, Link, URDFModel
+from urdf_kinematics import KinematicTree, TrajectoryPlayer, load_trajectory_csv, movable_joints
+
+
+def build_model(n_joints, branches):
+    """Base link with `branches` serial chains sharing n_joints revolute/prismatic joints."""
+    model = URDFModel()
+    model.add_link(Link('base', 'box', (0.3, 0.3, 0.1)))
+    per = max(1, n_joints // branches)
+    made = 0
+    for b in range(branches):
+        parent = 'base'
+        for k in range(per if b < branches - 1 else n_joints - made):
+            name = f"b{b}_l{k}"
+            model.add_link(Link(name, 'cylinder', (0.03, 0.03, 0.1), origin=(0.0, 0.0, 0.05)))
+            jtype = 'prismatic' if k % 5 == 4 else 'revolute'
+            axis = (0.0, 1.0, 0.0) if k % 2 else (0.0, 0.0, 1.0)
+            model.add_joint(Joint(f"b{b}_j{k}", jtype, parent, name, origin_xyz=(0.0, 0.0, 0.1),
+                                  axis=axis, limit=(-1.5, 1.5)))
+            parent = name; made += 1
+    return model
+
+
+def write_trajectory(path, names, n_frames, rate):
+    t = np.arange(n_frames) / rate
+    phase = np.linspace(0.0, np.pi, len(names))
+    values = np.sin(t[:, None] * 2.0 + phase[None, :])
+    with open(path, 'w') as f:
+        f.write("time," + ",".join(names) + "\n")
+        np.savetxt(f, np.column_stack([t, values]), delimiter=",", fmt="%.6f")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--joints', type=int, default=100)
+    ap.add_argument('--branches', type=int, default=4)
+    ap.add_argument('--frames', type=int, default=10000)
+    ap.add_argument('--rate', type=float, default=60.0, help="playback rate the trajectory is sampled at")
+    ap.add_argument('--model', help="URDF file to use instead of the generated tree")
+    ap.add_argument('--csv', help="trajectory CSV to replay instead of a generated one")
+    args = ap.parse_args(argv)
+
+    if args.model:
+        model = URDFModel(); model.load_from_file(args.model)
+    else:
+        model = build_model(args.joints, args.branches)
+    names = [j.name for j in movable_joints(model)]
+    tmp = None
+    if args.csv:
+        path = args.csv
+    else:
+        tmp = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False); tmp.close()
+        path = tmp.name
+        write_trajectory(path, names, args.frames, args.rate)
+    try:
+        t0 = time.perf_counter()
+        traj_names, frames = load_trajectory_csv(path)
+        load_s = time.perf_counter() - t0
+    finally:
+        if tmp: os.unlink(tmp.name)
+
+    tree = KinematicTree(model)
+    player = TrajectoryPlayer(tree, traj_names, frames)
+    links = list(model.links.values())
+    tree.update()
+    t0 = time.perf_counter()
+    for _ in range(len(player)):
+        player.step()
+        tree.visual_poses(links)
+    elapsed = time.perf_counter() - t0
+    fps = len(player) / elapsed if elapsed else float('inf')
+    print(f"links={len(links)} joints={len(player.names)} frames={len(player)}")
+    print(f"csv load: {load_s * 1000:.1f} ms")
+    print(f"replay:   {elapsed:.3f} s  ->  {fps:.0f} frames/s  ({elapsed / max(1, len(player)) * 1000:.3f} ms/frame)")
+    print(f"target {args.rate:.0f} fps: {'OK' if fps >= args.rate else 'TOO SLOW'}")
+    return 0 if fps >= args.rate else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Time click picking: ray casts through the viewer's link BVH, with and without edits in between.
+
+Rays aim at random links from a camera orbiting the model, as clicks in the 3D view do.
+
+    python benchmarks/bench_picking.py --links 10000
+    python benchmarks/bench_picking.py --model robot.urdf --picks 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import URDFModel
+from urdf_kinematics import KinematicTree, movable_joints
+from urdf_picking import LinkPicker
+from bench_collision import build_model
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--links', type=int, default=10000)
+    ap.add_argument('--branches', type=int, default=16)
+    ap.add_argument('--picks', type=int, default=2000)
+    ap.add_argument('--model', help="URDF file to use instead of the generated arms")
+    args = ap.parse_args(argv)
+
+    if args.model:
+        model = URDFModel(); model.load_from_file(args.model)
+    else:
+        model = build_model(args.links, args.branches)
+    tree = KinematicTree(model)
+    picker = LinkPicker(model, tree)
+    rng = np.random.default_rng(0)
+
+    t0 = time.perf_counter(); picker.update(); build = time.perf_counter() - t0
+    centers = picker.poses[:, :3, 3]
+    mid = centers.mean(axis=0); reach = np.abs(centers - mid).max() * 3 + 1.0
+    rays = []
+    for _ in range(args.picks):
+        eye = rng.normal(size=3); eye = mid + eye / np.linalg.norm(eye) * reach
+        d = centers[rng.integers(len(centers))] - eye
+        rays.append((eye, d / np.linalg.norm(d)))
+
+    t0 = time.perf_counter(); hits = sum(picker.pick(o, d) is not None for o, d in rays)
+    pick = (time.perf_counter() - t0) / len(rays)
+
+    # one link edited between clicks: its leaf is refit, the rest of the tree kept
+    names = list(model.links)
+    t0 = time.perf_counter()
+    for o, d in rays[:200]:
+        model.touch('link', names[rng.integers(len(names))]); picker.pick(o, d)
+    edit = (time.perf_counter() - t0) / 200
+
+    joints = movable_joints(model)
+    t0 = time.perf_counter()
+    if joints: tree.set_joint_position(joints[0].name, 0.1)
+    picker.update(); moved = time.perf_counter() - t0
+
+    print(f"links={len(model.links)} levels={len(picker.levels)}")
+    print(f"build:        {build * 1000:.1f} ms")
+    print(f"pick:         {pick * 1000:.3f} ms per ray ({hits}/{len(rays)} hit)")
+    print(f"edit + pick:  {edit * 1000:.3f} ms")
+    print(f"joint move:   {moved * 1000:.1f} ms to refresh the boxes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Measure what the built-in profiler costs on the hot paths, off and on.
+
+Serializes and re-parses a generated model with the undecorated functions, with the
+decorated ones while profiling is off, and while it is on. The three variants take
+turns, garbage is collected before every run, and the fastest run of each counts.
+
+    python benchmarks/bench_profile_overhead.py --links 2000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import Link, URDFModel
+from urdf_profile import profiler
+
+
+def build(n):
+    model = URDFModel()
+    for i in range(n): model.add_link(Link(f'l{i}', size=(0.1, 0.1, 0.1 + i * 1e-5)))
+    return model
+
+def round_trip(model, serialize, parse):
+    model._fragments = {}     # render every element, not just the changed ones
+    text = serialize(model)
+    parse(URDFModel(), text)
+
+def timed(fn):
+    gc.collect()
+    t0 = time.perf_counter(); fn()
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--links', type=int, default=2000)
+    ap.add_argument('--runs', type=int, default=7)
+    args = ap.parse_args(argv)
+    model = build(args.links)
+    plain = (URDFModel.to_urdf_string.__wrapped__, URDFModel.load_from_urdf_string.__wrapped__)
+    decorated = (URDFModel.to_urdf_string, URDFModel.load_from_urdf_string)
+
+    was = profiler.active
+    best = {'base': [], 'off': [], 'on': []}
+    for _ in range(args.runs):
+        profiler.disable()
+        best['base'].append(timed(lambda: round_trip(model, *plain)))
+        best['off'].append(timed(lambda: round_trip(model, *decorated)))
+        profiler.enable()
+        best['on'].append(timed(lambda: round_trip(model, *decorated)))
+    if not was: profiler.disable()
+    base, off, on = (min(best[k]) for k in ('base', 'off', 'on'))
+    profiler.reset()
+
+    print(f"links={args.links} (serialize + parse, best of {args.runs})")
+    print(f"undecorated:   {base * 1000:.2f} ms")
+    print(f"profiler off:  {off * 1000:.2f} ms  ({(off - base) / base:+.1%})")
+    print(f"profiler on:   {on * 1000:.2f} ms  ({(on - base) / base:+.1%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
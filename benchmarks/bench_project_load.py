@@ -0,0 +1,102 @@
+"""Compare loading a model from URDF text and from a binary project file (.urdfp).
+
+Both files are written for the same generated serial chain; each load then runs in a
+fresh interpreter so its time and peak RSS are measured in isolation.
+
+    python benchmarks/bench_project_load.py --links 50000
+    python benchmarks/bench_project_load.py --model robot.urdf
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from urdf_model import Joint, Link, URDFModel
+
+
+def build_model(n_links):
+    model = URDFModel()
+    for i in range(n_links):
+        model.add_link(Link(f"l{i}", ('box', 'cylinder', 'sphere')[i % 3], (0.05, 0.05, 0.2), 1.0, origin=(0.0, 0.0, 0.1)))
+        if i:
+            model.add_joint(Joint(f"j{i}", 'revolute', f"l{i-1}", f"l{i}", origin_xyz=(0.0, 0.0, 0.2),
+                                  axis=(0.0, 1.0, 0.0), limit=(-1.5, 1.5)))
+    return model
+
+
+def peak_rss_mb():
+    # VmHWM starts over with the new process image; ru_maxrss can carry the parent's peak across exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'): return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:     # Windows
+        return float('nan')
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024.0 * 1024.0) if sys.platform == 'darwin' else rss / 1024.0
+
+
+def child(kind, path):
+    """Runs in the subprocess: import, load, print 'seconds baseline_mb peak_mb links'."""
+    from urdf_project import load_project     # imports NumPy, so both baselines include it
+    base = peak_rss_mb()
+    t0 = time.perf_counter()
+    if kind == 'urdf':
+        model = URDFModel(); model.load_from_file(path)
+    else:
+        model = load_project(path)
+    dt = time.perf_counter() - t0
+    print(f"{dt:.6f} {base:.1f} {peak_rss_mb():.1f} {len(model.links)}")
+
+
+def measure(kind, path, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', kind, path],
+                             check=True, capture_output=True, text=True).stdout.split()
+        runs.append((float(out[0]), float(out[1]), float(out[2]), int(out[3])))
+    return min(runs)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--links', type=int, default=50000)
+    ap.add_argument('--model', help="URDF file to convert and load instead of the generated chain")
+    ap.add_argument('--repeat', type=int, default=3, help="runs per format; the fastest is reported")
+    ap.add_argument('--child', nargs=2, metavar=('KIND', 'PATH'), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.child:
+        return child(*args.child)
+
+    from urdf_project import save_project
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.model:
+            model = URDFModel(); model.load_from_file(args.model)
+        else:
+            model = build_model(args.links)
+        urdf_path = os.path.join(tmp, 'model.urdf'); project_path = os.path.join(tmp, 'model.urdfp')
+        with open(urdf_path, 'w') as f:
+            f.write(model.to_urdf_string())
+        save_project(model, project_path)
+        print(f"{len(model.links)} links, {len(model.joints)} joints")
+        results = {}
+        for kind, path in (('urdf', urdf_path), ('project', project_path)):
+            dt, base, peak, n = measure(kind, path, args.repeat)
+            assert n == len(model.links)
+            results[kind] = dt
+            print(f"{kind:8s} {os.path.getsize(path) / 1e6:8.1f} MB file  {dt * 1000:9.1f} ms  "
+                  f"peak RSS {peak:7.1f} MB (+{peak - base:.1f} MB over baseline)")
+        print(f"project load is {results['urdf'] / results['project']:.1f}x faster")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
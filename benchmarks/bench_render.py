@@ -0,0 +1,78 @@
+"""Time headless preview rendering, as `urdf_builder_gui.py render --jobs 1` does it.
+
+A generated arm is written to a temporary directory as --files identical URDFs and every
+one is rendered by the same worker context. --verify also requires every copy's images
+to be byte-identical to the first one's (exit code 1 otherwise): GL state one model
+leaves behind must not change the next model's picture.
+
+    python benchmarks/bench_render.py --links 200 --files 4 --views 8
+    python benchmarks/bench_render.py --verify --render-mode fixed
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import Joint, Link, URDFModel
+from urdf_render import BACKENDS, render_file, turntable, use_backend
+
+
+def build_model(n_links):
+    model = URDFModel()
+    for i in range(n_links):
+        model.add_link(Link(f"l{i}", ('box', 'cylinder', 'sphere')[i % 3], (0.05, 0.05, 0.2), origin=(0.0, 0.0, 0.1)))
+        if i:
+            model.add_joint(Joint(f"j{i}", 'fixed', f"l{i-1}", f"l{i}", origin_xyz=(0.0, 0.0, 0.2), origin_rpy=(0.0, 0.3, 0.2)))
+    return model
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--links', type=int, default=200)
+    ap.add_argument('--files', type=int, default=4, help="identical copies rendered one after another")
+    ap.add_argument('--views', type=int, default=8)
+    ap.add_argument('--size', type=int, default=256)
+    ap.add_argument('--backend', choices=BACKENDS, default='auto')
+    ap.add_argument('--render-mode', choices=('auto', 'instanced', 'fixed'), default='auto')
+    ap.add_argument('--verify', action='store_true', help="fail unless every copy renders byte-identical images")
+    args = ap.parse_args(argv)
+    backend = use_backend(args.backend)
+
+    tmp = tempfile.mkdtemp()
+    try:
+        text = build_model(args.links).to_urdf_string()
+        for k in range(args.files):
+            with open(os.path.join(tmp, f"copy{k}.urdf"), 'w') as f:
+                f.write(text)
+        out = os.path.join(tmp, 'out')
+        angles = turntable(args.views)
+        times = []; images = []
+        for k in range(args.files):
+            rel = f"copy{k}.urdf"
+            t0 = time.perf_counter()
+            r = render_file((os.path.join(tmp, rel), rel, out, angles, (args.size, args.size), backend, args.render_mode))
+            times.append(time.perf_counter() - t0)
+            if not r['ok']:
+                print(f"{rel}: {r['error']}", file=sys.stderr); return 2
+            pngs = []
+            for path in r['images']:
+                with open(path, 'rb') as f: pngs.append(f.read())
+            images.append(pngs)
+        differing = sum(1 for pngs in images[1:] for a, b in zip(pngs, images[0]) if a != b)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"links={args.links} files={args.files} views={args.views} size={args.size} backend={backend} mode={args.render_mode}")
+    print(f"first file:  {times[0] * 1000:.0f} ms (context creation included)")
+    if len(times) > 1:
+        rest = sum(times[1:]) / (len(times) - 1)
+        print(f"later files: {rest * 1000:.0f} ms each  ->  {args.views / rest:.0f} images/s")
+    print(f"images differing from the first copy: {differing}")
+    return 1 if args.verify and differing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Time template expansion against adding the same links and joints one edit at a time.
+
+"One at a time" mimics the Add Link/Add Joint buttons: one undo step and one refresh
+(diagnostics + URDF text) per element. The expansion writes everything in one undo step
+with one refresh, then one instance's parameters are changed and the expansion re-applied.
+
+    python benchmarks/bench_templates.py --count 40
+    python benchmarks/bench_templates.py --count 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from urdf_model import Link, URDFModel
+from urdf_history import History
+from urdf_validation import ModelValidator
+from urdf_templates import Expansion, Template
+
+SEGMENT = '''
+<link name="seg_${i}"><visual><geometry><box size="${w} ${w} ${length}"/></geometry></visual></link>
+<joint name="seg_${i}_joint" type="revolute">
+  <parent link="${'base' if i == 0 else 'seg_%d' % (i - 1)}"/><child link="seg_${i}"/>
+  <origin xyz="0 0 ${length}"/><axis xyz="0 1 0"/>
+  <limit lower="-0.5" upper="0.5" effort="10" velocity="1"/>
+</joint>
+'''
+
+
+def session():
+    model = URDFModel(); model.add_link(Link('base'))
+    return model, History(model), ModelValidator(model)
+
+def refresh(model, validator):
+    validator.diagnostics(); model.to_urdf_string()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--count', type=int, default=40, help="template instances (one link + one joint each)")
+    args = ap.parse_args(argv)
+    template = Template(SEGMENT)
+    params = {'w': 0.04, 'length': 0.1}
+
+    model, history, validator = session()
+    links, joints = Expansion(template, args.count, params).elements()
+    t0 = time.perf_counter()
+    for el in list(links.values()) + list(joints.values()):
+        with history.command("Add"):
+            (model.add_link if isinstance(el, Link) else model.add_joint)(el)
+        refresh(model, validator)
+    single = time.perf_counter() - t0
+
+    model, history, validator = session()
+    snake = Expansion(template, args.count, params)
+    t0 = time.perf_counter()
+    with history.command("Expand"): snake.apply(model)
+    refresh(model, validator)
+    bulk = time.perf_counter() - t0
+
+    snake.overrides[args.count // 2] = {'length': 0.2}
+    t0 = time.perf_counter()
+    with history.command("Expand"): written, _ = snake.apply(model)
+    refresh(model, validator)
+    again = time.perf_counter() - t0
+
+    print(f"instances={args.count} elements={len(model.links) + len(model.joints)}")
+    print(f"one at a time:  {single * 1000:.1f} ms")
+    print(f"expansion:      {bulk * 1000:.1f} ms  ({single / bulk:.0f}x)")
+    print(f"one override:   {again * 1000:.1f} ms  ({snake.expanded} instance expanded, {written} elements written)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Headless batch mode: load, check, normalize and re-export a directory of URDFs in parallel.
+
+    python urdf_builder_gui.py batch robots/ --jobs 8 --out normalized/ --summary report.json
+
+Only the Qt-free model layer is imported, so pool workers start quickly and no display
+or GL stack is needed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from urdf_model import URDFModel, URDFParseError
+
+
+def check_model(model):
+    """(errors, warnings) from URDFModel.validate() as printable strings."""
+    errors = []; warnings = []
+    for d in model.validate():
+        (errors if d.severity == 'error' else warnings).append(str(d))
+    return errors, warnings
+
+
+def process_file(task):
+    """Worker: (source path, relative path, output dir or None) -> result dict for the summary."""
+    path, rel, out_dir = task
+    t0 = time.perf_counter()
+    result = {'path': rel, 'ok': False}
+    model = URDFModel()
+    try:
+        model.load_from_file(path)
+    except URDFParseError as e:
+        result.update(error=str(e), line=e.line, column=e.column)
+    except OSError as e:
+        result.update(error=str(e))
+    else:
+        result['links'] = len(model.links)
+        result['joints'] = len(model.joints)
+        result['problems'], result['warnings'] = check_model(model)
+        result['ok'] = not result['problems']
+        if out_dir is not None:
+            # generated inertias of mesh links need the mesh bounds now, not after a background load
+            meshes = [l.mesh for l in model.links.values() if l.geom_type == 'mesh' and l.mesh]
+            if meshes:
+                from urdf_mesh import default_cache
+                default_cache.set_search_paths([os.path.dirname(os.path.abspath(path))])
+                default_cache.preload(meshes)
+            dest = os.path.join(out_dir, rel)
+            os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+            with open(dest, 'w') as f:
+                f.write(model.to_urdf_string())
+            result['output'] = dest
+    result['seconds'] = round(time.perf_counter() - t0, 6)
+    return result
+
+
+def find_urdfs(root, recursive=True, exts=('.urdf',)):
+    exts = tuple(e.lower() for e in exts)
+    if os.path.isfile(root):
+        return [(root, os.path.basename(root))]
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for fn in sorted(filenames):
+            if fn.lower().endswith(exts):
+                path = os.path.join(dirpath, fn)
+                found.append((path, os.path.relpath(path, root)))
+        if not recursive:
+            break
+    return found
+
+
+def run_batch(root, jobs=None, out_dir=None, recursive=True, exts=('.urdf',)):
+    files = find_urdfs(root, recursive, exts)
+    tasks = [(path, rel, out_dir) for path, rel in files]
+    t0 = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        results = [process_file(t) for t in tasks]
+    else:
+        # imported here so spawned workers, which re-import this module, skip it
+        from concurrent.futures import ProcessPoolExecutor
+        # several small files per task keeps IPC overhead down for thousands of variants
+        chunk = max(1, len(tasks) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(process_file, tasks, chunksize=chunk))
+    failed = [r for r in results if not r['ok']]
+    return {
+        'root': root,
+        'files': len(results),
+        'ok': len(results) - len(failed),
+        'failed': len(failed),
+        'jobs': jobs,
+        'seconds': round(time.perf_counter() - t0, 3),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='urdf_builder_gui.py batch',
+                                 description="Validate, normalize and re-export URDF files without a GUI.")
+    ap.add_argument('path', help="directory of URDF files (or a single file)")
+    ap.add_argument('--jobs', '-j', type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument('--out', '-o', help="write normalized URDFs here, mirroring the input tree")
+    ap.add_argument('--summary', default='-', help="JSON summary file ('-' for stdout, the default)")
+    ap.add_argument('--no-recursive', action='store_true', help="only look at the top-level directory")
+    ap.add_argument('--ext', action='append', help="file extension to pick up, repeatable (default: .urdf)")
+    args = ap.parse_args(argv)
+    if not os.path.exists(args.path):
+        ap.error(f"{args.path} does not exist")
+
+    summary = run_batch(args.path, args.jobs, args.out, recursive=not args.no_recursive, exts=args.ext or ('.urdf',))
+    text = json.dumps(summary, indent=2)
+    if args.summary == '-':
+        print(text)
+    else:
+        with open(args.summary, 'w') as f:
+            f.write(text + "\n")
+        print(f"{summary['files']} files, {summary['ok']} ok, {summary['failed']} failed "
+              f"in {summary['seconds']}s -> {args.summary}", file=sys.stderr)
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
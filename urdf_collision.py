@@ -0,0 +1,326 @@
+"""Self-collision between links' collision geometry.
+
+A sweep-and-prune broad phase over world-space bounding boxes finds candidate pairs, and an
+exact test decides them, all pairs at once with NumPy: a closest-point test for pairs with a
+sphere, GJK on the shapes' support functions (box, cylinder) for the rest. Mesh collision geometry is approximated by the box of its scaled
+bounds. Links joined directly by a joint, and any pairs passed as `ignore`, are never
+reported: adjacent links usually overlap at the joint by design.
+"""
+import numpy as np
+
+from urdf_kinematics import KinematicTree, transforms
+from urdf_mesh import default_cache
+
+BOX, SPHERE, CYLINDER = 0, 1, 2
+GJK_ITERATIONS = 64
+GJK_EPS = 1e-9          # relative distance below which the origin counts as on a simplex segment/face
+BATCH_ROWS = 1 << 18    # configurations x links per forward-kinematics chunk in check_configurations
+
+
+# ----------------------- Shapes -----------------------
+def shape_of(geom, size, mesh=None, mesh_cache=default_cache):
+    """(kind, half extents, center offset) of a URDF geometry, or None if it has no usable shape.
+
+    Meshes become the box of their scaled bounds, centered where the bounds are; a mesh that
+    is still loading in the background has no shape until it arrives.
+    """
+    s = np.abs(np.asarray(size, dtype=float))
+    if geom == 'box': return BOX, s / 2, np.zeros(3)
+    if geom == 'sphere': return SPHERE, np.full(3, s[0]), np.zeros(3)
+    if geom == 'cylinder': return CYLINDER, np.array([s[0], s[0], s[2] / 2]), np.zeros(3)
+    if geom == 'mesh' and mesh:
+        b = mesh_cache.bounds(mesh)
+        if b is None: return None
+        ends = np.sort([b[0] * size, b[1] * size], axis=0)     # a negative scale mirrors
+        return BOX, (ends[1] - ends[0]) / 2, (ends[1] + ends[0]) / 2
+    return None
+
+
+# ----------------------- Broad phase -----------------------
+def world_aabbs(kinds, poses, half):
+    """(lo, hi) world bounding boxes of shapes: kinds (M,), poses (..., M, 4, 4), half extents (M, 3).
+
+    half is (x, y, z) for boxes, (r, r, r) for spheres and (r, r, length/2) for cylinders along z.
+    """
+    R = poses[..., :3, :3]; c = poses[..., :3, 3]
+    ext = np.einsum('...ij,...j->...i', np.abs(R), half)
+    sph = kinds == SPHERE
+    if sph.any(): ext[..., sph, :] = half[sph, :1]
+    cyl = kinds == CYLINDER
+    if cyl.any():
+        a = R[..., cyl, :, :][..., 2]       # cylinder axes in world
+        ext[..., cyl, :] = half[cyl, :1] * np.sqrt(np.clip(1.0 - a * a, 0.0, None)) + half[cyl, 2:] * np.abs(a)
+    return c - ext, c + ext
+
+def sweep_and_prune(lo, hi, axis=None):
+    """Index pairs (i, j), i < j, of overlapping boxes (lo, hi: (N, 3)).
+
+    Boxes are sorted along `axis` (default: the one their centers spread most on); each one
+    is paired with those starting before it ends there, and the other two axes filter the result.
+    """
+    n = len(lo)
+    if n < 2: return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    if axis is None: axis = int(np.argmax((lo + hi).var(axis=0)))
+    order = np.argsort(lo[:, axis], kind='stable')
+    start = lo[order, axis]
+    counts = np.searchsorted(start, hi[order, axis], side='right') - np.arange(n) - 1
+    counts = np.maximum(counts, 0)
+    a = np.repeat(np.arange(n), counts)
+    b = a + 1 + np.arange(len(a)) - np.repeat(np.cumsum(counts) - counts, counts)
+    a = order[a]; b = order[b]
+    keep = ((lo[a] <= hi[b]) & (lo[b] <= hi[a])).all(axis=1)
+    a = a[keep]; b = b[keep]
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+# ----------------------- Narrow phase -----------------------
+def _dot(u, v):
+    return np.einsum('ij,ij->i', u, v)
+
+def _support(kinds, poses, half, d):
+    """Farthest point of each shape in world direction d (P, 3)."""
+    R = poses[:, :3, :3]
+    dl = np.einsum('pji,pj->pi', R, d)      # direction in the shape frame
+    s = np.sign(dl) * half
+    sph = kinds == SPHERE
+    if sph.any():
+        n = np.linalg.norm(dl[sph], axis=1, keepdims=True)
+        s[sph] = half[sph, :1] * np.divide(dl[sph], n, out=np.zeros_like(dl[sph]), where=n > 0)
+    cyl = kinds == CYLINDER
+    if cyl.any():
+        radial = dl[cyl, :2]; n = np.linalg.norm(radial, axis=1, keepdims=True)
+        s[cyl, :2] = half[cyl, :1] * np.divide(radial, n, out=np.zeros_like(radial), where=n > 0)
+    return poses[:, :3, 3] + np.einsum('pij,pj->pi', R, s)
+
+def sphere_overlap(centers, radii, kinds, poses, half):
+    """Does each sphere (world center, radius) touch the shape it is paired with? Exact -> (P,) bool.
+
+    The closest point of the shape to the center is found in the shape's own frame: clamped
+    to the box, to the cylinder's radius and half length, or pulled onto the sphere.
+    """
+    R = poses[:, :3, :3]
+    p = np.einsum('pji,pj->pi', R, centers - poses[:, :3, 3])
+    q = np.clip(p, -half, half)
+    round_ = kinds != BOX
+    if round_.any():
+        # spheres scale the whole vector, cylinders only the radial part
+        axes = np.where((kinds[round_] == SPHERE)[:, None], 3, 2)
+        radial = np.where(np.arange(3) < axes, p[round_], 0.0)
+        n = np.linalg.norm(radial, axis=1)
+        scale = np.minimum(1.0, np.divide(half[round_, 0], n, out=np.ones_like(n), where=n > 0))
+        q[round_] = np.where(np.arange(3) < axes, radial * scale[:, None], q[round_])
+    return _dot(p - q, p - q) <= radii * radii
+
+def gjk_intersect(kinds_a, poses_a, half_a, kinds_b, poses_b, half_b):
+    """Do shape pairs overlap? -> (P,) bool; touching counts as overlapping.
+
+    Pairs with a sphere are decided exactly by sphere_overlap, the others by GJK.
+    """
+    hit = np.zeros(len(kinds_a), bool)
+    sa = kinds_a == SPHERE; sb = ~sa & (kinds_b == SPHERE)
+    if sa.any():
+        hit[sa] = sphere_overlap(poses_a[sa, :3, 3], half_a[sa, 0], kinds_b[sa], poses_b[sa], half_b[sa])
+    if sb.any():
+        hit[sb] = sphere_overlap(poses_b[sb, :3, 3], half_b[sb, 0], kinds_a[sb], poses_a[sb], half_a[sb])
+    rest = ~(sa | sb)
+    if rest.any():
+        hit[rest] = _gjk(kinds_a[rest], poses_a[rest], half_a[rest], kinds_b[rest], poses_b[rest], half_b[rest])
+    return hit
+
+def _gjk(kinds_a, poses_a, half_a, kinds_b, poses_b, half_b):
+    """GJK on the Minkowski difference, vectorized over pairs -> (P,) bool.
+
+    Every pair runs the same simplex updates; the ones that have been decided just drop out
+    of the arrays each iteration. An origin within rounding (GJK_EPS, relative to the
+    simplex size) of a segment or face of the simplex is on it, so counts as a hit.
+    """
+    P = len(kinds_a)
+    def support(idx, d):
+        return _support(kinds_a[idx], poses_a[idx], half_a[idx], d) - _support(kinds_b[idx], poses_b[idx], half_b[idx], -d)
+    hit = np.zeros(P, bool)
+    if not P: return hit
+    every = np.arange(P)
+    d = poses_a[:, :3, 3] - poses_b[:, :3, 3]
+    d[~d.any(axis=1)] = (1.0, 0.0, 0.0)
+    C = support(every, d)
+    hit[~C.any(axis=1)] = True      # origin is a point of the difference
+    d = -C
+    B = support(every, d)
+    alive = (_dot(B, d) >= 0) & ~hit
+    A = np.zeros((P, 3)); D = np.zeros((P, 3))
+    dim = np.full(P, 2)
+    on = _segment(every, B, C, d)
+    hit[alive & on] = True
+    active = np.flatnonzero(alive & ~on)
+    for _ in range(GJK_ITERATIONS):
+        if not len(active): break
+        a = support(active, d[active])
+        ahead = _dot(a, d[active]) >= 0
+        active = active[ahead]; A[active] = a[ahead]
+        dim[active] += 1
+        tri = active[dim[active] == 3]
+        if len(tri): hit[tri[_simplex3(tri, A, B, C, D, dim, d)]] = True
+        tet = active[dim[active] == 4]
+        if len(tet): hit[tet[_simplex4(tet, A, B, C, D, dim, d)]] = True
+        active = active[~hit[active]]
+    return hit
+
+def _norm(v):
+    return np.sqrt(_dot(v, v))
+
+def _segment(idx, B, C, d):
+    """Search direction from segment (newest B, C) towards the origin, into d; True where the origin is on it."""
+    b = B[idx]; cb = C[idx] - b; ao = -b
+    m = np.cross(cb, ao)
+    d[idx] = np.cross(m, cb)
+    # |m| / |cb| is the origin's distance from the line
+    return _norm(m) <= GJK_EPS * _norm(cb) * (_norm(b) + _norm(C[idx]) + _norm(cb))
+
+def _simplex3(idx, A, B, C, D, dim, d):
+    # triangle (newest A, B, C): keep the edge or side facing the origin; True where the origin is on it
+    a = A[idx]; b = B[idx]; c = C[idx]
+    ab = b - a; ac = c - a; ao = -a; n = np.cross(ab, ac)
+    scale = _norm(a) + _norm(ab) + _norm(ac)
+    on = np.zeros(len(idx), bool)
+    # (nearly) collinear points: no usable normal, go on from the longer edge through A
+    flat = _norm(n) <= GJK_EPS * _norm(ab) * _norm(ac)
+    longer = flat & (_dot(ab, ab) >= _dot(ac, ac)); shorter = flat & ~longer
+    C[idx[longer]] = b[longer]; C[idx[shorter]] = c[shorter]; B[idx[flat]] = a[flat]
+    if flat.any(): on[flat] = _segment(idx[flat], B, C, d)
+    edge_ab = ~flat & (_dot(np.cross(ab, n), ao) > 0)
+    edge_ac = ~flat & ~edge_ab & (_dot(np.cross(n, ac), ao) > 0)
+    face = ~flat & ~edge_ab & ~edge_ac
+    i = idx[edge_ab]; C[i] = b[edge_ab]; B[i] = a[edge_ab]
+    if edge_ab.any(): on[edge_ab] = _segment(i, B, C, d)
+    i = idx[edge_ac]; B[i] = a[edge_ac]
+    if edge_ac.any(): on[edge_ac] = _segment(i, B, C, d)
+    dim[idx[flat | edge_ab | edge_ac]] = 2
+    side = _dot(n, ao)
+    on[face] = np.abs(side[face]) <= GJK_EPS * _norm(n[face]) * scale[face]
+    above = face & ~on & (side > 0); below = face & ~on & ~above
+    i = idx[above]; D[i] = c[above]; C[i] = b[above]; B[i] = a[above]; d[i] = n[above]
+    i = idx[below]; D[i] = b[below]; B[i] = a[below]; d[i] = -n[below]
+    return on
+
+def _simplex4(idx, A, B, C, D, dim, d):
+    # tetrahedron (newest A): origin inside unless it lies clearly beyond one of the faces through A
+    a = A[idx]; b = B[idx]; c = C[idx]; e = D[idx]; ao = -a
+    abc = np.cross(b - a, c - a); acd = np.cross(c - a, e - a); adb = np.cross(e - a, b - a)
+    scale = GJK_EPS * (_norm(a) + _norm(b - a) + _norm(c - a) + _norm(e - a))
+    f1 = _dot(abc, ao) > scale * _norm(abc)
+    f2 = ~f1 & (_dot(acd, ao) > scale * _norm(acd))
+    f3 = ~f1 & ~f2 & (_dot(adb, ao) > scale * _norm(adb))
+    dim[idx] = 3
+    i = idx[f1]; D[i] = c[f1]; C[i] = b[f1]; B[i] = a[f1]; d[i] = abc[f1]
+    i = idx[f2]; B[i] = a[f2]; d[i] = acd[f2]
+    i = idx[f3]; C[i] = e[f3]; D[i] = b[f3]; B[i] = a[f3]; d[i] = adb[f3]
+    return ~(f1 | f2 | f3)
+
+
+# ----------------------- Checker -----------------------
+class CollisionChecker:
+    """Self-collision of a model's links at the poses of a KinematicTree.
+
+    Shapes and ignored pairs are gathered again after any model edit, on the next check.
+    check() tests the tree's current joint positions; check_configurations() tests many
+    joint vectors in one go (batched forward kinematics, one GJK pass per chunk).
+    """
+    def __init__(self, model, tree=None, ignore=(), ignore_adjacent=True, mesh_cache=None):
+        self.model = model
+        self.tree = tree if tree is not None else KinematicTree(model)
+        self.ignore = {frozenset(p) for p in ignore}
+        self.ignore_adjacent = ignore_adjacent
+        self.mesh_cache = mesh_cache or default_cache
+        self.names = []
+        self._stale = True
+        model.subscribe(self._on_model_event)
+
+    def _on_model_event(self, event, kind, name):
+        self._stale = True
+
+    def mesh_loaded(self, filename):
+        """A mesh file finished loading: links shaped by it are gathered again on the next check."""
+        for l in self.model.links.values():
+            if (l.collision_mesh if l.collision_geom else l.mesh) == filename: self._stale = True; return
+
+    def set_ignored(self, pairs):
+        self.ignore = {frozenset(p) for p in pairs}
+        self._stale = True
+
+    def rebuild(self):
+        names = []; kinds = []; half = []; offsets = []; origins = []; rpys = []
+        for link in self.model.links.values():
+            if not link.include_collision: continue
+            geom = link.collision_geom if link.collision_geom else link.geom_type
+            size = link.collision_size if link.collision_size else link.size
+            shape = shape_of(geom, size, link.collision_mesh if link.collision_geom else link.mesh, self.mesh_cache)
+            if shape is None: continue
+            names.append(link.name); kinds.append(shape[0]); half.append(shape[1]); offsets.append(shape[2])
+            origins.append(link.origin); rpys.append(link.rpy)
+        m = len(names)
+        self.names = names
+        self.kinds = np.array(kinds, dtype=np.int64)
+        self.half = np.array(half, dtype=float).reshape(-1, 3)
+        # collision origin = visual origin; mesh boxes sit at the center of the mesh bounds
+        self.local = transforms(origins, rpys) if m else np.zeros((0, 4, 4))
+        if m: self.local[:, :3, 3] += np.einsum('nij,nj->ni', self.local[:, :3, :3], np.array(offsets))
+        self.tree.update()
+        self.rows = np.array([self.tree.index[n] for n in names], dtype=np.int64)
+        index = {n: i for i, n in enumerate(names)}
+        pairs = [(j.parent, j.child) for j in self.model.joints.values()] if self.ignore_adjacent else []
+        pairs += [tuple(p) for p in self.ignore if len(p) == 2]
+        codes = [min(index[p], index[c]) * m + max(index[p], index[c]) for p, c in pairs if p in index and c in index]
+        self._ignored = np.unique(np.array(codes, dtype=np.int64))
+        self._stale = False
+
+    def _prepare(self):
+        if self._stale: self.rebuild()
+        return len(self.names) >= 2
+
+    def _unignored(self, a, b):
+        ignored = self._ignored
+        if not len(ignored): return np.ones(len(a), bool)
+        codes = a * len(self.names) + b
+        return ignored[np.minimum(np.searchsorted(ignored, codes), len(ignored) - 1)] != codes
+
+    def _candidates(self, lo, hi):
+        a, b = sweep_and_prune(lo, hi)
+        keep = self._unignored(a, b)
+        return a[keep], b[keep]
+
+    def check(self):
+        """Colliding (link, link) name pairs at the tree's current joint positions."""
+        if not self._prepare(): return []
+        self.tree.update()
+        poses = self.tree.world[self.rows] @ self.local
+        a, b = self._candidates(*world_aabbs(self.kinds, poses, self.half))
+        hit = gjk_intersect(self.kinds[a], poses[a], self.half[a], self.kinds[b], poses[b], self.half[b])
+        return sorted((self.names[i], self.names[j]) for i, j in zip(a[hit].tolist(), b[hit].tolist()))
+
+    def check_configurations(self, names, values, return_pairs=False):
+        """Self-collision for K configurations of the joints `names` (values: (K, len(names))).
+
+        Returns a (K,) bool array, and with return_pairs also [(k, link, link)] for every
+        colliding pair. Joints not in names stay at the tree's current positions.
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, len(names))
+        hits = np.zeros(len(values), bool); pairs = []
+        if not self._prepare(): return (hits, pairs) if return_pairs else hits
+        step = max(1, BATCH_ROWS // max(1, len(self.tree.names)))
+        for s in range(0, len(values), step):
+            poses = self.tree.world_batch(names, values[s:s + step])[:, self.rows] @ self.local
+            lo, hi = world_aabbs(self.kinds, poses, self.half)
+            # one sweep for the whole chunk: each configuration is shifted clear of the previous one
+            count, m = lo.shape[:2]
+            axis = int(np.argmax((lo + hi).var(axis=1).sum(axis=0)))
+            shift = (hi[..., axis].max() - lo[..., axis].min() + 1.0) * np.arange(count)
+            lo[..., axis] += shift[:, None]; hi[..., axis] += shift[:, None]
+            a, b = sweep_and_prune(lo.reshape(-1, 3), hi.reshape(-1, 3), axis)
+            k = a // m; a = a % m; b = b % m
+            keep = self._unignored(a, b)
+            k = k[keep]; a = a[keep]; b = b[keep]
+            hit = gjk_intersect(self.kinds[a], poses[k, a], self.half[a], self.kinds[b], poses[k, b], self.half[b])
+            hits[s + k[hit]] = True
+            if return_pairs:
+                pairs += [(s + kk, self.names[i], self.names[j]) for kk, i, j in zip(k[hit].tolist(), a[hit].tolist(), b[hit].tolist())]
+        return (hits, pairs) if return_pairs else hits
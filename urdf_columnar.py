@@ -0,0 +1,790 @@
+"""Array-backed URDFModel: link and joint fields in NumPy structured arrays.
+
+ColumnarURDFModel keeps each link/joint as one row of a structured array, with the names
+in one UTF-8 buffer found through a hash index array, instead of a Link/Joint object
+holding tuples and a dict of inertia strings plus a dict entry and str per name. Inertia,
+inertial origin and collision size sit in a side array that only links using them pay
+for. model.links / model.joints are ElementTable mappings whose values are LinkView /
+JointView proxies with the Link/Joint attribute API, so XML generation, validation,
+kinematics and the GUI work on it unchanged, while bulk code can read whole columns
+(link_columns / joint_columns).
+
+Numbers come back as floats. Values the columns cannot hold exactly (non-numeric
+text, inertia strings that don't round-trip through float) are kept as-is in a small
+per-table side dict.
+
+Columns stay float64: float32 would turn 0.1 into 0.10000000149 in the exported URDF and
+in the kinematics. `python benchmarks/bench_columnar_memory.py` measures what it saves.
+"""
+import numpy as np
+
+from array import array
+from collections import namedtuple
+
+from urdf_model import Joint, Link, URDFModel
+from urdf_validation import JOINT_TYPES, LIMITED_TYPES, graph_diagnostics, joint_diagnostics, link_diagnostics
+
+INERTIA_KEYS = ('ixx', 'ixy', 'ixz', 'iyy', 'iyz', 'izz')
+
+# link row flags, also the link_flags column of .urdfp files (urdf_project): never renumber
+MANUAL_INERTIA, INCLUDE_COLLISION, HAS_INERTIA, HAS_COM, HAS_COLLISION_SIZE, HAS_COM_RPY = 1, 2, 4, 8, 16, 32
+HAS_LIMIT = 1
+DELETED = 128
+AUX_FLAGS = HAS_INERTIA | HAS_COM | HAS_COLLISION_SIZE | HAS_COM_RPY    # link has a row in the aux array
+
+# aux: row in LinkTable.aux while flags has any of AUX_FLAGS
+LINK_DTYPE = np.dtype([
+    ('geom', '<i4'), ('collision_geom', '<i4'), ('mesh', '<i4'), ('collision_mesh', '<i4'), ('flags', 'u1'),
+    ('size', '<f8', (3,)), ('mass', '<f8'), ('origin', '<f8', (3,)), ('rpy', '<f8', (3,)), ('aux', '<i4'),
+])
+AUX_DTYPE = np.dtype([('inertia', '<f8', (6,)), ('com', '<f8', (3,)), ('collision_size', '<f8', (3,)),
+                      ('com_rpy', '<f8', (3,))])
+# parent/child: row in the link table, or -(code + 1) into the string pool for names
+# that are not links (dangling references)
+JOINT_DTYPE = np.dtype([
+    ('type', '<i4'), ('parent', '<i4'), ('child', '<i4'), ('flags', 'u1'),
+    ('origin', '<f8', (3,)), ('rpy', '<f8', (3,)), ('axis', '<f8', (3,)),
+    ('limit', '<f8', (2,)), ('effort', '<f8'), ('velocity', '<f8'),
+])
+
+_NAN3 = (float('nan'),) * 3
+_NAN6 = (float('nan'),) * 6
+GROWTH = 8          # full tables grow by 1/GROWTH of their rows, at least MIN_ROWS
+MIN_ROWS = 64
+COMPACT = 4         # removed rows are dropped once they are over 1/COMPACT of the table
+_FREE, _GONE = -1, -2   # hash slots: never used / held a removed row
+Edge = namedtuple('Edge', 'parent child')
+
+
+def _num_text(v):
+    # shortest text that round-trips, without a trailing ".0" ('0', '2.5', '1e-05')
+    s = repr(v)
+    return s[:-2] if s.endswith('.0') else s
+
+
+def encode_inertia(inertia):
+    """Inertia dict -> (6 floats, NaN where a key is missing; fits). fits is False when the
+    floats would not give back the same strings in the same order (non-numeric or
+    non-canonical text); the caller then keeps the dict itself."""
+    row = [float('nan')] * 6
+    if inertia is None: return row, True
+    keys = [k for k in INERTIA_KEYS if k in inertia]
+    try:
+        vals = [float(inertia[k]) for k in keys]
+        fits = list(inertia) == keys and all(_num_text(f) == inertia[k] for k, f in zip(keys, vals))
+    except (TypeError, ValueError):
+        return row, False
+    if fits:
+        for k, f in zip(keys, vals): row[INERTIA_KEYS.index(k)] = f
+    return row, fits
+
+def link_flags(l):
+    """MANUAL_INERTIA | INCLUDE_COLLISION | HAS_* bits of a Link."""
+    return ((MANUAL_INERTIA if l.manual_inertia else 0) | (INCLUDE_COLLISION if l.include_collision else 0)
+            | (HAS_INERTIA if l.inertia is not None else 0) | (HAS_COM if l.com is not None else 0)
+            | (HAS_COLLISION_SIZE if l.collision_size is not None else 0) | (HAS_COM_RPY if l.com_rpy is not None else 0))
+
+def decode_inertia(values):
+    """Inverse of encode_inertia for a row that fit: 6 floats -> inertia dict."""
+    return {k: _num_text(v) for k, v in zip(INERTIA_KEYS, values) if v == v}
+
+
+def _tuples(a):
+    # (N,k) -> N k-tuples; per-column tolist + zip beats nested tolist
+    return list(zip(*(a[:, k].tolist() for k in range(a.shape[1])))) if len(a) else []
+
+
+class StringPool:
+    """Interned strings (geometry/joint types, dangling link names) by integer code."""
+    def __init__(self, strings=()):
+        self.strings = []; self.codes = {}
+        for s in strings: self.code(s)
+
+    def code(self, s):
+        c = self.codes.get(s)
+        if c is None:
+            c = self.codes[s] = len(self.strings); self.strings.append(s)
+        return c
+
+    def copy(self):
+        other = StringPool(); other.strings = list(self.strings); other.codes = dict(self.codes)
+        return other
+
+
+# ----------------------- Tables -----------------------
+def _pow2(n):
+    size = 8
+    while size < n: size *= 2
+    return size
+
+
+class ElementTable:
+    """name -> view mapping over a structured array, in element order.
+
+    Elements live in rows [0, count) in their order. Removing one leaves a hole (the row is
+    flagged DELETED) until the holes make up 1/COMPACT of the table; then the rows are
+    compacted, which renumbers them, so a view is only good until the next removal. Take
+    to_element() to keep an element across edits. Re-adding an existing name overwrites
+    its row in place (dict semantics: it keeps its position).
+
+    Names are UTF-8 in one bytearray; name_at/name_len/name_hash hold each row's span and
+    the low 32 bits of its hash, and slots is an open-addressing (linear probing) hash
+    table of rows.
+    """
+    def __init__(self, dtype, pool, capacity=0):
+        self.data = np.zeros(capacity, dtype)
+        self.count = 0          # rows in use, including removed ones
+        self.removed = 0        # removed rows among them
+        self.extra = {}         # row -> {attribute: value} that did not fit the columns
+        self.pool = pool
+        self.version = 0        # bumped on every write, for caches of column data
+        self.blob = bytearray()
+        self.name_at = array('I'); self.name_len = array('I'); self.name_hash = array('I')
+        self.slots = array('i', [_FREE]) * _pow2(3 * capacity)
+        self.filled = 0         # slots not _FREE (rows and _GONE markers)
+        self._live = None       # cached rows() of the live elements
+
+    # ---------- names ----------
+    def _name(self, row):
+        at = self.name_at[row]
+        return self.blob[at:at + self.name_len[row]].decode('utf-8')
+
+    def _names(self, rows):
+        at = self.name_at; ln = self.name_len; blob = self.blob
+        return [blob[at[r]:at[r] + ln[r]].decode('utf-8') for r in rows]
+
+    def find(self, name):
+        """Row of name, or None."""
+        h = hash(name) & 0xffffffff
+        slots = self.slots; mask = len(slots) - 1; i = h & mask; key = None
+        while True:
+            r = slots[i]
+            if r == _FREE: return None
+            if r >= 0 and self.name_hash[r] == h:
+                if key is None: key = name.encode('utf-8')
+                at = self.name_at[r]
+                if self.blob[at:at + self.name_len[r]] == key: return r
+            i = (i + 1) & mask
+
+    def _hash_in(self, row):
+        slots = self.slots; mask = len(slots) - 1; i = self.name_hash[row] & mask
+        while slots[i] >= 0: i = (i + 1) & mask
+        if slots[i] == _FREE: self.filled += 1
+        slots[i] = row
+        if 2 * self.filled > len(slots): self._rehash()
+
+    def _hash_out(self, row):
+        slots = self.slots; mask = len(slots) - 1; i = self.name_hash[row] & mask
+        while slots[i] != row: i = (i + 1) & mask
+        slots[i] = _GONE
+
+    def _rehash(self):
+        rows = self.rows().tolist()
+        self.slots = array('i', [_FREE]) * _pow2(3 * len(rows)); self.filled = 0
+        for r in rows: self._hash_in(r)
+
+    # ---------- rows ----------
+    def _new_row(self, name):
+        if self.count == len(self.data):
+            grown = np.zeros(self.count + max(MIN_ROWS, self.count // GROWTH), self.data.dtype)
+            grown[:self.count] = self.data[:self.count]
+            self.data = grown
+        row = self.count; self.count += 1
+        key = name.encode('utf-8')
+        self.name_at.append(len(self.blob)); self.name_len.append(len(key)); self.blob += key
+        self.name_hash.append(hash(name) & 0xffffffff)
+        self._live = None; self._hash_in(row)
+        return row
+
+    def _write(self, row, values, extra):
+        self._store(row, values)
+        if extra: self.extra[row] = extra
+        else: self.extra.pop(row, None)
+        self.version += 1
+
+    def _store(self, row, values):
+        self.data[row] = values
+
+    def _drop(self, row):
+        self.data['flags'][row] = DELETED
+
+    def _removed_rows(self, name):
+        """Removed rows that held name (they keep it until the next compaction)."""
+        if not self.removed: return []
+        h = np.frombuffer(self.name_hash, np.uint32)[:self.count]
+        dead = (h == (hash(name) & 0xffffffff)) & (self.data['flags'][:self.count] & DELETED > 0)
+        return [r for r in np.flatnonzero(dead).tolist() if self._name(r) == name]
+
+    def compact(self):
+        """Drop removed rows and spare capacity (renumbers rows: views taken before are stale)."""
+        self._rebuild(self.rows())
+
+    def _rebuild(self, rows):
+        """Keep just rows, in that order, as the table's rows 0..len(rows)-1."""
+        new_of_old = np.full(self.count, -1, np.int64); new_of_old[rows] = np.arange(len(rows))
+        self._renumbered(new_of_old)
+        names = [bytes(self.blob[self.name_at[r]:self.name_at[r] + self.name_len[r]]) for r in rows.tolist()]
+        lens = np.fromiter(map(len, names), np.uint32, len(names))
+        self.blob = bytearray(b''.join(names))
+        self.name_at = array('I', (np.cumsum(lens) - lens).astype(np.uint32).tobytes())
+        self.name_len = array('I', lens.tobytes())
+        self.name_hash = array('I', np.frombuffer(self.name_hash, np.uint32)[rows].tobytes())
+        self.data = self.data[rows]
+        self.extra = {int(new_of_old[r]): e for r, e in self.extra.items() if new_of_old[r] >= 0}
+        self.count = len(rows); self.removed = 0; self._live = None
+        self._rehash()
+        self.version += 1
+
+    def _renumbered(self, new_of_old):
+        """Hook: rows are about to move (new_of_old[old row], -1 for dropped ones)."""
+
+    def column(self, field):
+        """Column of the live elements, in element order (a copy)."""
+        return self.data[field][self.rows()]
+
+    def rows(self, names=None):
+        """Row numbers of names (default: every element, in order)."""
+        if names is None:
+            if self._live is None:
+                self._live = (np.arange(self.count) if not self.removed else
+                              np.flatnonzero((self.data['flags'][:self.count] & DELETED) == 0))
+            return self._live
+        return np.fromiter((self._row(n) for n in names), dtype=np.int64)
+
+    def _row(self, name):
+        row = self.find(name)
+        if row is None: raise KeyError(name)
+        return row
+
+    def _row_bytes(self, rows):
+        raw = self.data[:self.count].tobytes(); size = self.data.dtype.itemsize
+        return [raw[r * size:(r + 1) * size] for r in rows]
+
+    def signatures(self):
+        """One bytes value per element (in order) that changes whenever its fields do."""
+        rows = self.rows().tolist(); sigs = self._row_bytes(rows)
+        if not self.extra: return sigs
+        extra = self.extra
+        return [(s, tuple(extra[r].items()) if r in extra else ()) for s, r in zip(sigs, rows)]
+
+    def elements(self, names):
+        """Detached Link/Joint objects for names, built column-wise (much cheaper than view attributes)."""
+        names = list(names); rows = self.rows(names)
+        out = self._build(names, rows)
+        if self.extra:
+            for el, r in zip(out, rows.tolist()):
+                for attr, value in self.extra.get(r, {}).items(): setattr(el, attr, value)
+        return out
+
+    def copy(self, pool):
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.data = self.data.copy(); other.blob = bytearray(self.blob); other.slots = array('i', self.slots)
+        other.name_at = array('I', self.name_at); other.name_len = array('I', self.name_len)
+        other.name_hash = array('I', self.name_hash)
+        other.extra = {r: dict(e) for r, e in self.extra.items()}; other.pool = pool
+        return other
+
+    # ---------- mapping ----------
+    def __len__(self):
+        return self.count - self.removed
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def __getitem__(self, name):
+        return self.view_type(self, self._row(name))
+
+    def get(self, name, default=None):
+        row = self.find(name)
+        return default if row is None else self.view_type(self, row)
+
+    def keys(self):
+        return self._names(self.rows().tolist())
+
+    def values(self):
+        view = self.view_type
+        return [view(self, r) for r in self.rows().tolist()]
+
+    def items(self):
+        view = self.view_type; rows = self.rows().tolist()
+        return [(n, view(self, r)) for n, r in zip(self._names(rows), rows)]
+
+    def __setitem__(self, name, element):
+        values, extra = self.encode(element)
+        row = self.find(name)
+        self._write(self._new_row(name) if row is None else row, values, extra)
+
+    def insert(self, index, name, element):
+        """self[name] = element, placed at position index of the element order.
+
+        The removed row that held name is reused when it sits at that position (undoing
+        the latest removal); otherwise the rows are rebuilt in the new order.
+        """
+        if name in self: del self[name]
+        live = self.rows()
+        if index >= len(live): self[name] = element; return
+        values, extra = self.encode(element)
+        for row in self._removed_rows(name):
+            if np.searchsorted(live, row) == index:
+                self._write(row, values, extra)
+                self.removed -= 1; self._live = None; self._hash_in(row)
+                return
+        row = self._new_row(name); self._write(row, values, extra)
+        self._rebuild(np.insert(live, index, row))
+
+    def __delitem__(self, name):
+        row = self._row(name)
+        self._hash_out(row); self._drop(row); self.extra.pop(row, None)
+        self.removed += 1; self._live = None; self.version += 1
+        if self.removed * COMPACT > max(self.count, MIN_ROWS): self.compact()
+
+    def pop(self, name, *default):
+        if name not in self:
+            if default: return default[0]
+            raise KeyError(name)
+        element = self.elements([name])[0]; del self[name]
+        return element
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {len(self)}>"
+
+
+def _floats(value, n):
+    """(tuple of n floats, fits) for a tuple-valued attribute."""
+    try:
+        t = tuple(map(float, value))
+        if len(t) == n: return t, True
+    except (TypeError, ValueError):
+        pass
+    return (float('nan'),) * n, False
+
+def _scalar(value):
+    try: return float(value), True
+    except (TypeError, ValueError): return float('nan'), False
+
+
+class LinkTable(ElementTable):
+    def __init__(self, pool, capacity=0):
+        super().__init__(LINK_DTYPE, pool, capacity)
+        self.aux = np.zeros(0, AUX_DTYPE)
+        self.aux_count = 0; self.aux_free = []
+        self.joints = None      # JointTable whose parent/child columns point at these rows
+
+    def encode(self, l):
+        extra = {}; code = self.pool.code
+        def vec(attr, value, n=3, optional=False):
+            if optional and value is None: return _NAN3
+            t, ok = _floats(value, n)
+            if not ok: extra[attr] = value
+            return t
+        size = vec('size', l.size); origin = vec('origin', l.origin); rpy = vec('rpy', l.rpy)
+        mass, ok = _scalar(l.mass)
+        if not ok: extra['mass'] = l.mass
+        flags = link_flags(l); aux = None
+        if flags & AUX_FLAGS:
+            inertia, ok = encode_inertia(l.inertia)
+            if not ok: extra['inertia'] = dict(l.inertia)
+            aux = (inertia, vec('com', l.com, optional=True), vec('collision_size', l.collision_size, optional=True),
+                   vec('com_rpy', l.com_rpy, optional=True))
+        opt = lambda v: -1 if v is None else code(v)
+        return ((code(l.geom_type), opt(l.collision_geom), opt(l.mesh), opt(l.collision_mesh), flags,
+                 size, mass, origin, rpy), aux), extra
+
+    def _store(self, row, values):
+        core, aux = values
+        a = int(self.data['aux'][row]) if self.data['flags'][row] & AUX_FLAGS else -1
+        if aux is None:
+            if a >= 0: self.aux_free.append(a); a = -1
+        else:
+            if a < 0: a = self._aux_row()
+            self.aux[a] = aux
+        self.data[row] = core + (a,)
+
+    def _aux_row(self):
+        if self.aux_free: return self.aux_free.pop()
+        if self.aux_count == len(self.aux):
+            grown = np.zeros(self.aux_count + max(MIN_ROWS, self.aux_count // GROWTH), AUX_DTYPE)
+            grown[:self.aux_count] = self.aux[:self.aux_count]
+            self.aux = grown
+        self.aux_count += 1
+        return self.aux_count - 1
+
+    def _drop(self, row):
+        if self.data['flags'][row] & AUX_FLAGS: self.aux_free.append(int(self.data['aux'][row]))
+        self.data['flags'][row] = DELETED
+
+    def _renumbered(self, new_of_old):
+        if self.joints is not None: self.joints.relink(new_of_old)
+
+    def _rebuild(self, rows):
+        super()._rebuild(rows)
+        d = self.data; has = np.flatnonzero(d['flags'] & AUX_FLAGS)
+        self.aux = self.aux[d['aux'][has]]
+        d['aux'][has] = np.arange(len(has)); self.aux_count = len(has); self.aux_free = []
+
+    def aux_rows(self, d):
+        """AUX_DTYPE rows for the link rows d (zeros where a link has none: check the flags)."""
+        has = (d['flags'] & AUX_FLAGS) != 0
+        out = np.zeros(len(d), AUX_DTYPE)
+        out[has] = self.aux[d['aux'][has]]
+        return out
+
+    def _row_bytes(self, rows):
+        sigs = super()._row_bytes(rows)
+        f = self.data['flags'][rows]; has = np.flatnonzero(f & AUX_FLAGS)
+        if len(has):
+            raw = self.aux[self.data['aux'][np.asarray(rows)[has]]].tobytes(); size = AUX_DTYPE.itemsize
+            for k, i in enumerate(has.tolist()): sigs[i] += raw[k * size:(k + 1) * size]
+        return sigs
+
+    def copy(self, pool):
+        other = super().copy(pool)
+        other.aux = self.aux.copy(); other.aux_free = list(self.aux_free)
+        return other
+
+    def _build(self, names, rows):
+        d = self.data[rows]; a = self.aux_rows(d)
+        S = self.pool.strings
+        geoms = [S[c] for c in d['geom'].tolist()]
+        opt = lambda col: [S[c] if c >= 0 else None for c in d[col].tolist()]
+        cgeoms = opt('collision_geom'); meshes = opt('mesh'); cmeshes = opt('collision_mesh')
+        flags = d['flags'].tolist()
+        inertias = _tuples(a['inertia']); coms = _tuples(a['com']); csizes = _tuples(a['collision_size'])
+        com_rpys = _tuples(a['com_rpy'])
+        out = []
+        for i, (name, geom, size, mass, origin, rpy, cgeom, f) in enumerate(zip(
+                names, geoms, _tuples(d['size']), d['mass'].tolist(), _tuples(d['origin']), _tuples(d['rpy']), cgeoms, flags)):
+            inertia = decode_inertia(inertias[i]) if f & HAS_INERTIA else None
+            out.append(Link(name, geom, size, mass, inertia, bool(f & MANUAL_INERTIA), origin, rpy,
+                            bool(f & INCLUDE_COLLISION), cgeom, csizes[i] if f & HAS_COLLISION_SIZE else None,
+                            coms[i] if f & HAS_COM else None, meshes[i], cmeshes[i],
+                            com_rpys[i] if f & HAS_COM_RPY else None))
+        return out
+
+    def flagged(self):
+        """Bool mask over the elements (in order) that link_diagnostics could report on.
+
+        A cheap vectorized superset: only these rows need the per-link checks.
+        """
+        rows = self.rows(); d = self.data[rows]; f = d['flags']; a = self.aux_rows(d)
+        bad = ~(d['mass'] > 0)
+        # manual inertia: Sylvester's criterion, missing entries read as 0 like link_diagnostics
+        manual = (f & MANUAL_INERTIA).astype(bool) & (f & HAS_INERTIA).astype(bool)
+        if manual.any():
+            a0, b, c, dd, e, g = np.nan_to_num(a['inertia'][manual]).T
+            det = a0*(dd*g - e*e) - b*(b*g - e*c) + c*(b*e - dd*c)
+            bad[manual] |= ~((a0 > 0) & (a0*dd - b*b > 0) & (det > 0))
+        S = np.array(self.pool.strings + [None], dtype=object)     # code -1 -> None
+        for geom, size, mesh, present in ((d['geom'], d['size'], d['mesh'], None),
+                                          (d['collision_geom'], a['collision_size'], d['collision_mesh'],
+                                           (f & HAS_COLLISION_SIZE).astype(bool) & (d['collision_geom'] >= 0))):
+            kinds = S[geom]
+            # meshes hold a scale there: any sign, so check |scale|
+            used = np.where((kinds == 'box')[:, None], size, np.where((kinds == 'cylinder')[:, None], size[:, [0, 0, 2]],
+                            np.where((kinds == 'mesh')[:, None], np.abs(size), size[:, [0, 0, 0]])))
+            wrong = ~(used > 0).all(axis=1) | ((kinds == 'mesh') & (mesh < 0))
+            bad |= wrong if present is None else wrong & present
+        empty = self.find('')
+        if empty is not None: bad[np.searchsorted(rows, empty)] = True
+        if self.extra: bad |= np.isin(rows, list(self.extra))
+        return bad
+
+
+class JointTable(ElementTable):
+    def __init__(self, pool, links, capacity=0):
+        super().__init__(JOINT_DTYPE, pool, capacity)
+        self.links = links      # LinkTable parent/child rows point into
+        links.joints = self
+
+    def link_ref(self, name):
+        row = self.links.find(name)
+        return row if row is not None else -(self.pool.code(name) + 1)
+
+    def link_name(self, ref):
+        return self.links._name(ref) if ref >= 0 else self.pool.strings[-ref - 1]
+
+    def relink(self, new_of_old):
+        """The link rows are about to be renumbered: follow them, and turn references to
+        dropped rows into the name (the link row, if that name was added again)."""
+        links = self.links
+        for col in ('parent', 'child'):
+            ref = self.data[col][:self.count]
+            at = np.flatnonzero(ref >= 0)
+            new = new_of_old[ref[at]]
+            for i in at[new < 0].tolist():
+                name = links._name(int(ref[i])); row = links.find(name)
+                ref[i] = new_of_old[row] if row is not None else -(self.pool.code(name) + 1)
+            ref[at[new >= 0]] = new[new >= 0]
+
+    def encode(self, j):
+        extra = {}
+        def vec(attr, value, n=3):
+            t, ok = _floats(value, n)
+            if not ok: extra[attr] = value
+            return t
+        limit = vec('limit', j.limit, 2) if j.limit else (float('nan'),) * 2
+        effort, ok = _scalar(j.effort)
+        if not ok: extra['effort'] = j.effort
+        velocity, ok = _scalar(j.velocity)
+        if not ok: extra['velocity'] = j.velocity
+        return ((self.pool.code(j.jtype), self.link_ref(j.parent), self.link_ref(j.child), HAS_LIMIT if j.limit else 0,
+                 vec('origin_xyz', j.origin_xyz), vec('origin_rpy', j.origin_rpy), vec('axis', j.axis),
+                 limit, effort, velocity), extra)
+
+
+    def _build(self, names, rows):
+        d = self.data[rows]; ref = self.link_name
+        S = self.pool.strings
+        limits = [l if f & HAS_LIMIT else None for l, f in zip(_tuples(d['limit']), d['flags'].tolist())]
+        return [Joint(name, S[t], ref(p), ref(c), xyz, rpy, axis, limit, effort, velocity)
+                for name, t, p, c, xyz, rpy, axis, limit, effort, velocity in zip(
+                    names, d['type'].tolist(), d['parent'].tolist(), d['child'].tolist(), _tuples(d['origin']),
+                    _tuples(d['rpy']), _tuples(d['axis']), limits, d['effort'].tolist(), d['velocity'].tolist())]
+
+    def edges(self):
+        """{joint name: Edge(parent, child)} for graph checks, without going through views."""
+        rows = self.rows(); d = self.data[rows]; ref = self.link_name
+        edges = {n: Edge(ref(p), ref(c)) for n, p, c in zip(self._names(rows.tolist()), d['parent'].tolist(), d['child'].tolist())}
+        for r, e in self.extra.items():
+            name = self._name(r)
+            if name in edges and ('parent' in e or 'child' in e):
+                edges[name] = Edge(e.get('parent', edges[name].parent), e.get('child', edges[name].child))
+        return edges
+
+    def referring(self, name):
+        """Names of the joints (in order) whose parent or child is the link name."""
+        links = self.links; refs = []
+        if name in self.pool.codes: refs.append(-(self.pool.codes[name] + 1))
+        row = links.find(name)
+        if row is not None: refs.append(row)
+        refs += links._removed_rows(name)     # still referenced until the next compaction
+        parent = self.data['parent'][:self.count]; child = self.data['child'][:self.count]
+        hit = np.zeros(self.count, bool)
+        for ref in refs: hit |= (parent == ref) | (child == ref)
+        if self.removed: hit &= (self.data['flags'][:self.count] & DELETED) == 0
+        return self._names(np.flatnonzero(hit).tolist())
+
+    def flagged(self):
+        """Bool mask over the joints (in order) that joint_diagnostics could report on."""
+        rows = self.rows(); d = self.data[rows]
+        S = np.array(self.pool.strings, dtype=object)
+        types = S[d['type']]
+        has_limit = (d['flags'] & HAS_LIMIT).astype(bool)
+        bad = ~np.isin(types, JOINT_TYPES) | (np.isin(types, LIMITED_TYPES) & ~has_limit)
+        bad |= d['parent'] == d['child']
+        for col in ('parent', 'child'):
+            ref = d[col]; empty = np.zeros(len(rows), bool)
+            link_empty = self.links.find('')
+            if link_empty is not None: empty |= ref == link_empty
+            if '' in self.pool.codes: empty |= ref == -(self.pool.codes[''] + 1)
+            bad |= empty
+        moving = ~np.isin(types, ('fixed', 'floating'))
+        bad |= moving & ~(np.einsum('ij,ij->i', d['axis'], d['axis']) > 0)
+        bad |= has_limit & (d['limit'][:, 0] > d['limit'][:, 1])
+        bad |= ~(d['effort'] >= 0) | ~(d['velocity'] >= 0)
+        empty = self.find('')
+        if empty is not None: bad[np.searchsorted(rows, empty)] = True
+        if self.extra: bad |= np.isin(rows, list(self.extra))
+        return bad
+
+
+# ----------------------- Views -----------------------
+def _field(attr, getter):
+    """Property reading a row through getter(table, row); side-dict values win."""
+    def get(self):
+        t = self._t
+        if t.extra:
+            e = t.extra.get(self._r)
+            if e is not None and attr in e: return e[attr]
+        return getter(t, self._r)
+    def set_(self, value):
+        # rare path (edits normally replace whole elements): round-trip through an object
+        t = self._t; el = self.to_element(); setattr(el, attr, value)
+        values, extra = t.encode(el); t._write(self._r, values, extra)
+    return property(get, set_)
+
+def _vector(field, flag=0):
+    if flag:
+        return lambda t, r: tuple(t.data[field][r].tolist()) if t.data['flags'][r] & flag else None
+    return lambda t, r: tuple(t.data[field][r].tolist())
+
+def _aux_vector(field, flag):
+    return lambda t, r: tuple(t.aux[field][t.data['aux'][r]].tolist()) if t.data['flags'][r] & flag else None
+
+def _string(field):
+    # optional string column: -1 is None
+    return lambda t, r: None if t.data[field][r] < 0 else t.pool.strings[t.data[field][r]]
+
+def _flag(flag):
+    return lambda t, r: bool(t.data['flags'][r] & flag)
+
+def _inertia(t, r):
+    if not t.data['flags'][r] & HAS_INERTIA: return None
+    return decode_inertia(t.aux['inertia'][t.data['aux'][r]].tolist())
+
+
+class LinkView:
+    """A row of a LinkTable with the Link attribute API."""
+    __slots__ = ('_t', '_r')
+
+    def __init__(self, table, row):
+        self._t = table; self._r = row
+
+    name = property(lambda self: self._t._name(self._r))
+    geom_type = _field('geom_type', lambda t, r: t.pool.strings[t.data['geom'][r]])
+    size = _field('size', _vector('size'))
+    mass = _field('mass', lambda t, r: float(t.data['mass'][r]))
+    inertia = _field('inertia', _inertia)
+    manual_inertia = _field('manual_inertia', _flag(MANUAL_INERTIA))
+    origin = _field('origin', _vector('origin'))
+    rpy = _field('rpy', _vector('rpy'))
+    include_collision = _field('include_collision', _flag(INCLUDE_COLLISION))
+    collision_geom = _field('collision_geom', _string('collision_geom'))
+    collision_size = _field('collision_size', _aux_vector('collision_size', HAS_COLLISION_SIZE))
+    com = _field('com', _aux_vector('com', HAS_COM))
+    mesh = _field('mesh', _string('mesh'))
+    collision_mesh = _field('collision_mesh', _string('collision_mesh'))
+    com_rpy = _field('com_rpy', _aux_vector('com_rpy', HAS_COM_RPY))
+
+    def to_element(self):
+        """Detached Link with the same values."""
+        return Link(self.name, self.geom_type, self.size, self.mass, self.inertia, self.manual_inertia,
+                    self.origin, self.rpy, self.include_collision, self.collision_geom, self.collision_size, self.com,
+                    self.mesh, self.collision_mesh, self.com_rpy)
+
+    def __repr__(self):
+        return f"<LinkView {self.name!r}>"
+
+
+class JointView:
+    """A row of a JointTable with the Joint attribute API."""
+    __slots__ = ('_t', '_r')
+
+    def __init__(self, table, row):
+        self._t = table; self._r = row
+
+    name = property(lambda self: self._t._name(self._r))
+    jtype = _field('jtype', lambda t, r: t.pool.strings[t.data['type'][r]])
+    parent = _field('parent', lambda t, r: t.link_name(int(t.data['parent'][r])))
+    child = _field('child', lambda t, r: t.link_name(int(t.data['child'][r])))
+    origin_xyz = _field('origin_xyz', _vector('origin'))
+    origin_rpy = _field('origin_rpy', _vector('rpy'))
+    axis = _field('axis', _vector('axis'))
+    limit = _field('limit', lambda t, r: tuple(t.data['limit'][r].tolist()) if t.data['flags'][r] & HAS_LIMIT else None)
+    effort = _field('effort', lambda t, r: float(t.data['effort'][r]))
+    velocity = _field('velocity', lambda t, r: float(t.data['velocity'][r]))
+
+    def to_element(self):
+        return Joint(self.name, self.jtype, self.parent, self.child, self.origin_xyz, self.origin_rpy,
+                     self.axis, self.limit, self.effort, self.velocity)
+
+    def __repr__(self):
+        return f"<JointView {self.name!r}>"
+
+LinkTable.view_type = LinkView
+JointTable.view_type = JointView
+
+
+# ----------------------- Bulk access -----------------------
+def _common_table(elements, view_type):
+    table = None
+    for e in elements:
+        if type(e) is not view_type or (table is not None and e._t is not table): return None
+        table = e._t
+    return table
+
+def link_columns(links):
+    """{'geom', 'mesh' (object arrays), 'size', 'mass', 'origin', 'rpy'} for views of one
+    LinkTable without touching them one by one; None for anything else (plain Links)."""
+    links = links if isinstance(links, list) else list(links)
+    table = _common_table(links, LinkView)
+    if table is None or table.extra: return None
+    rows = table.data[[l._r for l in links]]
+    S = np.array(table.pool.strings + [None], dtype=object)     # code -1 -> None
+    return {'geom': S[rows['geom']], 'mesh': S[rows['mesh']], 'size': rows['size'],
+            'mass': rows['mass'], 'origin': rows['origin'], 'rpy': rows['rpy']}
+
+def joint_columns(joints):
+    """{'origin', 'rpy', 'axis', 'type' (object array)} for views of one JointTable, else None."""
+    joints = joints if isinstance(joints, list) else list(joints)
+    table = _common_table(joints, JointView)
+    if table is None or table.extra: return None
+    rows = table.data[[j._r for j in joints]]
+    return {'origin': rows['origin'], 'rpy': rows['rpy'], 'axis': rows['axis'],
+            'type': np.array(table.pool.strings, dtype=object)[rows['type']]}
+
+
+# ----------------------- Model -----------------------
+class ColumnarURDFModel(URDFModel):
+    """URDFModel whose links/joints live in structured arrays (see module docstring)."""
+    def __init__(self):
+        super().__init__()
+        self.pool = StringPool()
+        self.links = LinkTable(self.pool)
+        self.joints = JointTable(self.pool, self.links)
+
+    def _adopt(self, links, joints):
+        """Fill fresh tables from plain Link/Joint iterables (links first: joints refer to them)."""
+        pool = StringPool()
+        lt = LinkTable(pool, len(links)); jt = JointTable(pool, lt, len(joints))
+        for l in links: lt[l.name] = l
+        for j in joints: jt[j.name] = j
+        return pool, lt, jt
+
+    def replace_with(self, other):
+        if isinstance(other.links, LinkTable):
+            self.pool, self.links, self.joints = other.pool, other.links, other.joints
+        else:
+            self.pool, self.links, self.joints = self._adopt(list(other.links.values()), list(other.joints.values()))
+        self.duplicates = other.duplicates
+        self._notify('reset')
+
+    def snapshot(self):
+        snap = ColumnarURDFModel()
+        snap.pool = self.pool.copy()
+        snap.links = self.links.copy(snap.pool)
+        snap.joints = self.joints.copy(snap.pool); snap.joints.links = snap.links; snap.links.joints = snap.joints
+        snap.duplicates = list(self.duplicates)
+        snap._fragments = self._fragments
+        snap.revision = self.revision
+        return snap
+
+    def remove_link(self, name, cascade=True):
+        """URDFModel.remove_link, finding the referencing joints column-wise rather than per view."""
+        if name not in self.links: return []
+        to_delete = self.joints.referring(name) if cascade else []
+        del self.links[name]
+        for jn in to_delete: del self.joints[jn]
+        self._notify('removed', 'link', name)
+        for jn in to_delete: self._notify('removed', 'joint', jn)
+        return to_delete
+
+    def flagged_elements(self):
+        """{('link'|'joint', name)} that may have per-element diagnostics; the rest have none."""
+        out = set()
+        for kind, table in (('link', self.links), ('joint', self.joints)):
+            names = table.keys()
+            out.update((kind, names[i]) for i in np.flatnonzero(table.flagged()).tolist())
+        return out
+
+    def validate(self):
+        """Same diagnostics as validate_model(), with per-element checks only on flagged rows."""
+        out = []
+        for table, check in ((self.links, link_diagnostics), (self.joints, joint_diagnostics)):
+            names = table.keys()
+            for i in np.flatnonzero(table.flagged()).tolist(): out += check(table[names[i]])
+        return out + graph_diagnostics(self.links, self.joints.edges(), self.duplicates)
+
+    @classmethod
+    def from_model(cls, model):
+        out = cls()
+        out.pool, out.links, out.joints = out._adopt(list(model.links.values()), list(model.joints.values()))
+        out.duplicates = list(model.duplicates)
+        return out
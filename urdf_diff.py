@@ -0,0 +1,418 @@
+"""Structural diff and three-way merge of URDF models.
+
+Every link gets a content hash of its fields (not its name) and a Merkle hash of its
+kinematic subtree: its content plus the sorted (joint content, child subtree) hashes of
+its child joints. Elements are matched by name first; what is left is matched by subtree
+hash under the same parent, as the child of a same-named joint, by subtree hash anywhere
+(a renamed and moved subtree) and by content under the same parent; leftover joints are
+matched by the links they connect. Everything is a few dict
+passes over the models, so two 50k-link models compare in well under a second once loaded.
+
+    python urdf_builder_gui.py diff old.urdf new.urdf [--json]
+    python urdf_builder_gui.py merge base.urdf ours.urdf theirs.urdf --out merged.urdf
+"""
+import argparse
+import copy
+import gc
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+from urdf_model import URDFModel, URDFParseError, has_manual_inertia, joint_signature, link_signature
+
+# attribute names in signature order (after the name)
+LINK_FIELDS = ('geom_type', 'size', 'mass', 'inertia', 'manual_inertia', 'origin', 'rpy', 'include_collision',
+               'collision_geom', 'collision_size', 'com', 'mesh', 'collision_mesh', 'com_rpy')
+INERTIA_AT = tuple(LINK_FIELDS.index(f) for f in ('inertia', 'manual_inertia', 'com', 'com_rpy'))
+JOINT_FIELDS = ('jtype', 'parent', 'child', 'origin_xyz', 'origin_rpy', 'axis', 'limit', 'effort', 'velocity')
+
+
+def _elements(items):
+    # array-backed tables (urdf_columnar) hand out views onto rows; read detached copies
+    if hasattr(items, 'elements'): return items.elements(list(items))
+    return list(items.values())
+
+@contextmanager
+def _no_gc():
+    # millions of small tuples: the cyclic GC would otherwise rescan them many times over
+    enabled = gc.isenabled(); gc.disable()
+    try:
+        yield
+    finally:
+        if enabled: gc.enable()
+
+def _link_values(link):
+    return link_signature(link)[1:]
+
+def _joint_values(joint):
+    return joint_signature(joint)[1:]
+
+
+# ----------------------- Hashing -----------------------
+class ModelHashes:
+    """Content and subtree hashes of one model, plus its parent/child structure.
+
+    A link with several parent joints hangs under the first one (as in KinematicTree);
+    links on a cycle or below one only get their own content in their subtree hash.
+    """
+    def __init__(self, model):
+        self.links = {l.name: l for l in _elements(model.links)}
+        self.joints = {j.name: j for j in _elements(model.joints)}
+        self.values = {n: _link_values(l) for n, l in self.links.items()}
+        self._unmark_generated_inertia()
+        self.content = {n: hash(v) for n, v in self.values.items()}
+        # joint content without the link names it connects: structure carries those
+        self.joint_values = {n: _joint_values(j) for n, j in self.joints.items()}
+        self.joint_content = {n: hash(v[:1] + v[3:]) for n, v in self.joint_values.items()}
+        self.parent_joint = {}      # child link -> joint name
+        self.children = {}          # parent link -> [joint names]
+        for jn, j in self.joints.items():
+            if j.child in self.links and j.parent in self.links and j.child not in self.parent_joint:
+                self.parent_joint[j.child] = jn
+                self.children.setdefault(j.parent, []).append(jn)
+        self.order = self._preorder()
+        # children before parents: each pushes (joint content, subtree hash) up to its parent
+        self.subtree = {}; kids = {}
+        for name in reversed(self.order):
+            k = kids.pop(name, None)
+            h = self.subtree[name] = hash((self.content[name], tuple(sorted(k)) if k else ()))
+            jn = self.parent_joint.get(name)
+            if jn is not None: kids.setdefault(self.joints[jn].parent, []).append((self.joint_content[jn], h))
+
+    def _unmark_generated_inertia(self):
+        """Compare an <inertial> that is exactly what would be generated from the shape as generated.
+
+        Exported files spell the generated inertia out, so it reads back as a manual one.
+        """
+        manual = [l for l in self.links.values() if has_manual_inertia(l)]
+        if not manual: return
+        from urdf_inertia import auto_inertials    # NumPy only when something needs it
+        auto = auto_inertials(manual)
+        for l in manual:
+            if l.inertia == dict(auto[l.name]) and (l.com is None or tuple(l.com) == tuple(l.origin)) and not l.com_rpy:
+                v = list(self.values[l.name])
+                for i, x in zip(INERTIA_AT, (None, False, None, None)): v[i] = x
+                self.values[l.name] = tuple(v)
+
+    def _preorder(self):
+        """Links parents-first from every root; links only reachable through a cycle come last."""
+        order = []; seen = set()
+        stack = [n for n in reversed(list(self.links)) if n not in self.parent_joint]
+        while stack:
+            name = stack.pop()
+            if name in seen: continue
+            seen.add(name); order.append(name)
+            stack.extend(self.joints[jn].child for jn in reversed(self.children.get(name, ())))
+        order += [n for n in self.links if n not in seen]
+        return order
+
+    def parent_of(self, link):
+        jn = self.parent_joint.get(link)
+        return self.joints[jn].parent if jn is not None else None
+
+
+# ----------------------- Diff -----------------------
+class ModelDiff:
+    """Differences from model a to model b.
+
+    link_map/joint_map send each matched element's name in a to its name in b. Entries:
+    added/removed [(kind, name)], renamed [(kind, old, new)], moved [(link b name, old
+    parent, new parent)] (parents by their a and b names), modified [(kind, b name, fields)].
+    """
+    def __init__(self):
+        self.link_map = {}; self.joint_map = {}
+        self.added = []; self.removed = []; self.renamed = []; self.moved = []; self.modified = []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed or self.moved or self.modified)
+
+    def summary(self):
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.renamed)} renamed, "
+                f"{len(self.moved)} moved, {len(self.modified)} modified")
+
+    def entries(self):
+        """(line, kind, name in b or None) per change: + added, - removed, > renamed, ^ moved, ~ modified."""
+        out = [(f"- {k} {n}", k, None) for k, n in self.removed]
+        out += [(f"+ {k} {n}", k, n) for k, n in self.added]
+        out += [(f"> {k} {old} -> {new}", k, new) for k, old, new in self.renamed]
+        out += [(f"^ link {n}: parent {old} -> {new}", 'link', n) for n, old, new in self.moved]
+        out += [(f"~ {k} {n}: {', '.join(fields)}", k, n) for k, n, fields in self.modified]
+        return out
+
+    def lines(self):
+        return [e[0] for e in self.entries()]
+
+    def to_dict(self):
+        return {'added': [list(e) for e in self.added], 'removed': [list(e) for e in self.removed],
+                'renamed': [list(e) for e in self.renamed], 'moved': [list(e) for e in self.moved],
+                'modified': [[k, n, list(f)] for k, n, f in self.modified]}
+
+
+def _match_links(ha, hb):
+    """a name -> b name for every link both models have, including renames."""
+    mapping = {n: n for n in hb.links if n in ha.links}
+    left = [n for n in ha.order if n not in mapping]
+    if not left: return mapping
+    taken = set(mapping.values())
+    inverse = {}
+    def claim(pool, key, name):
+        cands = pool.get(key)
+        while cands:
+            cand = cands.pop()
+            if cand not in mapping:
+                mapping[cand] = name; inverse[name] = cand; return True
+        return False
+    def parent_in_a(n):
+        p = hb.parent_of(n)
+        return inverse.get(p, p if p in taken else None)
+    def pool(key):
+        out = {}
+        for n in reversed(left):      # candidates are popped from the end: earliest first
+            if n not in mapping: out.setdefault(key(n), []).append(n)
+        return out
+    pending = [n for n in hb.order if n not in taken]
+    # same subtree under the same parent (parents first, so renamed parents count)
+    by_key = pool(lambda n: (ha.subtree[n], ha.parent_of(n)))
+    for n in pending: claim(by_key, (hb.subtree[n], parent_in_a(n)), n)
+    # still the child of the same-named joint: renamed, maybe edited
+    for n in pending:
+        if n in inverse: continue
+        jn = hb.parent_joint.get(n)
+        cand = ha.joints[jn].child if jn in ha.joints else None
+        if cand in ha.links and cand not in mapping: mapping[cand] = n; inverse[n] = cand
+    # same subtree anywhere: renamed and moved
+    by_hash = pool(lambda n: ha.subtree[n])
+    for n in pending:
+        if n not in inverse: claim(by_hash, hb.subtree[n], n)
+    # same content under the same parent: renamed, with its subtree changed
+    by_content = pool(lambda n: (ha.content[n], ha.parent_of(n)))
+    for n in pending:
+        if n not in inverse: claim(by_content, (hb.content[n], parent_in_a(n)), n)
+    return mapping
+
+def _match_joints(ha, hb, link_map):
+    mapping = {n: n for n in hb.joints if n in ha.joints}
+    taken = set(mapping.values())
+    ends = {}
+    for n, j in ha.joints.items():
+        if n not in mapping: ends.setdefault((link_map.get(j.parent), link_map.get(j.child)), []).append(n)
+    for n, j in hb.joints.items():
+        if n in taken: continue
+        for cand in ends.get((j.parent, j.child), ()):
+            if cand not in mapping: mapping[cand] = n; break
+    return mapping
+
+def _changed_fields(fields, before, after):
+    return tuple(f for f, x, y in zip(fields, before, after) if x != y)
+
+def diff_models(a, b):
+    """ModelDiff from URDFModel a to URDFModel b."""
+    with _no_gc():
+        return _diff(ModelHashes(a), ModelHashes(b))
+
+def _diff(ha, hb):
+    d = ModelDiff()
+    d.link_map = lm = _match_links(ha, hb)
+    d.joint_map = jm = _match_joints(ha, hb, lm)
+    for kind, names, mapping in (('link', ha.links, lm), ('joint', ha.joints, jm)):
+        d.removed += [(kind, n) for n in names if n not in mapping]
+        d.renamed += [(kind, n, mapping[n]) for n in names if n in mapping and mapping[n] != n]
+    for kind, names, mapping in (('link', hb.links, lm), ('joint', hb.joints, jm)):
+        got = set(mapping.values())
+        d.added += [(kind, n) for n in names if n not in got]
+    for n in ha.order:
+        m = lm.get(n)
+        if m is None: continue
+        if ha.values[n] != hb.values[m]:
+            d.modified.append(('link', m, _changed_fields(LINK_FIELDS, ha.values[n], hb.values[m])))
+        pa = ha.parent_of(n); pb = hb.parent_of(m)
+        if (lm.get(pa) if pa is not None else None) != pb: d.moved.append((m, pa, pb))
+    for n, j in ha.joints.items():
+        m = jm.get(n)
+        if m is None: continue
+        before = list(ha.joint_values[n]); after = hb.joint_values[m]
+        before[1] = lm.get(before[1], before[1]); before[2] = lm.get(before[2], before[2])   # compare ends under renames
+        fields = _changed_fields(JOINT_FIELDS, before, after)
+        if fields: d.modified.append(('joint', m, fields))
+    return d
+
+
+# ----------------------- Three-way merge -----------------------
+class MergeResult:
+    """model: the merged URDFModel; conflicts: [(kind, name, field or None, message)], resolved to ours."""
+    def __init__(self, model, conflicts):
+        self.model = model
+        self.conflicts = conflicts
+
+    def lines(self):
+        return [f"! {k} {n}{'.' + f if f else ''}: {msg}" for k, n, f, msg in self.conflicts]
+
+
+def _merge_values(kind, name, fields, vb, vo, vt, conflicts):
+    """Which side to take a base element's fields from: None (it goes), 'ours', 'theirs' or one per field.
+
+    vb/vo/vt are comparable tuples aligned with fields; vo/vt are None where that side
+    no longer has the element.
+    """
+    if vo is None and vt is None: return None
+    if vo is None or vt is None:
+        side = 'theirs' if vo is None else 'ours'
+        if (vt if vo is None else vo) == vb: return None     # removed on one side, untouched on the other
+        conflicts.append((kind, name, None, f"removed in {'ours' if vo is None else 'theirs'}, changed in {side}"))
+        return 'ours' if vo is not None else None
+    if vo == vt or vt == vb: return 'ours'
+    if vo == vb: return 'theirs'
+    take = []
+    for f, b, o, t in zip(fields, vb, vo, vt):
+        if o == t or t == b: take.append('ours')
+        elif o == b: take.append('theirs')
+        else:
+            take.append('ours')
+            conflicts.append((kind, name, f, "renamed differently on both sides" if f == 'name' else "changed differently on both sides"))
+    return take
+
+def merge_models(base, ours, theirs):
+    """Three-way merge of two edited versions of base, field by field -> MergeResult.
+
+    A change made on one side only is taken; the same change on both sides is taken
+    once; different changes to the same field (or a removal against an edit, or two
+    different renames) are conflicts, resolved in favour of ours and reported. Joints
+    follow renames of the links they connect made on either side.
+    """
+    with _no_gc():
+        return _merge(base, ours, theirs)
+
+def _merge(base, ours, theirs):
+    hb = ModelHashes(base)
+    (ho, do), (ht, dt) = sides = [(h, _diff(hb, h)) for h in (ModelHashes(ours), ModelHashes(theirs))]
+    conflicts = []
+    # a link is identified by its base name, or (side, name) if that side added it
+    keys = {side: {m: ('base', n) for n, m in d.link_map.items()} for side, (h, d) in zip(('ours', 'theirs'), sides)}
+    def key(side, name):
+        return ('base', name) if side == 'base' else keys[side].get(name, (side, name))
+
+    link_fields = ('name',) + LINK_FIELDS
+    def link_values(h, name):
+        return None if name is None else (name,) + h.values[name]
+    merged = []             # (key, Link)
+    for n in hb.order:
+        o = do.link_map.get(n); t = dt.link_map.get(n)
+        take = _merge_values('link', n, link_fields, link_values(hb, n), link_values(ho, o), link_values(ht, t), conflicts)
+        if take is None: continue
+        if take == 'ours': el = ho.links[o]
+        elif take == 'theirs': el = ht.links[t]
+        else:
+            el = copy.copy(ho.links[o])
+            for f, side in zip(link_fields, take):
+                if side == 'theirs': setattr(el, f, getattr(ht.links[t], f))
+            if not (ht.values[t] if take[1 + INERTIA_AT[1]] == 'theirs' else ho.values[o])[INERTIA_AT[1]]:
+                el.inertia = None; el.manual_inertia = False; el.com = None; el.com_rpy = None   # regenerate it for the merged shape/mass
+        merged.append((('base', n), el))
+    for side, (h, d) in zip(('ours', 'theirs'), sides):
+        matched = set(d.link_map.values())
+        merged += [((side, n), h.links[n]) for n in h.order if n not in matched]
+    final = {}; links = {}  # key -> merged link name; name -> Link
+    for k, el in merged:
+        final[k] = el.name
+        cur = links.get(el.name)
+        if cur is None: links[el.name] = el
+        elif _link_values(cur) != _link_values(el):
+            conflicts.append(('link', el.name, None, "two different links end up with this name; kept the first"))
+
+    joint_fields = ('name',) + JOINT_FIELDS
+    def joint_values(h, side, name):
+        if name is None: return None
+        v = h.joint_values[name]
+        return (name, v[0], key(side, v[1]), key(side, v[2])) + v[3:]
+    def finish(el, parent, child):
+        # link names as merged, taken from the side each end came from: (side, Joint)
+        out = copy.copy(el)
+        out.parent = final.get(key(parent[0], parent[1].parent), parent[1].parent)
+        out.child = final.get(key(child[0], child[1].child), child[1].child)
+        return out
+    joints = {}
+    def place(el):
+        cur = joints.get(el.name)
+        if cur is None: joints[el.name] = el
+        elif _joint_values(cur) != _joint_values(el):
+            conflicts.append(('joint', el.name, None, "two different joints end up with this name; kept the first"))
+    for n in hb.joints:
+        o = do.joint_map.get(n); t = dt.joint_map.get(n)
+        take = _merge_values('joint', n, joint_fields, joint_values(hb, 'base', n), joint_values(ho, 'ours', o),
+                             joint_values(ht, 'theirs', t), conflicts)
+        if take is None: continue
+        if take == 'ours' or take == 'theirs':
+            src = (take, ho.joints[o] if take == 'ours' else ht.joints[t])
+            place(finish(src[1], src, src)); continue
+        ours_j = ('ours', ho.joints[o]); theirs_j = ('theirs', ht.joints[t])
+        ends = {f: theirs_j if side == 'theirs' else ours_j for f, side in zip(joint_fields, take)}
+        el = finish(ours_j[1], ends['parent'], ends['child'])
+        for f, side in zip(joint_fields, take):
+            if side == 'theirs' and f not in ('parent', 'child'): setattr(el, f, getattr(theirs_j[1], f))
+        place(el)
+    for side, (h, d) in zip(('ours', 'theirs'), sides):
+        matched = set(d.joint_map.values())
+        for n, j in h.joints.items():
+            if n not in matched: place(finish(j, (side, j), (side, j)))
+    model = URDFModel()
+    model.links = links; model.joints = joints
+    return MergeResult(model, conflicts)
+
+
+# ----------------------- CLI -----------------------
+def load_model(path):
+    """URDF or .urdfp project file -> URDFModel."""
+    if path.endswith('.urdfp'):
+        from urdf_project import load_project
+        return load_project(path)
+    model = URDFModel()
+    with _no_gc(): model.load_from_file(path)
+    return model
+
+def preload_meshes(models, paths):
+    """Load the mesh files of generated inertias now, so they are compared and written the same way
+    every run instead of depending on background loads."""
+    meshes = [l.mesh for m in models for l in m.links.values() if l.geom_type == 'mesh' and l.mesh]
+    if not meshes: return
+    from urdf_mesh import default_cache
+    default_cache.set_search_paths(dict.fromkeys(os.path.dirname(os.path.abspath(p)) for p in paths))
+    default_cache.preload(meshes)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="urdf_builder_gui.py", description="Structural diff and three-way merge of URDF files.")
+    sub = ap.add_subparsers(dest='command')
+    p = sub.add_parser('diff', help="list added, removed, renamed, moved and modified links/joints")
+    p.add_argument('a'); p.add_argument('b')
+    p.add_argument('--json', action='store_true', help="print the changes as JSON")
+    p = sub.add_parser('merge', help="merge two edited versions of a base file")
+    p.add_argument('base'); p.add_argument('ours'); p.add_argument('theirs')
+    p.add_argument('--out', '-o', help="merged URDF (default: stdout)")
+    args = ap.parse_args(argv)
+    if args.command is None:
+        ap.print_help(); return 2
+    paths = (args.a, args.b) if args.command == 'diff' else (args.base, args.ours, args.theirs)
+    try:
+        models = [load_model(path) for path in paths]
+    except (URDFParseError, OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr); return 2
+    preload_meshes(models, paths)
+    if args.command == 'diff':
+        d = diff_models(*models)
+        if args.json: print(json.dumps(d.to_dict(), indent=2))
+        else:
+            for line in d.lines(): print(line)
+            print(d.summary())
+        return 1 if d else 0
+    result = merge_models(*models)
+    text = result.model.to_urdf_string()
+    if args.out:
+        with open(args.out, 'w') as f: f.write(text)
+    else:
+        sys.stdout.write(text)
+    for line in result.lines(): print(line, file=sys.stderr)
+    return 1 if result.conflicts else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""URDF text editor that stays responsive on multi-megabyte documents.
+
+URDFEditor only replaces the span of text that changed when the model is regenerated, and
+XMLHighlighter formats just the blocks on screen instead of the whole document.
+"""
+import re
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QColor, QFont, QFontDatabase, QTextCharFormat, QTextCursor, QTextLayout
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from urdf_model import common_affixes
+
+# ----------------------- Highlighting -----------------------
+_TOKENS = re.compile(r'(?P<comment><!--)|(?P<pi><\?.*?(?:\?>|$))|(?P<tag></?[\w:.-]+|/?>)'
+                     r'|(?P<attr>[\w:.-]+)(?=\s*=)|(?P<value>"[^"]*"?|\'[^\']*\'?)')
+
+def _char_format(color, bold=False, italic=False):
+    f = QTextCharFormat(); f.setForeground(QColor(color))
+    if bold: f.setFontWeight(QFont.Bold)
+    if italic: f.setFontItalic(True)
+    return f
+
+def scan_line(text, in_comment):
+    """XML tokens of one line -> ([(start, length, kind)], whether it ends inside a comment)."""
+    spans = []; i = 0; n = len(text)
+    if in_comment:
+        end = text.find('-->')
+        if end < 0: return ([(0, n, 'comment')] if n else []), True
+        i = end + 3; spans.append((0, i, 'comment'))
+    while True:
+        m = _TOKENS.search(text, i)
+        if m is None: return spans, False
+        kind = m.lastgroup; start = m.start(); i = m.end()
+        if kind == 'comment':
+            end = text.find('-->', i)
+            if end < 0:
+                spans.append((start, n - start, kind)); return spans, True
+            i = end + 3
+        spans.append((start, i - start, kind))
+
+def _ends_in_comment(text, in_comment):
+    if '<!--' not in text and '-->' not in text: return in_comment
+    return scan_line(text, in_comment)[1]
+
+def _utf16_offsets(text, offsets):
+    # QTextLayout positions count UTF-16 code units, Python strings count code points
+    if text.isascii(): return offsets
+    return [len(text[:i].encode('utf-16-le')) // 2 for i in offsets]
+
+
+class XMLHighlighter:
+    """Formats the visible blocks of a QPlainTextEdit as XML, on demand.
+
+    QSyntaxHighlighter formats every block up front, which for a URDF of 100k lines is
+    seconds of Python per reload. Here a zero-timer after each repaint request formats the
+    blocks on screen that are not formatted yet. Multi-line comments are tracked in each
+    block's userState (bit 0: starts inside a comment, bit 1: ends inside one, bit 2:
+    formatted; -1 unknown); after an edit only the dirty span is rescanned, and only as
+    far as the screen needs it.
+    """
+    FORMATS = {
+        'tag': _char_format('#1f4e9c', bold=True),
+        'attr': _char_format('#7a3e9d'),
+        'value': _char_format('#2e7d32'),
+        'comment': _char_format('#808080', italic=True),
+        'pi': _char_format('#808080'),
+    }
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.doc = editor.document()
+        self._dirty = (0, 0)     # (start position, distance of its end from the document end)
+        self._busy = False
+        self._timer = QTimer(editor); self._timer.setSingleShot(True); self._timer.setInterval(0)
+        self._timer.timeout.connect(self.format_visible)
+        self.doc.contentsChange.connect(self._on_contents_change)
+        editor.updateRequest.connect(lambda *_: self._timer.start())
+
+    def _on_contents_change(self, pos, removed, added):
+        if self._busy: return       # our own markContentsDirty()
+        for p in (pos, pos + added):
+            block = self.doc.findBlock(p)
+            if block.isValid(): block.setUserState(-1)
+        tail = max(0, self.doc.characterCount() - pos - added)
+        if self._dirty is None: self._dirty = (pos, tail)
+        else: self._dirty = (min(self._dirty[0], pos), min(self._dirty[1], tail))
+
+    def _repair(self, upto):
+        """Recompute comment states of the dirty span, stopping after block number upto."""
+        if self._dirty is None: return
+        start, tail = self._dirty
+        block = self.doc.findBlock(start)
+        end = self.doc.characterCount() - tail
+        prev = block.previous()
+        inside = prev.isValid() and prev.userState() >= 0 and bool(prev.userState() & 2)
+        while block.isValid():
+            state = block.userState()
+            known = state >= 0 and bool(state & 1) == inside
+            if known and block.position() > end:
+                break           # consistent with everything before it again
+            if block.blockNumber() > upto:
+                self._dirty = (block.position(), max(0, min(tail, self.doc.characterCount() - block.position() - block.length())))
+                return
+            exit_ = bool(state & 2) if known else _ends_in_comment(block.text(), inside)
+            block.setUserState(int(inside) | (int(exit_) << 1) | (state & 4 if known else 0))
+            inside = exit_; block = block.next()
+        self._dirty = None
+
+    def _ranges(self, text, spans):
+        if not text.isascii():
+            starts = _utf16_offsets(text, [s for s, _, _ in spans])
+            ends = _utf16_offsets(text, [s + n for s, n, _ in spans])
+            spans = [(a, b - a, k) for a, b, (_, _, k) in zip(starts, ends, spans)]
+        out = []
+        for start, length, kind in spans:
+            r = QTextLayout.FormatRange(); r.start = start; r.length = length; r.format = self.FORMATS[kind]
+            out.append(r)
+        return out
+
+    def format_visible(self):
+        ed = self.editor
+        block = ed.firstVisibleBlock()
+        offset = ed.contentOffset(); height = ed.viewport().height()
+        blocks = []
+        while block.isValid() and ed.blockBoundingGeometry(block).translated(offset).top() <= height:
+            blocks.append(block); block = block.next()
+        if not blocks: return
+        self._repair(blocks[-1].blockNumber())
+        first = end = None
+        for block in blocks:
+            state = block.userState()
+            if state < 0 or state & 4: continue
+            text = block.text()
+            block.layout().setFormats(self._ranges(text, scan_line(text, bool(state & 1))[0]))
+            block.setUserState(state | 4)
+            if first is None: first = block.position()
+            end = block.position() + block.length()
+        if first is not None:
+            self._busy = True
+            try: self.doc.markContentsDirty(first, end - first)
+            finally: self._busy = False
+
+
+# ----------------------- Editor -----------------------
+class URDFEditor(QPlainTextEdit):
+    """Unwrapped, monospace, lazily highlighted URDF editor.
+
+    set_model_text() is how generated XML gets in: only the span between the common prefix
+    and suffix of the old and new text is replaced, so a one-link change in a large document
+    re-lays out a few lines instead of reloading everything, and scroll position and cursor
+    survive. synced_text is the text last set that way (the base for incremental apply).
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.highlighter = XMLHighlighter(self)
+        self.synced_text = ""
+        self._syncing = False
+        self._edited = False        # user typed since the last set_model_text()
+        self.textChanged.connect(self._on_text_changed)
+
+    def _on_text_changed(self):
+        if not self._syncing: self._edited = True
+
+    def set_model_text(self, text):
+        old = self.toPlainText() if self._edited else self.synced_text
+        self._syncing = True
+        try:
+            if not old:
+                self.setPlainText(text)
+            elif old != text:
+                p, s = common_affixes(old, text)
+                a, b = _utf16_offsets(old, [p, len(old) - s])
+                bar = self.verticalScrollBar(); value = bar.value()
+                doc = self.document()
+                doc.setUndoRedoEnabled(False)       # like setPlainText: model updates are not undoable
+                cur = QTextCursor(doc)
+                cur.setPosition(a); cur.setPosition(b, QTextCursor.KeepAnchor)
+                cur.insertText(text[p:len(text) - s])
+                doc.setUndoRedoEnabled(True)
+                bar.setValue(value)
+        finally:
+            self._syncing = False
+        self.synced_text = text; self._edited = False
@@ -0,0 +1,1300 @@
+import io
+import os
+from PyQt5.QtWidgets import (
+    QWidget, QLabel, QLineEdit, QComboBox, QPushButton,
+    QVBoxLayout, QHBoxLayout, QFormLayout, QFileDialog, QMessageBox,
+    QGroupBox, QCheckBox, QListWidget, QListWidgetItem, QGridLayout, QSizePolicy,
+    QSlider, QScrollArea, QSpinBox, QListView, QCompleter, QProgressBar, QShortcut, QApplication, QPlainTextEdit, QDialog
+)
+from PyQt5.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QStringListModel, pyqtSignal
+from PyQt5.QtGui import QKeySequence
+
+from urdf_model import Link, Joint, URDFModel, URDFParseError
+from urdf_kinematics import TrajectoryPlayer, joint_range, load_trajectory_csv, movable_joints
+from urdf_validation import ModelValidator
+from urdf_inertia import MassProperties
+from urdf_collision import CollisionChecker
+from urdf_mesh import default_cache
+from urdf_jobs import LatestJobRunner, parse_job, serialize_job
+from urdf_editor import URDFEditor
+from urdf_project import ProjectFormatError, ProjectStore
+from urdf_history import History
+from urdf_templates import Expansion, Template, TemplateError, parse_params
+from urdf_diff import diff_models, load_model, merge_models
+from urdf_profile import profiled, profiler
+
+# ----------------------- Element list model -----------------------
+class ElementListModel(QAbstractListModel):
+    """Live list of link and/or joint names over a URDFModel.
+
+    Rows follow the model's edit notifications with row-level insert/remove signals, so
+    views and completers on top never rebuild; links come first, then joints.
+    """
+    LABELS = {'link': "Link", 'joint': "Joint"}
+
+    def __init__(self, model, kinds=('link', 'joint'), prefixed=True, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.kinds = kinds
+        self.prefixed = prefixed
+        self._sections = {}     # kind -> [names] in model order
+        self.revision = 0       # bumped whenever rows are inserted, removed or reset
+        self._load()
+        model.subscribe(self._on_model_event)
+
+    def _load(self):
+        self._sections = {k: list(self.model.links if k == 'link' else self.model.joints) for k in self.kinds}
+
+    def _offset(self, kind):
+        off = 0
+        for k in self.kinds:
+            if k == kind: return off
+            off += len(self._sections[k])
+
+    def _on_model_event(self, event, kind, name):
+        if event == 'reset' or kind is None:
+            self.revision += 1
+            self.beginResetModel(); self._load(); self.endResetModel(); return
+        names = self._sections.get(kind)
+        if names is None or event == 'changed': return
+        self.revision += 1
+        if event == 'added':
+            row = self._offset(kind) + len(names)
+            self.beginInsertRows(QModelIndex(), row, row); names.append(name); self.endInsertRows()
+        elif event == 'removed' and name in names:
+            i = names.index(name); row = self._offset(kind) + i
+            self.beginRemoveRows(QModelIndex(), row, row); del names[i]; self.endRemoveRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else sum(len(v) for v in self._sections.values())
+
+    def element(self, row):
+        for k in self.kinds:
+            names = self._sections[k]
+            if row < len(names): return k, names[row]
+            row -= len(names)
+        return None
+
+    def row_of(self, kind, name):
+        names = self._sections.get(kind, ())
+        return self._offset(kind) + names.index(name) if name in names else -1
+
+    def names(self):
+        return [n for k in self.kinds for n in self._sections[k]]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        el = self.element(index.row())
+        if el is None: return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return f"{self.LABELS[el[0]]}: {el[1]}" if self.prefixed and role == Qt.DisplayRole else el[1]
+        if role == Qt.UserRole:
+            return el
+        return None
+
+# ----------------------- Compare / merge results -----------------------
+class ChangesDialog(QDialog):
+    """Lines of a model diff or merge; double-clicking one loads its element in the editor."""
+    COLORS = {'+': Qt.darkGreen, '-': Qt.red, '!': Qt.red, '~': Qt.darkYellow}
+    LIMIT = 2000
+
+    def __init__(self, title, summary, entries, select, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.select = select
+        lay = QVBoxLayout(self)
+        lay.addWidget(QLabel(summary))
+        self.list = QListWidget()
+        for line, kind, name in entries[:self.LIMIT]:
+            it = QListWidgetItem(line)
+            if line[:1] in self.COLORS: it.setForeground(self.COLORS[line[:1]])
+            if name is not None: it.setData(Qt.UserRole, (kind, name))
+            self.list.addItem(it)
+        if len(entries) > self.LIMIT:
+            self.list.addItem(f"... {len(entries) - self.LIMIT} more")
+        self.list.itemDoubleClicked.connect(self._select)
+        lay.addWidget(self.list)
+        self.resize(560, 420)
+
+    def _select(self, item):
+        target = item.data(Qt.UserRole)
+        if target: self.select(*target)
+
+# ----------------------- Joint state panel -----------------------
+class JointStatePanel(QWidget):
+    """One slider per movable joint, plus fixed-rate playback of a joint-trajectory CSV.
+
+    Slider moves and playback ticks only set joint values on the viewer's KinematicTree,
+    which recomputes the affected subtree, and request a single pose-only repaint.
+    """
+    STEPS = 1000
+    moved = pyqtSignal()    # joint values changed (sliders, Zero, playback)
+
+    def __init__(self, model, gl):
+        super().__init__()
+        self.model = model
+        self.gl = gl
+        self.kinematics = gl.kinematics
+        self.rows = {}          # joint name -> (slider, value label, lower, upper)
+        self._signature = None
+        self.player = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._on_tick)
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(0,0,0,0)
+        ctl = QHBoxLayout()
+        self.load_traj_btn = QPushButton("Load Trajectory")
+        self.load_traj_btn.clicked.connect(self._load_trajectory)
+        self.play_btn = QPushButton("Play")
+        self.play_btn.setCheckable(True)
+        self.play_btn.toggled.connect(self._toggle_playback)
+        self.rate_spin = QSpinBox()
+        self.rate_spin.setRange(1, 240); self.rate_spin.setValue(60); self.rate_spin.setSuffix(" fps")
+        self.rate_spin.valueChanged.connect(lambda v: self.timer.setInterval(int(1000 / v)))
+        self.zero_btn = QPushButton("Zero")
+        self.zero_btn.clicked.connect(self._zero)
+        self.traj_label = QLabel("")
+        for w in (self.load_traj_btn, self.play_btn, self.rate_spin, self.zero_btn): ctl.addWidget(w)
+        ctl.addWidget(self.traj_label, 1)
+        lay.addLayout(ctl)
+
+        self.sliders_widget = QWidget()
+        self.sliders_form = QFormLayout(self.sliders_widget)
+        self.sliders_form.setVerticalSpacing(2)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(self.sliders_widget)
+        lay.addWidget(scroll)
+
+    def refresh(self):
+        """Rebuild slider rows when the set of movable joints or their limits changed."""
+        joints = movable_joints(self.model)
+        sig = [(j.name, joint_range(j)) for j in joints]
+        if sig == self._signature: return
+        self._signature = sig
+        while self.sliders_form.rowCount(): self.sliders_form.removeRow(0)
+        self.rows = {}
+        for j in joints:
+            lo, hi = joint_range(j)
+            value = min(max(self.kinematics.positions.get(j.name, 0.0), lo), hi)
+            self.kinematics.set_joint_position(j.name, value)
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(0, self.STEPS)
+            slider.setValue(self._to_step(value, lo, hi))
+            label = QLabel(f"{value:.3f}")
+            label.setMinimumWidth(50)
+            slider.valueChanged.connect(lambda step, n=j.name: self._on_slider(n, step))
+            row = QHBoxLayout(); row.addWidget(slider, 1); row.addWidget(label)
+            self.sliders_form.addRow(j.name, row)
+            self.rows[j.name] = (slider, label, lo, hi)
+        if self.player is not None and not set(self.player.names) <= set(self.rows):
+            self.play_btn.setChecked(False)
+            self.player = None; self.traj_label.setText("")
+
+    def _to_step(self, value, lo, hi):
+        return int(round((value - lo) / (hi - lo) * self.STEPS)) if hi > lo else 0
+
+    def _on_slider(self, name, step):
+        slider, label, lo, hi = self.rows[name]
+        value = lo + (hi - lo) * step / self.STEPS
+        label.setText(f"{value:.3f}")
+        self.kinematics.set_joint_position(name, value)
+        self._moved()
+
+    def _moved(self):
+        self.gl.poses_changed()
+        self.moved.emit()
+
+    def _show_values(self, values):
+        for name, value in values.items():
+            slider, label, lo, hi = self.rows[name]
+            slider.blockSignals(True); slider.setValue(self._to_step(value, lo, hi)); slider.blockSignals(False)
+            label.setText(f"{value:.3f}")
+
+    def _zero(self):
+        values = {n: min(max(0.0, lo), hi) for n, (_, _, lo, hi) in self.rows.items()}
+        self.kinematics.set_joint_positions(values)
+        self._show_values(values)
+        self._moved()
+
+    def _load_trajectory(self):
+        path, _ = QFileDialog.getOpenFileName(self,"Load joint trajectory","","CSV files (*.csv);;All files (*)")
+        if not path: return
+        try:
+            names, frames = load_trajectory_csv(path)
+        except Exception as e:
+            QMessageBox.warning(self,"Error",f"Failed to load trajectory: {e}"); return
+        self.player = TrajectoryPlayer(self.kinematics, names, frames)
+        if not self.player.names:
+            QMessageBox.warning(self,"Error","Trajectory has no columns for movable joints of this model")
+            self.player = None; return
+        self.traj_label.setText(f"{len(self.player)} frames, {len(self.player.names)} joints")
+
+    def _toggle_playback(self, playing):
+        if playing and self.player is None:
+            self.play_btn.setChecked(False)
+            QMessageBox.warning(self,"Error","Load a trajectory first"); return
+        self.play_btn.setText("Stop" if playing else "Play")
+        if playing: self.timer.start(int(1000 / self.rate_spin.value()))
+        else: self.timer.stop()
+
+    def _on_tick(self):
+        i = self.player.step()
+        self._show_values({n: self.kinematics.positions[n] for n in self.player.names})
+        self.traj_label.setText(f"frame {i + 1}/{len(self.player)}")
+        self._moved()
+
+# ----------------------- Main UI -----------------------
+class URDFBuilderUI(QWidget):
+    # panes a refresh can touch; model edits mark them dirty and one pass per event-loop tick redraws them
+    # (the element list and link combos follow the model on their own, see ElementListModel)
+    XML, GL, DIAG, MASS, JOINTS = (1 << i for i in range(5))
+    ALL = (1 << 5) - 1
+    TEMPLATE_EXAMPLE = (
+        '<link name="seg_${i}">\n'
+        '  <visual><geometry><box size="${w} ${w} ${length}"/></geometry></visual>\n'
+        '</link>\n'
+        '<joint name="seg_${i}_joint" type="revolute">\n'
+        '  <parent link="${base if i == 0 else \'seg_%d\' % (i - 1)}"/><child link="seg_${i}"/>\n'
+        '  <origin xyz="0 0 ${length}"/><axis xyz="0 1 0"/>\n'
+        '  <limit lower="-0.5" upper="0.5" effort="10" velocity="1"/>\n'
+        '</joint>\n')
+    # at or above these sizes XML is generated / parsed on a worker thread
+    ASYNC_ELEMENTS = 500
+    ASYNC_BYTES = 64 * 1024
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("URDF Builder (origin/inertia/collision optional)")
+        self.model = URDFModel()
+        self.validator = ModelValidator(self.model)
+        self.project = ProjectStore(self.model)     # .urdfp file the model was opened from / saved to
+        self.history = History(self.model)
+        self._pending = 0; self._refresh_queued = False
+        self.xml_jobs = LatestJobRunner(parent=self)
+        self.xml_jobs.finished.connect(self._on_xml_ready)
+        self.parse_jobs = LatestJobRunner(parent=self)
+        self.parse_jobs.finished.connect(self._on_parse_ready)
+        self.parse_jobs.failed.connect(self._on_parse_failed)
+        self.parse_jobs.progress.connect(self._on_parse_progress)
+        self._build_ui()
+        self.model.subscribe(self._on_model_event)
+        self.update_preview_and_view()
+
+    def _build_ui(self):
+        main = QVBoxLayout(self)
+        main.setSpacing(10)
+
+        # TOP ROW: Add Link + Elements | Add Joint
+        top_row = QHBoxLayout()
+        top_row.setSpacing(10)
+
+        # LEFT: Add Link + Elements
+        left_column = QVBoxLayout()
+        left_column.setSpacing(8)
+
+        # Add Link group
+        left_column.addWidget(QLabel("<b>Add Link</b>"))
+        link_g = QGroupBox()
+        lf = QFormLayout()
+        lf.setLabelAlignment(Qt.AlignRight)
+        lf.setVerticalSpacing(8)  # Reduced vertical spacing
+        self.link_name = QLineEdit()
+        self.link_name.setMaximumWidth(180)
+        self.geom_combo = QComboBox()
+        self.geom_combo.addItems(['box','cylinder','sphere','mesh'])
+        self.geom_combo.setMaximumWidth(120)
+        # react to geometry changes to update size labels
+        self.geom_combo.currentTextChanged.connect(self._update_size_fields)
+
+        size_h = QHBoxLayout()
+        size_h.setSpacing(6)
+        # size widgets & labels (we'll adapt labels/visibility depending on geometry)
+        self.size_x_label = QLabel("x:")
+        self.size_x = QLineEdit("0.1")
+        self.size_y_label = QLabel("y:")
+        self.size_y = QLineEdit("0.1")
+        self.size_z_label = QLabel("z:")
+        self.size_z = QLineEdit("0.1")
+        for b in (self.size_x,self.size_y,self.size_z): b.setMaximumWidth(60)
+        size_h.addWidget(self.size_x_label); size_h.addWidget(self.size_x)
+        size_h.addWidget(self.size_y_label); size_h.addWidget(self.size_y)
+        size_h.addWidget(self.size_z_label); size_h.addWidget(self.size_z)
+        # mesh file, only for 'mesh' geometry (the size fields then hold its scale)
+        self.mesh_label = QLabel("Mesh")
+        self.mesh_file, mesh_h, self.mesh_browse_btn = self._mesh_file_row()
+
+        # mass + manual inertia checkbox (mass always visible)
+        mass_h = QHBoxLayout()
+        mass_h.setSpacing(8)
+        mass_label = QLabel("")
+        mass_label.setFixedWidth(36)
+        self.mass_input = QLineEdit("1.0")
+        self.mass_input.setMaximumWidth(80)
+        mass_h.addWidget(mass_label); mass_h.addWidget(self.mass_input)
+        # Manual Inertia checkbox placed BEFORE inertia fields per request
+        self.manual_inertia_cb = QCheckBox("Inertia")
+        self.manual_inertia_cb.toggled.connect(self._toggle_inertia)
+        mass_h.addWidget(self.manual_inertia_cb)
+
+        # inertia matrix (hidden by default) -> placed AFTER the checkbox (below it)
+        self.inertia_grid = QGridLayout()
+        self.inertia_grid.setSpacing(4)
+        self.inertia_fields = {}
+        inertia_keys = [("ixx","ixy","ixz"),("ixy","iyy","iyz"),("ixz","iyz","izz")]
+        defaults = {"ixx":"0.001","iyy":"0.001","izz":"0.001","ixy":"0","ixz":"0","iyz":"0"}
+        # create label+field widgets but keep them hidden until checkbox toggled
+        for r in range(3):
+            for c in range(3):
+                key = inertia_keys[r][c]
+                if (r,c) in ((0,1),(1,0)): key = "ixy"
+                if (r,c) in ((0,2),(2,0)): key = "ixz"
+                if (r,c) in ((1,2),(2,1)): key = "iyz"
+                if key in self.inertia_fields:
+                    fld = self.inertia_fields[key]
+                else:
+                    fld = QLineEdit(defaults.get(key,"0"))
+                    fld.setMaximumWidth(70)
+                    fld.setVisible(False)
+                    self.inertia_fields[key] = fld
+                lbl = QLabel(key + ":")
+                lbl.setVisible(False)
+                self.inertia_grid.addWidget(lbl, r, c*2)
+                self.inertia_grid.addWidget(fld, r, c*2+1)
+
+        # Manual origin checkbox + origin fields (hidden by default)
+        self.manual_origin_cb = QCheckBox("Origin")
+        self.manual_origin_cb.toggled.connect(self._toggle_origin)
+        # we will hide both the labels "Position (xyz)" and "Orientation (rpy)" until checkbox checked
+        self.origin_label_xyz = QLabel("Position (xyz)")
+        self.origin_label_xyz.setVisible(False)
+        self.origin_label_rpy = QLabel("Orientation (rpy)")
+        self.origin_label_rpy.setVisible(False)
+        origin_h = QHBoxLayout()
+        origin_h.setSpacing(6)
+        self.origin_x = QLineEdit("0")
+        self.origin_y = QLineEdit("0")
+        self.origin_z = QLineEdit("0")
+        for b in (self.origin_x,self.origin_y,self.origin_z): b.setMaximumWidth(70); b.setVisible(False)
+        origin_h.addWidget(QLabel("x:")); origin_h.itemAt(origin_h.count()-1).widget().setVisible(False)
+        origin_h.addWidget(self.origin_x)
+        origin_h.addWidget(QLabel("y:")); origin_h.itemAt(origin_h.count()-1).widget().setVisible(False)
+        origin_h.addWidget(self.origin_y)
+        origin_h.addWidget(QLabel("z:")); origin_h.itemAt(origin_h.count()-1).widget().setVisible(False)
+        origin_h.addWidget(self.origin_z)
+
+        rpy_h = QHBoxLayout()
+        rpy_h.setSpacing(6)
+        self.origin_r = QLineEdit("0")
+        self.origin_p = QLineEdit("0")
+        self.origin_yaw = QLineEdit("0")
+        for b in (self.origin_r,self.origin_p,self.origin_yaw): b.setMaximumWidth(70); b.setVisible(False)
+        rpy_h.addWidget(QLabel("roll:")); rpy_h.itemAt(rpy_h.count()-1).widget().setVisible(False)
+        rpy_h.addWidget(self.origin_r)
+        rpy_h.addWidget(QLabel("pitch:")); rpy_h.itemAt(rpy_h.count()-1).widget().setVisible(False)
+        rpy_h.addWidget(self.origin_p)
+        rpy_h.addWidget(QLabel("yaw:")); rpy_h.itemAt(rpy_h.count()-1).widget().setVisible(False)
+        rpy_h.addWidget(self.origin_yaw)
+
+        # collision checkbox (option A: collision copies visual geometry by default)
+        self.collision_cb = QCheckBox("Enable Collision")
+        # collision panel that shows when checked
+        self.collision_panel_widget = QWidget()
+        self.collision_panel_layout = QFormLayout(self.collision_panel_widget)
+        self.collision_panel_widget.setVisible(False)
+        self.collision_mode = QComboBox()
+        self.collision_mode.addItems(["Use identical","Manual set"])
+        self.collision_mode.currentTextChanged.connect(self._on_collision_mode_changed)
+        # manual collision geometry widgets (hidden unless Manual set)
+        self.coll_geom_combo = QComboBox()
+        self.coll_geom_combo.addItems(['box','cylinder','sphere','mesh'])
+        self.coll_size_x = QLineEdit("0.1")
+        self.coll_size_y = QLineEdit("0.1")
+        self.coll_size_z = QLineEdit("0.1")
+        for w in (self.coll_size_x, self.coll_size_y, self.coll_size_z): w.setMaximumWidth(70)
+        coll_size_h = QHBoxLayout()
+        self.coll_size_x_label = QLabel("x:")
+        self.coll_size_y_label = QLabel("y:")
+        self.coll_size_z_label = QLabel("z:")
+        coll_size_h.addWidget(self.coll_size_x_label); coll_size_h.addWidget(self.coll_size_x)
+        coll_size_h.addWidget(self.coll_size_y_label); coll_size_h.addWidget(self.coll_size_y)
+        coll_size_h.addWidget(self.coll_size_z_label); coll_size_h.addWidget(self.coll_size_z)
+        # hide manual collision group initially
+        self.coll_geom_combo.setVisible(False); self.coll_size_x.setVisible(False); self.coll_size_y.setVisible(False); self.coll_size_z.setVisible(False)
+        self.collision_panel_layout.addRow("Mode", self.collision_mode)
+        self.collision_panel_layout.addRow("Collision geometry", self.coll_geom_combo)
+        self.collision_panel_layout.addRow("Collision size", coll_size_h)
+        self.coll_mesh_label = QLabel("Collision mesh")
+        self.coll_mesh_file, coll_mesh_h, self.coll_mesh_browse_btn = self._mesh_file_row()
+        self.collision_panel_layout.addRow(self.coll_mesh_label, coll_mesh_h)
+        # toggle panel visible when checkbox toggled
+        self.collision_cb.toggled.connect(self.collision_panel_widget.setVisible)
+        # also hide manual fields initially
+        self.coll_geom_combo.currentTextChanged.connect(self._update_collision_size_fields)
+
+        add_link_btn = QPushButton("Add Link")
+        add_link_btn.clicked.connect(self._on_add_link)
+
+        lf.addRow("Name", self.link_name)
+        lf.addRow("Geometry", self.geom_combo)
+        lf.addRow(self.mesh_label, mesh_h)
+        lf.addRow("Size", size_h)
+        lf.addRow("Mass", mass_h)
+        # inertia fields placed below the checkbox
+        lf.addRow(self.manual_inertia_cb)
+        lf.addRow(self.inertia_grid)
+        # origin checkbox + labels+fields hidden until checked
+        lf.addRow(self.manual_origin_cb)
+        lf.addRow(self.origin_label_xyz, origin_h)
+        lf.addRow(self.origin_label_rpy, rpy_h)
+        # collision panel
+        lf.addRow(self.collision_cb)
+        lf.addRow(self.collision_panel_widget)
+        lf.addRow(add_link_btn)
+        link_g.setLayout(lf)
+        left_column.addWidget(link_g)
+
+        # elements list
+        left_column.addWidget(QLabel("<b>Elements</b>"))
+        self.element_filter = QLineEdit()
+        self.element_filter.setPlaceholderText("Filter...")
+        self.element_filter.setClearButtonEnabled(True)
+        left_column.addWidget(self.element_filter)
+        self.element_model = ElementListModel(self.model, parent=self)
+        self.element_proxy = QSortFilterProxyModel(self)
+        self.element_proxy.setSourceModel(self.element_model)
+        self.element_proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.element_filter.textChanged.connect(self.element_proxy.setFilterFixedString)
+        self.elements_list = QListView()
+        self.elements_list.setModel(self.element_proxy)
+        self.elements_list.setUniformItemSizes(True)
+        self.elements_list.setMaximumHeight(160)
+        self.elements_list.doubleClicked.connect(self._load_selected_element)
+        left_column.addWidget(self.elements_list)
+        el_btns = QHBoxLayout()
+        self.delete_btn = QPushButton("Delete Selected")
+        self.delete_btn.clicked.connect(self._delete_selected)
+        self.edit_btn = QPushButton("Edit Selected")
+        self.edit_btn.clicked.connect(lambda: self._load_selected_element())
+        el_btns.addWidget(self.edit_btn); el_btns.addWidget(self.delete_btn)
+        self.undo_btn = QPushButton("Undo")
+        self.undo_btn.clicked.connect(self._undo)
+        self.redo_btn = QPushButton("Redo")
+        self.redo_btn.clicked.connect(self._redo)
+        el_btns.addWidget(self.undo_btn); el_btns.addWidget(self.redo_btn)
+        # the URDF editor keeps Ctrl+Z for its own text while it has focus
+        QShortcut(QKeySequence.Undo, self, self._undo)
+        QShortcut(QKeySequence.Redo, self, self._redo)
+        left_column.addLayout(el_btns)
+
+        # live diagnostics (double-click jumps to the element)
+        self.diag_label = QLabel("<b>Diagnostics</b>")
+        left_column.addWidget(self.diag_label)
+        self.diag_list = QListWidget()
+        self.diag_list.setMaximumHeight(100)
+        self.diag_list.itemDoubleClicked.connect(self._load_diagnostic_element)
+        left_column.addWidget(self.diag_list)
+
+        # RIGHT: Add Joint
+        right_column = QVBoxLayout()
+        right_column.setSpacing(8)
+        
+        # Add Joint section
+        joint_label = QLabel("<b>Add Joint</b>")
+        right_column.addWidget(joint_label)
+        joint_g = QGroupBox()
+        jf = QFormLayout()
+        jf.setLabelAlignment(Qt.AlignRight)
+        jf.setVerticalSpacing(8)  # Reduced vertical spacing
+        jf.setFieldGrowthPolicy(QFormLayout.AllNonFixedFieldsGrow)  # Better field growth policy
+        
+        self.joint_name = QLineEdit()
+        self.joint_name.setMaximumWidth(180)
+        self.joint_type = QComboBox()
+        self.joint_type.addItems(['revolute','continuous','prismatic','fixed'])
+        self.joint_type.setMaximumWidth(120)
+        # both combos share one live link-name model; typing completes on any substring
+        self.link_names = ElementListModel(self.model, kinds=('link',), prefixed=False, parent=self)
+        self.parent_combo = QComboBox()
+        self.child_combo = QComboBox()
+        for combo in (self.parent_combo, self.child_combo):
+            combo.setEditable(True)
+            combo.setInsertPolicy(QComboBox.NoInsert)
+            combo.setModel(self.link_names)
+            combo.view().setUniformItemSizes(True)
+            self._attach_link_completer(combo)
+            combo.setMaximumWidth(160)
+        
+        origin_h2 = QHBoxLayout()
+        origin_h2.setSpacing(6)
+        self.j_origin_x = QLineEdit("0")
+        self.j_origin_y = QLineEdit("0")
+        self.j_origin_z = QLineEdit("0")
+        for b in (self.j_origin_x,self.j_origin_y,self.j_origin_z): b.setMaximumWidth(70)
+        origin_h2.addWidget(QLabel("x:")); origin_h2.addWidget(self.j_origin_x)
+        origin_h2.addWidget(QLabel("y:")); origin_h2.addWidget(self.j_origin_y)
+        origin_h2.addWidget(QLabel("z:")); origin_h2.addWidget(self.j_origin_z)
+        
+        rpy_h2 = QHBoxLayout()
+        rpy_h2.setSpacing(6)
+        self.j_origin_r = QLineEdit("0")
+        self.j_origin_p = QLineEdit("0")
+        self.j_origin_yaw = QLineEdit("0")
+        for b in (self.j_origin_r,self.j_origin_p,self.j_origin_yaw): b.setMaximumWidth(70)
+        rpy_h2.addWidget(QLabel("roll:")); rpy_h2.addWidget(self.j_origin_r)
+        rpy_h2.addWidget(QLabel("pitch:")); rpy_h2.addWidget(self.j_origin_p)
+        rpy_h2.addWidget(QLabel("yaw:")); rpy_h2.addWidget(self.j_origin_yaw)
+        
+        axis_h = QHBoxLayout()
+        axis_h.setSpacing(6)
+        self.axis_x = QLineEdit("0")
+        self.axis_y = QLineEdit("0")
+        self.axis_z = QLineEdit("1")
+        for b in (self.axis_x,self.axis_y,self.axis_z): b.setMaximumWidth(70)
+        axis_h.addWidget(QLabel("x:")); axis_h.addWidget(self.axis_x)
+        axis_h.addWidget(QLabel("y:")); axis_h.addWidget(self.axis_y)
+        axis_h.addWidget(QLabel("z:")); axis_h.addWidget(self.axis_z)
+        
+        limits_h = QHBoxLayout()
+        limits_h.setSpacing(6)
+        self.limit_l = QLineEdit("-1.57")
+        self.limit_u = QLineEdit("1.57")
+        self.effort = QLineEdit("10")
+        self.velocity = QLineEdit("1.0")
+        for b in (self.limit_l,self.limit_u,self.effort,self.velocity): b.setMaximumWidth(70)
+        limits_h.addWidget(QLabel("lower:")); limits_h.addWidget(self.limit_l)
+        limits_h.addWidget(QLabel("upper:")); limits_h.addWidget(self.limit_u)
+        limits_h.addWidget(QLabel("effort:")); limits_h.addWidget(self.effort)
+        limits_h.addWidget(QLabel("velocity:")); limits_h.addWidget(self.velocity)
+
+        add_joint_btn = QPushButton("Add Joint")
+        add_joint_btn.clicked.connect(self._on_add_joint)
+        self.joint_type.currentTextChanged.connect(self._joint_type_changed)
+
+        jf.addRow("Name", self.joint_name)
+        jf.addRow("Type", self.joint_type)
+        jf.addRow("Parent link", self.parent_combo)
+        jf.addRow("Child link", self.child_combo)
+        jf.addRow("Position", origin_h2)
+        jf.addRow("Orientation", rpy_h2)
+        jf.addRow("Axis", axis_h)
+        jf.addRow("Limits", limits_h)
+        jf.addRow(add_joint_btn)
+        joint_g.setLayout(jf)
+        right_column.addWidget(joint_g)
+
+        # Templates: a link/joint group stamped out N times in one undo step
+        right_column.addWidget(QLabel("<b>Templates</b>"))
+        template_g = QGroupBox()
+        tf = QFormLayout()
+        tf.setLabelAlignment(Qt.AlignRight)
+        tf.setVerticalSpacing(8)
+        self.template_name = QComboBox()
+        self.template_name.setEditable(True)
+        self.template_name.setInsertPolicy(QComboBox.NoInsert)
+        self.template_name.setEditText("snake")
+        self.template_name.setMaximumWidth(180)
+        self.template_name.activated[str].connect(self._load_expansion)
+        self.template_body = QPlainTextEdit(self.TEMPLATE_EXAMPLE)
+        self.template_body.setMaximumHeight(110)
+        self.template_body.setToolTip("<link>/<joint> elements; ${...} is evaluated per instance with i = 0..count-1, "
+                                      "count and the parameters below")
+        self.template_params = QLineEdit("base=base_link, w=0.04, length=0.1")
+        self.template_count = QSpinBox()
+        self.template_count.setRange(1, 100000); self.template_count.setValue(10)
+        self.template_count.setMaximumWidth(90)
+        expand_h = QHBoxLayout()
+        expand_h.addWidget(self.template_count)
+        expand_btn = QPushButton("Expand")
+        expand_btn.setToolTip("Add or update the instances; expanding the same name again only redoes what changed")
+        expand_btn.clicked.connect(self._on_expand_template)
+        expand_h.addWidget(expand_btn)
+        self.template_status = QLabel()
+        expand_h.addWidget(self.template_status, 1)
+        tf.addRow("Name", self.template_name)
+        tf.addRow("Body", self.template_body)
+        tf.addRow("Parameters", self.template_params)
+        tf.addRow("Count", expand_h)
+        template_g.setLayout(tf)
+        right_column.addWidget(template_g)
+        self.expansions = {}    # template name -> Expansion, re-applied incrementally
+
+        # Add stretch to push buttons to bottom
+        right_column.addStretch(1)
+
+        # Add buttons at bottom of right column
+        btn_h = QHBoxLayout()
+        self.apply_btn = QPushButton("Apply Edited URDF → Model")
+        self.apply_btn.clicked.connect(self._apply_edited_urdf)
+        self.export_btn = QPushButton("Export URDF")
+        self.export_btn.clicked.connect(self._export_urdf)
+        self.open_project_btn = QPushButton("Open Project")
+        self.open_project_btn.clicked.connect(self._open_project)
+        self.save_project_btn = QPushButton("Save Project")
+        self.save_project_btn.clicked.connect(self._save_project)
+        self.compare_btn = QPushButton("Compare...")
+        self.compare_btn.setToolTip("List what changed between a URDF/project file and the current model")
+        self.compare_btn.clicked.connect(self._compare_file)
+        self.merge_btn = QPushButton("Merge...")
+        self.merge_btn.setToolTip("Three-way merge another version of a common base file into the current model")
+        self.merge_btn.clicked.connect(self._merge_files)
+        btn_h.addWidget(self.apply_btn)
+        btn_h.addWidget(self.export_btn)
+        btn_h.addWidget(self.compare_btn)
+        btn_h.addWidget(self.merge_btn)
+        btn_h.addWidget(self.open_project_btn)
+        btn_h.addWidget(self.save_project_btn)
+        right_column.addLayout(btn_h)
+
+        # Add left and right columns to top row
+        top_row.addLayout(left_column, 1)
+        top_row.addLayout(right_column, 1)
+
+        # BOTTOM ROW: URDF Preview | 3D Preview
+        bottom_row = QHBoxLayout()
+        bottom_row.setSpacing(10)
+
+        # LEFT: URDF Preview
+        urdf_preview_column = QVBoxLayout()
+        urdf_preview_column.setSpacing(8)
+        preview_header = QHBoxLayout()
+        preview_header.addWidget(QLabel("<b>URDF Preview (editable)</b>"))
+        preview_header.addStretch(1)
+        self.job_status = QLabel()
+        self.job_progress = QProgressBar()
+        self.job_progress.setMaximumWidth(160); self.job_progress.setTextVisible(False)
+        preview_header.addWidget(self.job_status); preview_header.addWidget(self.job_progress)
+        self.job_status.setVisible(False); self.job_progress.setVisible(False)
+        urdf_preview_column.addLayout(preview_header)
+        self.urdf_text = URDFEditor()
+        self.urdf_text.setMinimumHeight(160)
+        urdf_preview_column.addWidget(self.urdf_text)
+
+        # RIGHT: 3D Preview (OpenGL is only imported once the viewer is actually built)
+        from urdf_viewer import GLWidget
+        gl_preview_column = QVBoxLayout()
+        gl_preview_column.setSpacing(8)
+        gl_header = QHBoxLayout()
+        gl_header.addWidget(QLabel("<b>3D Preview (interactive)</b>"))
+        gl_header.addStretch(1)
+        gl_header.addWidget(QLabel("Renderer"))
+        self.render_mode_combo = QComboBox()
+        self.render_mode_combo.addItems(list(GLWidget.RENDER_MODES))
+        self.render_mode_combo.setMaximumWidth(110)
+        gl_header.addWidget(self.render_mode_combo)
+        self.self_collision_cb = QCheckBox("Self-collision")
+        self.self_collision_cb.setToolTip("Check collision geometry for overlaps after every edit or joint move and mark colliding links")
+        gl_header.addWidget(self.self_collision_cb)
+        self.profile_cb = QCheckBox("Profile")
+        self.profile_cb.setToolTip("Time the hot paths (also URDF_PROFILE=1 or --profile) and show frame time, draw calls and vertices over the view")
+        gl_header.addWidget(self.profile_cb)
+        self.trace_btn = QPushButton("Save Trace...")
+        self.trace_btn.setToolTip("Write the calls recorded so far as Chrome trace JSON (chrome://tracing, ui.perfetto.dev)")
+        gl_header.addWidget(self.trace_btn)
+        gl_preview_column.addLayout(gl_header)
+        self.render_status = QLabel()
+        self.render_status.setWordWrap(True)
+        self.render_status.setVisible(False)
+        gl_preview_column.addWidget(self.render_status)
+        self.gl = GLWidget(self.model)
+        self.render_mode_combo.currentTextChanged.connect(self.gl.set_render_mode)
+        self.gl.render_mode_error.connect(self._show_render_error)
+        self.gl.link_picked.connect(lambda name: self.select_element('link', name))
+        self.profile_cb.toggled.connect(self._set_profiling)
+        self.trace_btn.clicked.connect(self._save_trace)
+        self.profile_cb.setChecked(profiler.active); self.trace_btn.setEnabled(profiler.active)
+        self.gl.setMinimumHeight(360)
+        gl_preview_column.addWidget(self.gl)
+        self.mass_props = MassProperties(self.model, self.gl.kinematics)
+        self.mass_label = QLabel()
+        self.mass_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        gl_preview_column.addWidget(self.mass_label)
+        self.collision_checker = CollisionChecker(self.model, self.gl.kinematics)
+        self.collision_label = QLabel()
+        self.collision_label.setWordWrap(True)
+        gl_preview_column.addWidget(self.collision_label)
+        self.self_collision_cb.toggled.connect(self._check_collisions)
+        self.gl.mesh_loaded.connect(self._on_mesh_loaded)
+        gl_preview_column.addWidget(QLabel("<b>Joint State</b>"))
+        self.joint_panel = JointStatePanel(self.model, self.gl)
+        self.joint_panel.setMaximumHeight(180)
+        gl_preview_column.addWidget(self.joint_panel)
+        self.joint_panel.moved.connect(self._check_collisions)
+
+        bottom_row.addLayout(urdf_preview_column, 1)
+        bottom_row.addLayout(gl_preview_column, 1)
+
+        # Add all to main layout
+        main.addLayout(top_row, 1)
+        main.addLayout(bottom_row, 1)
+
+        self.setLayout(main)
+        self.resize(1300, 820)
+
+        # initial UI adjustments
+        self._update_size_fields(self.geom_combo.currentText())
+        self._update_collision_size_fields(self.coll_geom_combo.currentText())
+        self.collision_panel_widget.setVisible(False)
+
+    # ---------- UI helpers & actions ----------
+    def _toggle_inertia(self, checked):
+        # show/hide all inertia grid widgets (labels+fields)
+        for i in range(self.inertia_grid.count()):
+            item = self.inertia_grid.itemAt(i)
+            if item and item.widget():
+                item.widget().setVisible(checked)
+
+    def _toggle_origin(self, checked):
+        # toggle the label rows and the fields
+        self.origin_label_xyz.setVisible(checked)
+        self.origin_label_rpy.setVisible(checked)
+        # show/hide the inputs inside the origin/rpy layouts
+        for w in (self.origin_x, self.origin_y, self.origin_z, self.origin_r, self.origin_p, self.origin_yaw):
+            w.setVisible(checked)
+        # also hide the small inline label widgets
+        # The QFormLayout contains separate label rows; we handled showing label widgets explicitly.
+        self.update()
+
+    def _attach_link_completer(self, combo):
+        # A completer on the live model would re-filter every row on each insert while it holds
+        # a prefix; it works on a name snapshot instead, refreshed when typing starts after edits.
+        completer = QCompleter(combo)
+        completer.setModel(QStringListModel(completer))
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchContains)
+        completer.revision = -1
+        def sync(_text):
+            if completer.revision != self.link_names.revision:
+                completer.revision = self.link_names.revision
+                completer.model().setStringList(self.link_names.names())
+        combo.lineEdit().textEdited.connect(sync)
+        combo.setCompleter(completer)
+
+    def _refresh_diagnostics(self):
+        diags = self.validator.diagnostics()
+        errors = sum(d.severity == 'error' for d in diags)
+        self.diag_label.setText(f"<b>Diagnostics</b> ({errors} errors, {len(diags) - errors} warnings)")
+        self.diag_list.clear()
+        for d in diags[:500]:
+            it = QListWidgetItem(str(d))
+            it.setForeground(Qt.red if d.severity == 'error' else Qt.darkYellow)
+            if d.kind in ('link', 'joint'): it.setData(Qt.UserRole, (d.kind, d.name))
+            self.diag_list.addItem(it)
+        if len(diags) > 500:
+            self.diag_list.addItem(f"... {len(diags) - 500} more")
+
+    def _check_collisions(self):
+        if not self.self_collision_cb.isChecked():
+            self.gl.set_highlight(()); self.collision_label.setText(""); return
+        pairs = self.collision_checker.check()
+        self.gl.set_highlight([n for pair in pairs for n in pair])
+        if not pairs:
+            self.collision_label.setText("No self-collisions"); return
+        shown = ", ".join(f"{a}–{b}" for a, b in pairs[:5])
+        self.collision_label.setText(f"<b>{len(pairs)} colliding pair{'s' if len(pairs) > 1 else ''}:</b> {shown}"
+                                     + (" …" if len(pairs) > 5 else ""))
+
+    def _show_render_error(self, message):
+        # emitted from paintGL: only touch widgets here, not the GL state
+        self.render_status.setText(f"<b>Renderer:</b> {message}")
+        self.render_status.setVisible(bool(message))
+
+    def _on_mesh_loaded(self, filename):
+        # inertias, mass properties, collision shapes and pick boxes used the mesh's scale until now
+        if not any(filename in (l.mesh, l.collision_mesh) for l in self.model.links.values()): return
+        self.mass_props.mesh_loaded(filename); self.collision_checker.mesh_loaded(filename)
+        self.gl.picker.mesh_loaded(filename)
+        self.request_refresh(self.XML | self.MASS); self._check_collisions()
+
+    def _refresh_mass_properties(self):
+        if not self.model.links:
+            self.mass_label.setText(""); return
+        r = self.mass_props.report()
+        c = r['com']; I = r['inertia_com']
+        self.mass_label.setText(f"Total mass {r['mass']:.4g} kg, COM ({c[0]:.4g}, {c[1]:.4g}, {c[2]:.4g}), "
+                                f"I about COM diag ({I[0,0]:.4g}, {I[1,1]:.4g}, {I[2,2]:.4g})")
+
+    def _load_diagnostic_element(self, item):
+        target = item.data(Qt.UserRole)
+        if target: self.select_element(*target)
+
+    def select_element(self, kind, name):
+        """Select an element in the list (clearing a filter that hides it) and load it for editing."""
+        row = self.element_model.row_of(kind, name)
+        if row < 0: return
+        index = self.element_proxy.mapFromSource(self.element_model.index(row))
+        if not index.isValid():
+            self.element_filter.clear()
+            index = self.element_proxy.mapFromSource(self.element_model.index(row))
+        self.elements_list.setCurrentIndex(index)
+        self.elements_list.scrollTo(index)
+        self._load_selected_element(index)
+
+    def _mesh_file_row(self):
+        """(filename edit, row layout, browse button) for a mesh geometry."""
+        edit = QLineEdit(); edit.setPlaceholderText("package://... or path to .stl / .obj")
+        browse = QPushButton("..."); browse.setMaximumWidth(30)
+        browse.clicked.connect(lambda: self._browse_mesh(edit))
+        row = QHBoxLayout(); row.setSpacing(6)
+        row.addWidget(edit); row.addWidget(browse)
+        return edit, row, browse
+
+    def _browse_mesh(self, edit):
+        path, _ = QFileDialog.getOpenFileName(self,"Mesh file","","Meshes (*.stl *.STL *.obj *.OBJ);;All files (*)")
+        if path: edit.setText(path)
+
+    def _update_size_fields(self, geom):
+        """Adapt the size input labels & visibility based on geometry selection (visual)."""
+        for w in (self.mesh_label, self.mesh_file, self.mesh_browse_btn): w.setVisible(geom == 'mesh')
+        if geom == 'mesh':
+            self.size_x_label.setText("scale x:"); self.size_y_label.setText("y:"); self.size_z_label.setText("z:")
+            for w in (self.size_x_label, self.size_x, self.size_y_label, self.size_y, self.size_z_label, self.size_z):
+                w.setVisible(True)
+        elif geom == 'box':
+            # x,y,z visible
+            self.size_x_label.setText("x:"); self.size_y_label.setText("y:"); self.size_z_label.setText("z:")
+            for w in (self.size_x_label, self.size_x, self.size_y_label, self.size_y, self.size_z_label, self.size_z):
+                w.setVisible(True)
+        elif geom == 'cylinder':
+            # radius, length (we map size_x -> radius, size_z -> length; hide size_y)
+            self.size_x_label.setText("radius:"); self.size_z_label.setText("length:")
+            self.size_y_label.setVisible(False); self.size_y.setVisible(False)
+            self.size_x_label.setVisible(True); self.size_x.setVisible(True)
+            self.size_z_label.setVisible(True); self.size_z.setVisible(True)
+        elif geom == 'sphere':
+            # radius only (map to size_x)
+            self.size_x_label.setText("radius:"); self.size_x_label.setVisible(True); self.size_x.setVisible(True)
+            self.size_y_label.setVisible(False); self.size_y.setVisible(False)
+            self.size_z_label.setVisible(False); self.size_z.setVisible(False)
+
+    def _update_collision_size_fields(self, geom):
+        """Adapt the collision manual size input labels & visibility."""
+        show_mesh = geom == 'mesh' and self.collision_mode.currentText() == "Manual set"
+        for w in (self.coll_mesh_label, self.coll_mesh_file, self.coll_mesh_browse_btn): w.setVisible(show_mesh)
+        if geom == 'mesh':
+            self.coll_size_x_label.setText("scale x:"); self.coll_size_y_label.setText("y:"); self.coll_size_z_label.setText("z:")
+            for w in (self.coll_size_x_label, self.coll_size_x, self.coll_size_y_label, self.coll_size_y, self.coll_size_z_label, self.coll_size_z):
+                w.setVisible(True)
+            self.coll_geom_combo.setVisible(True)
+        elif geom == 'box':
+            self.coll_size_x_label.setText("x:"); self.coll_size_y_label.setText("y:"); self.coll_size_z_label.setText("z:")
+            for w in (self.coll_size_x_label, self.coll_size_x, self.coll_size_y_label, self.coll_size_y, self.coll_size_z_label, self.coll_size_z):
+                w.setVisible(True)
+            self.coll_geom_combo.setVisible(True)
+        elif geom == 'cylinder':
+            self.coll_size_x_label.setText("radius:"); self.coll_size_z_label.setText("length:")
+            self.coll_size_y_label.setVisible(False); self.coll_size_y.setVisible(False)
+            self.coll_size_x_label.setVisible(True); self.coll_size_x.setVisible(True)
+            self.coll_size_z_label.setVisible(True); self.coll_size_z.setVisible(True)
+            self.coll_geom_combo.setVisible(True)
+        elif geom == 'sphere':
+            self.coll_size_x_label.setText("radius:"); self.coll_size_x_label.setVisible(True); self.coll_size_x.setVisible(True)
+            self.coll_size_y_label.setVisible(False); self.coll_size_y.setVisible(False)
+            self.coll_size_z_label.setVisible(False); self.coll_size_z.setVisible(False)
+            self.coll_geom_combo.setVisible(True)
+
+    def _on_collision_mode_changed(self, text):
+        is_manual = (text == "Manual set")
+        # show or hide manual collision widgets
+        self.coll_geom_combo.setVisible(is_manual)
+        self.coll_size_x.setVisible(is_manual)
+        # update the labels & other fields according to selected collision geom
+        self._update_collision_size_fields(self.coll_geom_combo.currentText())
+
+    def _on_add_link(self):
+        name = self.link_name.text().strip()
+        if not name:
+            QMessageBox.warning(self,"Error","Link name required"); return
+        # parse size depending on visual geometry choice
+        geom = self.geom_combo.currentText()
+        mesh = self.mesh_file.text().strip() if geom == 'mesh' else None
+        if geom == 'mesh' and not mesh:
+            QMessageBox.warning(self,"Error","Mesh geometry needs a file"); return
+        try:
+            if geom in ('box', 'mesh'):
+                sx = float(self.size_x.text()); sy = float(self.size_y.text()); sz = float(self.size_z.text())
+            elif geom == 'cylinder':
+                sx = float(self.size_x.text());  # radius stored in slot x
+                sy = sx  # store radius twice as in model.size (radius*2 logic used for GL/URDF)
+                sz = float(self.size_z.text())  # length
+            elif geom == 'sphere':
+                sx = float(self.size_x.text()); sy = sx; sz = sx
+        except ValueError:
+            QMessageBox.warning(self,"Error","Size entries must be numeric"); return
+        try:
+            mass = float(self.mass_input.text())
+        except Exception:
+            mass = 1.0
+
+        # inertia only if manual inertia checked
+        inertia = None
+        manual_inertia_flag = self.manual_inertia_cb.isChecked()
+        if manual_inertia_flag:
+            inertia = {}
+            try:
+                # collect unique inertia keys from fields
+                for key, fld in self.inertia_fields.items():
+                    inertia[key] = float(fld.text())
+            except Exception:
+                QMessageBox.warning(self,"Error","Inertia entries must be numeric"); return
+
+        # origin
+        origin = (0.0,0.0,0.0); rpy = (0.0,0.0,0.0)
+        if self.manual_origin_cb.isChecked():
+            try:
+                origin = (float(self.origin_x.text()), float(self.origin_y.text()), float(self.origin_z.text()))
+                rpy = (float(self.origin_r.text()), float(self.origin_p.text()), float(self.origin_yaw.text()))
+            except Exception:
+                QMessageBox.warning(self,"Error","Origin/RPY must be numeric"); return
+
+        # collision
+        include_collision = self.collision_cb.isChecked()
+        collision_geom = None; collision_size = None; collision_mesh = None
+        if include_collision:
+            if self.collision_mode.currentText() == "Use identical":
+                collision_geom = None
+                collision_size = None
+            else:
+                # manual collision: read geom + sizes
+                try:
+                    cgeom = self.coll_geom_combo.currentText()
+                    if cgeom in ('box', 'mesh'):
+                        cx = float(self.coll_size_x.text()); cy = float(self.coll_size_y.text()); cz = float(self.coll_size_z.text())
+                        collision_geom = cgeom; collision_size = (cx,cy,cz)
+                    elif cgeom == 'cylinder':
+                        cr = float(self.coll_size_x.text()); cl = float(self.coll_size_z.text())
+                        collision_geom = 'cylinder'; collision_size = (cr, cr, cl)
+                    elif cgeom == 'sphere':
+                        cr = float(self.coll_size_x.text())
+                        collision_geom = 'sphere'; collision_size = (cr, cr, cr)
+                except Exception:
+                    QMessageBox.warning(self,"Error","Collision size entries must be numeric"); return
+                if collision_geom == 'mesh':
+                    collision_mesh = self.coll_mesh_file.text().strip()
+                    if not collision_mesh:
+                        QMessageBox.warning(self,"Error","Collision mesh geometry needs a file"); return
+
+        # create and store link (no jitter/offset)
+        stored_size = (sx, sy, sz)
+        # the form has no center-of-mass fields; keep the inertial origin loaded from a file when re-saving a link
+        old = self.model.links.get(name)
+        com = old.com if old is not None and manual_inertia_flag else None
+        com_rpy = old.com_rpy if old is not None and manual_inertia_flag else None
+        with self.history.command(f"{'Edit' if old is not None else 'Add'} link {name}"):
+            self.model.add_link(Link(name, geom, stored_size, mass, inertia, manual_inertia_flag, origin, rpy, include_collision, collision_geom, collision_size, com,
+                                     mesh, collision_mesh, com_rpy))
+
+    def _on_add_joint(self):
+        name = self.joint_name.text().strip()
+        if not name:
+            QMessageBox.warning(self,"Error","Joint name required"); return
+        jtype = self.joint_type.currentText()
+        parent = self.parent_combo.currentText(); child = self.child_combo.currentText()
+        if parent == "" or child == "":
+            QMessageBox.warning(self,"Error","Parent and child must be selected"); return
+        if parent not in self.model.links or child not in self.model.links:
+            QMessageBox.warning(self,"Error","Parent and child must exist"); return
+        try:
+            ox=float(self.j_origin_x.text()); oy=float(self.j_origin_y.text()); oz=float(self.j_origin_z.text())
+            rr=float(self.j_origin_r.text()); rp=float(self.j_origin_p.text()); ry=float(self.j_origin_yaw.text())
+            ax=float(self.axis_x.text()); ay=float(self.axis_y.text()); az=float(self.axis_z.text())
+            low=None; high=None
+            if self.limit_l.text().strip()!="" and self.limit_u.text().strip()!="":
+                low=float(self.limit_l.text()); high=float(self.limit_u.text())
+            eff = float(self.effort.text()) if self.effort.text().strip()!="" else 10.0
+            vel = float(self.velocity.text()) if self.velocity.text().strip()!="" else 1.0
+        except ValueError:
+            QMessageBox.warning(self,"Error","Numeric fields must be numeric"); return
+        joint = Joint(name, jtype, parent, child, origin_xyz=(ox,oy,oz), origin_rpy=(rr,rp,ry), axis=(ax,ay,az), limit=(low,high) if low is not None else None, effort=eff, velocity=vel)
+        with self.history.command(f"{'Edit' if name in self.model.joints else 'Add'} joint {name}"):
+            self.model.add_joint(joint)
+
+    def _on_expand_template(self):
+        name = self.template_name.currentText().strip()
+        if not name:
+            QMessageBox.warning(self,"Error","Template name required"); return
+        try:
+            template = Template(self.template_body.toPlainText())
+            params = parse_params(self.template_params.text())
+        except TemplateError as e:
+            QMessageBox.warning(self,"Error",f"Template: {e}"); return
+        exp = self.expansions.get(name) or Expansion(template)
+        exp.set_template(template); exp.params = params; exp.count = self.template_count.value()
+        try:
+            # one undo step; the panes refresh once when control returns to the event loop
+            with self.history.command(f"Expand template {name}"):
+                written, removed = exp.apply(self.model)
+        except (TemplateError, URDFParseError) as e:
+            QMessageBox.warning(self,"Error",f"Template: {e}"); return
+        if name not in self.expansions:
+            self.expansions[name] = exp; self.template_name.addItem(name)
+        self.template_status.setText(f"{exp.expanded} of {exp.count} expanded, {written} written, {removed} removed")
+
+    def _load_expansion(self, name):
+        exp = self.expansions.get(name)
+        if exp is None: return
+        self.template_body.setPlainText(exp.template.body)
+        self.template_params.setText(", ".join(f"{k}={v}" for k, v in exp.params.items()))
+        self.template_count.setValue(exp.count)
+
+    def _delete_selected(self):
+        target = self.elements_list.currentIndex().data(Qt.UserRole)
+        if not target:
+            QMessageBox.warning(self,"Error","No element selected"); return
+        kind, name = target
+        with self.history.command(f"Delete {kind} {name}"):
+            if kind == 'link':
+                self.model.remove_link(name)
+            else:
+                self.model.remove_joint(name)
+
+    def _undo(self):
+        if self.history.undo() is None: QApplication.beep()
+
+    def _redo(self):
+        if self.history.redo() is None: QApplication.beep()
+
+    def _load_selected_element(self, index=None):
+        if index is None: index = self.elements_list.currentIndex()
+        target = index.data(Qt.UserRole)
+        if not target: return
+        kind, name = target
+        if kind == 'link':
+            l = self.model.links[name]
+            self.link_name.setText(l.name)
+            self.geom_combo.setCurrentText(l.geom_type)
+            # adapt size fields to geometry then set values
+            self._update_size_fields(l.geom_type)
+            self.mesh_file.setText(l.mesh or "")
+            self.size_x.setText(str(l.size[0])); self.size_y.setText(str(l.size[1])); self.size_z.setText(str(l.size[2]))
+            self.mass_input.setText(str(l.mass))
+            if l.manual_inertia and l.inertia:
+                self.manual_inertia_cb.setChecked(True)
+                for k,v in l.inertia.items():
+                    if k in self.inertia_fields: self.inertia_fields[k].setText(str(v))
+            else:
+                self.manual_inertia_cb.setChecked(False)
+            self.collision_cb.setChecked(bool(l.include_collision))
+            if l.include_collision and l.collision_geom:
+                self.collision_mode.setCurrentText("Manual set")
+                self.coll_geom_combo.setCurrentText(l.collision_geom)
+                self._update_collision_size_fields(l.collision_geom)
+                self.coll_mesh_file.setText(l.collision_mesh or "")
+                if l.collision_size:
+                    self.coll_size_x.setText(str(l.collision_size[0])); self.coll_size_y.setText(str(l.collision_size[1])); self.coll_size_z.setText(str(l.collision_size[2]))
+            else:
+                self.collision_mode.setCurrentText("Use identical")
+            if l.origin != (0.0,0.0,0.0) or l.rpy != (0.0,0.0,0.0):
+                self.manual_origin_cb.setChecked(True)
+                self.origin_x.setText(str(l.origin[0])); self.origin_y.setText(str(l.origin[1])); self.origin_z.setText(str(l.origin[2]))
+                self.origin_r.setText(str(l.rpy[0])); self.origin_p.setText(str(l.rpy[1])); self.origin_yaw.setText(str(l.rpy[2]))
+            else:
+                self.manual_origin_cb.setChecked(False)
+        else:
+            j = self.model.joints[name]
+            self.joint_name.setText(j.name); self.joint_type.setCurrentText(j.jtype)
+            self.parent_combo.setCurrentText(j.parent); self.child_combo.setCurrentText(j.child)
+            self.j_origin_x.setText(str(j.origin_xyz[0])); self.j_origin_y.setText(str(j.origin_xyz[1])); self.j_origin_z.setText(str(j.origin_xyz[2]))
+            self.j_origin_r.setText(str(j.origin_rpy[0])); self.j_origin_p.setText(str(j.origin_rpy[1])); self.j_origin_yaw.setText(str(j.origin_rpy[2]))
+            self.axis_x.setText(str(j.axis[0])); self.axis_y.setText(str(j.axis[1])); self.axis_z.setText(str(j.axis[2]))
+            if j.limit:
+                self.limit_l.setText(str(j.limit[0])); self.limit_u.setText(str(j.limit[1]))
+            else:
+                self.limit_l.setText(""); self.limit_u.setText("")
+            self.effort.setText(str(j.effort)); self.velocity.setText(str(j.velocity))
+
+    def _apply_edited_urdf(self):
+        txt = self.urdf_text.toPlainText()
+        # edits inside <link>/<joint> elements patch just those elements in place
+        try:
+            with self.history.command("Apply edited URDF"):
+                applied = self.model.apply_text_edit(self.urdf_text.synced_text, txt)
+        except URDFParseError as e:
+            QMessageBox.warning(self,"Error",f"Invalid URDF syntax; cannot parse.\n{e}"); return
+        if applied:
+            self.parse_jobs.cancel(); self._update_job_indicator()
+            QMessageBox.information(self,"Applied","Model updated from edited URDF text"); return
+        if len(txt) >= self.ASYNC_BYTES:
+            self.parse_jobs.submit(parse_job, txt)
+            self._update_job_indicator(0); return
+        self.parse_jobs.cancel(); self._update_job_indicator()
+        try:
+            with self.history.command("Apply edited URDF"):
+                self.model.load_from_stream(io.StringIO(txt))
+        except URDFParseError as e:
+            QMessageBox.warning(self,"Error",f"Invalid URDF syntax; cannot parse.\n{e}"); return
+        QMessageBox.information(self,"Applied","Model updated from edited URDF text")
+
+    def _on_parse_progress(self, job_id, permille):
+        if self.parse_jobs.is_current(job_id): self._update_job_indicator(permille)
+
+    def _on_parse_ready(self, job_id, parsed):
+        if not self.parse_jobs.is_current(job_id): return
+        self.parse_jobs.done(job_id); self._update_job_indicator()
+        with self.history.command("Apply edited URDF"):
+            self.model.replace_with(parsed)
+        QMessageBox.information(self,"Applied","Model updated from edited URDF text")
+
+    def _on_parse_failed(self, job_id, error):
+        if not self.parse_jobs.is_current(job_id): return
+        self.parse_jobs.done(job_id); self._update_job_indicator()
+        if isinstance(error, URDFParseError):
+            QMessageBox.warning(self,"Error",f"Invalid URDF syntax; cannot parse.\n{error}")
+        else:
+            QMessageBox.warning(self,"Error",f"Failed to parse: {error}")
+
+    def _regenerate_xml(self):
+        if len(self.model.links) + len(self.model.joints) < self.ASYNC_ELEMENTS:
+            self.xml_jobs.cancel(); self._update_job_indicator()
+            self.urdf_text.set_model_text(self.model.to_urdf_string()); return
+        # the worker renders from a snapshot; a newer edit supersedes it before it lands
+        self.xml_jobs.submit(serialize_job, self.model.snapshot())
+        self._update_job_indicator()
+
+    def _on_xml_ready(self, job_id, result):
+        if not self.xml_jobs.is_current(job_id): return
+        self.xml_jobs.done(job_id); self._update_job_indicator()
+        text, snapshot = result
+        self.model.adopt_fragments(snapshot)
+        self.urdf_text.set_model_text(text)
+
+    def _update_job_indicator(self, permille=None):
+        if self.parse_jobs.busy:
+            self.job_status.setText("Parsing URDF...")
+            self.job_progress.setRange(0, 1000)
+            if permille is not None: self.job_progress.setValue(permille)
+        elif self.xml_jobs.busy:
+            self.job_status.setText("Generating XML...")
+            self.job_progress.setRange(0, 0)    # indeterminate
+        busy = self.parse_jobs.busy or self.xml_jobs.busy
+        self.job_status.setVisible(busy); self.job_progress.setVisible(busy)
+
+    def closeEvent(self, event):
+        self.xml_jobs.cancel(); self.parse_jobs.cancel()
+        super().closeEvent(event)
+
+    def _export_urdf(self):
+        # a pending background render means the preview is behind the model
+        txt = self.model.to_urdf_string() if self.xml_jobs.busy else self.urdf_text.toPlainText()
+        path, _ = QFileDialog.getSaveFileName(self,"Save URDF","robot.urdf","URDF files (*.urdf);;All files (*)")
+        if not path: return
+        try:
+            with open(path,'w') as f: f.write(txt)
+            QMessageBox.information(self,"Saved",f"Saved to {path}")
+        except Exception as e:
+            QMessageBox.warning(self,"Error",f"Failed to save: {e}")
+
+    def _set_profiling(self, on):
+        if on: profiler.enable()
+        else: profiler.disable()
+        self.trace_btn.setEnabled(on or bool(profiler.events))
+        self.gl.set_overlay(on)
+
+    def _save_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self,"Save profile trace","urdf_profile.json","Chrome trace (*.json);;All files (*)")
+        if not path: return
+        try:
+            n = profiler.dump_trace(path)
+            QMessageBox.information(self,"Saved",f"{n} trace events saved to {path}")
+        except Exception as e:
+            QMessageBox.warning(self,"Error",f"Failed to save: {e}")
+
+    def _open_project(self):
+        path, _ = QFileDialog.getOpenFileName(self,"Open project","","URDF projects (*.urdfp);;All files (*)")
+        if not path: return
+        self.parse_jobs.cancel(); self._update_job_indicator()
+        # relative mesh filenames are relative to the file they came from
+        default_cache.set_search_paths([os.path.dirname(os.path.abspath(path))])
+        try:
+            with self.history.suspended():      # a freshly opened project starts a new history
+                self.project.load(path)
+        except (OSError, ProjectFormatError) as e:
+            QMessageBox.warning(self,"Error",f"Failed to open project: {e}")
+
+    def _save_project(self):
+        path = self.project.path
+        if path is None:
+            path, _ = QFileDialog.getSaveFileName(self,"Save project","robot.urdfp","URDF projects (*.urdfp);;All files (*)")
+            if not path: return
+        try:
+            self.project.save(path)
+            QMessageBox.information(self,"Saved",f"Saved to {path}")
+        except OSError as e:
+            QMessageBox.warning(self,"Error",f"Failed to save: {e}")
+
+    def _open_model(self, title):
+        path, _ = QFileDialog.getOpenFileName(self,title,"","URDF files (*.urdf *.urdfp);;All files (*)")
+        if not path: return None, None
+        try:
+            return path, load_model(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self,"Error",f"Failed to open {os.path.basename(path)}: {e}")
+            return None, None
+
+    def _show_changes(self, title, summary, entries):
+        self.changes_dialog = ChangesDialog(title, summary, entries, self.select_element, self)
+        self.changes_dialog.show()
+
+    def _compare_file(self):
+        path, other = self._open_model("Compare with")
+        if other is None: return
+        d = diff_models(other, self.model)
+        self._show_changes(f"Changes since {os.path.basename(path)}",
+                           f"From {os.path.basename(path)} to the current model: {d.summary()}", d.entries())
+
+    def _merge_files(self):
+        base_path, base = self._open_model("Merge: common base version")
+        if base is None: return
+        path, theirs = self._open_model("Merge: version to merge in")
+        if theirs is None: return
+        result = merge_models(base, self.model, theirs)
+        d = diff_models(self.model, result.model)
+        # one undo step; History records the reset as per-element deltas
+        with self.history.command(f"Merge {os.path.basename(path)}"):
+            self.model.replace_with(result.model)
+        conflicts = [(line, k, n if n in (self.model.links if k == 'link' else self.model.joints) else None)
+                     for line, (k, n, _, _) in zip(result.lines(), result.conflicts)]
+        self._show_changes(f"Merged {os.path.basename(path)}",
+                           f"{d.summary()}; {len(conflicts)} conflict{'s' if len(conflicts) != 1 else ''} kept the current version",
+                           conflicts + d.entries())
+
+    def _joint_type_changed(self, t):
+        is_fixed = (t == "fixed")
+        for w in (self.axis_x, self.axis_y, self.axis_z, self.limit_l, self.limit_u, self.effort, self.velocity):
+            w.setDisabled(is_fixed)
+        # origin remains editable
+
+    # ---------- refresh scheduling ----------
+    def _on_model_event(self, event, kind, name):
+        if event == 'reset' or kind is None:
+            flags = self.ALL
+        elif kind == 'link':
+            flags = self.XML | self.GL | self.DIAG | self.MASS
+        else:
+            flags = self.XML | self.GL | self.DIAG | self.MASS | self.JOINTS
+        self.request_refresh(flags)
+
+    def request_refresh(self, flags):
+        """Mark panes dirty; they are redrawn together once control returns to the event loop."""
+        self._pending |= flags
+        if not self._refresh_queued:
+            self._refresh_queued = True
+            QTimer.singleShot(0, self._flush_refresh)
+
+    @profiled('URDFBuilderUI._flush_refresh')
+    def _flush_refresh(self):
+        flags = self._pending; self._pending = 0; self._refresh_queued = False
+        if flags & self.XML: self._regenerate_xml()
+        if flags & self.DIAG: self._refresh_diagnostics()
+        if flags & self.MASS: self._refresh_mass_properties()
+        if flags & self.JOINTS: self.joint_panel.refresh()
+        # the GLWidget re-syncs cached geometry and poses on its next paint
+        if flags & self.GL: self.gl.model_changed(); self._check_collisions()
+        self.undo_btn.setEnabled(self.history.can_undo()); self.redo_btn.setEnabled(self.history.can_redo())
+
+    @profiled('URDFBuilderUI.update_preview_and_view')
+    def update_preview_and_view(self):
+        """Refresh every pane right away (edits normally go through request_refresh)."""
+        self._pending |= self.ALL
+        self._flush_refresh()
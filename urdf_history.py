@@ -0,0 +1,182 @@
+"""Undo/redo for URDFModel edits, stored as per-element deltas.
+
+History listens to the model's edit notifications, so every edit made through the model
+API (add/remove link or joint, apply_text_edit, whole-document loads) is recorded without
+the editing code having to build commands itself; it only brackets user actions with
+command() so each one undoes as a unit.
+"""
+from collections import deque
+from contextlib import contextmanager
+
+from urdf_model import _insert, joint_signature, link_signature
+
+
+class Command:
+    """One undoable step: [(kind, name, before, after, index)] in the order they happened.
+
+    before/after are element objects (None for absent). index is the element's position
+    among the model's links or joints: where it was before a removal, where it went for an
+    addition (None for a change in place). They are the very objects the model
+    held, not copies: edits replace elements rather than mutate them, so an unchanged
+    element is shared between the model and every command that mentions it.
+    """
+    __slots__ = ('label', 'deltas')
+
+    def __init__(self, label):
+        self.label = label
+        self.deltas = []
+
+    def __len__(self):
+        return len(self.deltas)
+
+
+class History:
+    """Undo and redo stacks of Commands for one model.
+
+    undo()/redo() replay just the command's deltas through add_*/remove_*, so they cost
+    O(size of the change) and listeners see ordinary per-element events (incremental
+    refreshes). A 'reset' (load, replace_with) is diffed by signature into per-element
+    deltas once, when it happens. Elements restored by undoing a removal go back to their
+    position through insert_link/insert_joint, so undo also restores the model's order
+    (and the exported URDF). Edits made by mutating an element in place and calling
+    touch(kind, name) cannot be undone: there is no earlier version to go back to.
+    """
+    def __init__(self, model, limit=5000):
+        self.model = model
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        self._open = None       # Command being recorded by command()
+        self._depth = 0
+        self._replaying = False
+        self._suspended = 0
+        self._sync()
+        model.subscribe(self._on_model_event)
+
+    # ---------- element bookkeeping ----------
+    def _items(self, kind):
+        return self.model.links if kind == 'link' else self.model.joints
+
+    def _detached(self, kind, names):
+        # array-backed tables (urdf_columnar) hand out views onto rows that get overwritten
+        items = self._items(kind)
+        if hasattr(items, 'elements'): return items.elements(names)
+        return [items[n] for n in names]
+
+    def _sync(self):
+        # kind -> {name: last known element}, in the model's order: the 'before' of the next
+        # event, and where a removed element was
+        self._known = {}
+        for kind in ('link', 'joint'):
+            names = list(self._items(kind))
+            self._known[kind] = dict(zip(names, self._detached(kind, names)))
+
+    def _on_model_event(self, event, kind, name):
+        if self._suspended: return
+        if event == 'reset' or kind is None:
+            deltas = self._diff_reset()
+        else:
+            known = self._known[kind]
+            after = self._detached(kind, [name])[0] if name in self._items(kind) else None
+            before = known.get(name); index = None
+            if after is None:
+                if before is not None: index = list(known).index(name); del known[name]
+            else:
+                known[name] = after     # a change keeps its position, an addition goes last
+                if before is None: index = len(known) - 1
+            deltas = [(kind, name, before, after, index)]
+        if self._replaying or not deltas: return
+        if self._open is not None:
+            self._open.deltas += deltas
+        else:
+            cmd = Command("Reload" if event == 'reset' else f"{event.capitalize()} {kind} {name}")
+            cmd.deltas = deltas; self._push(cmd)
+
+    def _diff_reset(self):
+        # indices as if the removals happened one after another, then the additions
+        old = self._known; self._sync(); new = self._known
+        deltas = []; added = []
+        for kind, sig in (('link', link_signature), ('joint', joint_signature)):
+            kept = 0
+            for name, before in old[kind].items():
+                after = new[kind].get(name)
+                if after is None:
+                    deltas.append((kind, name, before, None, kept)); continue
+                kept += 1
+                if sig(before) != sig(after): deltas.append((kind, name, before, after, None))
+            added += [(kind, name, None, after, i) for i, (name, after) in enumerate(new[kind].items())
+                      if name not in old[kind]]
+        return deltas + added
+
+    def _push(self, cmd):
+        self.undo_stack.append(cmd)
+        self.redo_stack.clear()
+
+    # ---------- recording ----------
+    @contextmanager
+    def command(self, label):
+        """Group every model edit inside the with-block into one undo step (nests)."""
+        if self._depth == 0: self._open = Command(label)
+        self._depth += 1
+        try:
+            yield self._open
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                cmd, self._open = self._open, None
+                if cmd.deltas: self._push(cmd)
+
+    @contextmanager
+    def suspended(self):
+        """Edits inside are not recorded and the history is cleared (e.g. opening a file)."""
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+            if not self._suspended: self.clear()
+
+    def clear(self):
+        self.undo_stack.clear(); self.redo_stack.clear()
+        self._sync()
+
+    # ---------- replay ----------
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def _apply(self, deltas, forward):
+        model = self.model
+        self._replaying = True
+        try:
+            for kind, name, before, after, index in (deltas if forward else reversed(deltas)):
+                target, other = (after, before) if forward else (before, after)
+                if target is None:
+                    if kind == 'link': model.remove_link(name, cascade=False)
+                    else: model.remove_joint(name)
+                elif other is None:
+                    if kind == 'link': model.insert_link(index, target)
+                    else: model.insert_joint(index, target)
+                    _insert(self._known[kind], index, name, target)
+                elif kind == 'link': model.add_link(target)
+                else: model.add_joint(target)
+                # the model may hold a view/copy; keep sharing the command's object
+                if target is not None: self._known[kind][name] = target
+        finally:
+            self._replaying = False
+
+    def undo(self):
+        """Revert the last command; returns its label, or None if there was nothing to undo."""
+        if not self.undo_stack or self._open is not None: return None
+        cmd = self.undo_stack.pop()
+        self._apply(cmd.deltas, False)
+        self.redo_stack.append(cmd)
+        return cmd.label
+
+    def redo(self):
+        if not self.redo_stack or self._open is not None: return None
+        cmd = self.redo_stack.pop()
+        self._apply(cmd.deltas, True)
+        self.undo_stack.append(cmd)
+        return cmd.label
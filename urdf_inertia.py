@@ -0,0 +1,152 @@
+import numpy as np
+
+from urdf_columnar import link_columns
+from urdf_kinematics import KinematicTree, rpy_matrices
+
+INERTIA_KEYS = ('ixx', 'ixy', 'ixz', 'iyy', 'iyz', 'izz')
+
+# ----------------------- Shape inertia -----------------------
+def shape_inertias(geoms, sizes, masses):
+    """Principal-axis inertia of solid primitives about their centroid -> (N,3,3).
+
+    Sizes follow the GUI convention: box (x, y, z); cylinder (radius, -, length) along z;
+    sphere (radius, -, -). Unknown shapes get a zero tensor.
+    """
+    s = np.asarray(sizes, dtype=float).reshape(-1, 3)
+    m = np.asarray(masses, dtype=float).reshape(-1)
+    geoms = np.asarray(geoms, dtype=object).reshape(-1)
+    d = np.zeros((len(s), 3))
+    box = geoms == 'box'
+    sq = s[box] ** 2
+    d[box] = m[box, None] / 12.0 * np.stack([sq[:, 1] + sq[:, 2], sq[:, 0] + sq[:, 2], sq[:, 0] + sq[:, 1]], axis=1)
+    cyl = geoms == 'cylinder'
+    r2 = s[cyl, 0] ** 2; l2 = s[cyl, 2] ** 2
+    side = m[cyl] * (3.0 * r2 + l2) / 12.0
+    d[cyl] = np.stack([side, side, m[cyl] * r2 / 2.0], axis=1)
+    sph = geoms == 'sphere'
+    d[sph] = (0.4 * m[sph] * s[sph, 0] ** 2)[:, None]
+    out = np.zeros((len(s), 3, 3))
+    out[:, [0, 1, 2], [0, 1, 2]] = d
+    return out
+
+def mesh_boxes(geoms, sizes, meshes):
+    """Replace mesh shapes by the box of their scaled bounds (geoms, sizes as arrays).
+
+    A solid box over the mesh extents is the estimate for meshes; one whose file can't be
+    loaded, or is still loading in the background, keeps its scale as box size.
+    """
+    geoms = np.asarray(geoms, dtype=object).reshape(-1)
+    sizes = np.array(sizes, dtype=float).reshape(-1, 3)
+    idx = np.flatnonzero(geoms == 'mesh')
+    if len(idx):
+        from urdf_mesh import default_cache
+        geoms = geoms.copy(); geoms[idx] = 'box'
+        for i in idx.tolist():
+            b = default_cache.bounds(meshes[i]) if meshes[i] else None
+            sizes[i] = np.abs(sizes[i]) * (b[1] - b[0] if b is not None else 1.0)
+    return geoms, sizes
+
+def link_inertias(links):
+    """Inertia of each link's visual shape about its centroid, rotated into the link frame by rpy."""
+    links = list(links)
+    if not links: return np.zeros((0, 3, 3))
+    cols = link_columns(links)
+    if cols is not None:
+        geoms, sizes = mesh_boxes(cols['geom'], cols['size'], cols['mesh'])
+        I = shape_inertias(geoms, sizes, cols['mass']); R = rpy_matrices(cols['rpy'])
+    else:
+        geoms, sizes = mesh_boxes([l.geom_type for l in links], [tuple(l.size) for l in links], [l.mesh for l in links])
+        I = shape_inertias(geoms, sizes, [l.mass for l in links])
+        R = rpy_matrices([l.rpy for l in links])
+    return R @ I @ R.transpose(0, 2, 1)
+
+_UPPER = ([0, 0, 0, 1, 1, 2], [0, 1, 2, 1, 2, 2])   # ixx ixy ixz iyy iyz izz
+
+def inertia_attrs(I):
+    """(N,3,3) tensors -> per-link URDF <inertia> attribute lists; rotation round-off is zeroed."""
+    I = np.asarray(I, dtype=float).reshape(-1, 3, 3)
+    vals = I[:, _UPPER[0], _UPPER[1]]
+    tol = 1e-12 * np.abs(vals[:, [0, 3, 5]]).sum(axis=1, keepdims=True)
+    vals = np.where(np.abs(vals) <= tol, 0.0, vals)
+    return [[(k, f"{v:.9g}") for k, v in zip(INERTIA_KEYS, row)] for row in vals.tolist()]
+
+def auto_inertials(links):
+    """{link name: <inertia> attribute list} for a batch of links, one NumPy pass."""
+    links = list(links)
+    return dict(zip((l.name for l in links), inertia_attrs(link_inertias(links))))
+
+def point_mass_inertia(points, masses):
+    """Sum of m (|p|^2 E - p p^T): the parallel-axis term for (N,3) points about the origin."""
+    q = np.asarray(points, dtype=float).reshape(-1, 3); w = np.asarray(masses, dtype=float).reshape(-1)
+    return np.einsum('n,nk,nk->', w, q, q) * np.identity(3) - np.einsum('n,ni,nj->ij', w, q, q)
+
+def manual_inertia_matrix(inertia):
+    g = {k: float(inertia.get(k, 0.0) or 0.0) for k in INERTIA_KEYS}
+    return np.array([[g['ixx'], g['ixy'], g['ixz']],
+                     [g['ixy'], g['iyy'], g['iyz']],
+                     [g['ixz'], g['iyz'], g['izz']]])
+
+
+# ----------------------- Whole-model mass properties -----------------------
+class MassProperties:
+    """Total mass, center of mass and composite inertia about the root link frame.
+
+    Per-link (mass, centroid, inertia) in the link frame is cached and invalidated per
+    link through the model's edit notifications; the composite is recomputed only when
+    the model revision or the kinematic tree's poses changed.
+    """
+    def __init__(self, model, tree=None):
+        self.model = model
+        self.tree = tree if tree is not None else KinematicTree(model)
+        self._local = {}        # link name -> (mass, centroid (3,), inertia (3,3)) in the link frame
+        self._report = None
+        self._key = None
+        model.subscribe(self._on_model_event)
+
+    def _on_model_event(self, event, kind, name):
+        if kind == 'link': self._local.pop(name, None)
+        elif event == 'reset': self._local.clear()
+
+    def mesh_loaded(self, filename):
+        """A mesh file finished loading: links shaped by it were estimated from their scale."""
+        stale = [n for n, l in self.model.links.items() if l.mesh == filename]
+        for n in stale: self._local.pop(n, None)
+        if stale: self._report = None
+
+    def _link_terms(self, links):
+        missing = [l for l in links if l.name not in self._local]
+        if missing:
+            auto = link_inertias(missing)
+            for l, I in zip(missing, auto):
+                centroid = l.origin
+                if l.manual_inertia and l.inertia:
+                    try: I = manual_inertia_matrix(l.inertia); centroid = l.com or (0.0, 0.0, 0.0)
+                    except ValueError: pass     # reported by the validator; fall back to the shape
+                    else:
+                        # the tensor is given about the <inertial> origin's axes: rotate it into the link frame
+                        if l.com_rpy: R = rpy_matrices(l.com_rpy)[0]; I = R @ I @ R.T
+                self._local[l.name] = (float(l.mass), np.asarray(centroid, dtype=float), I)
+        terms = [self._local[l.name] for l in links]
+        return (np.array([t[0] for t in terms]), np.array([t[1] for t in terms]).reshape(-1, 3),
+                np.array([t[2] for t in terms]).reshape(-1, 3, 3))
+
+    def report(self):
+        """{'mass', 'com' (3,), 'inertia' (3,3) about the root origin, 'inertia_com' (3,3) about the COM}."""
+        self.tree.update()
+        key = (self.model.revision, self.tree.version)
+        if self._report is not None and self._key == key:
+            return self._report
+        links = list(self.model.links.values())
+        m, c, I = self._link_terms(links)
+        W = self.tree.world_poses([l.name for l in links])
+        R = W[:, :3, :3]
+        p = np.einsum('nij,nj->ni', R, c) + W[:, :3, 3]      # link centroids in the root frame
+        total = m.sum()
+        com = (m[:, None] * p).sum(axis=0) / total if total > 0 else np.zeros(3)
+        rotated = (R @ I @ R.transpose(0, 2, 1)).sum(axis=0)
+        # parallel-axis shift of every centroid to the root origin, then back to the COM
+        about_root = rotated + point_mass_inertia(p, m)
+        about_com = about_root - point_mass_inertia(com[None], np.array([total]))
+        self._report = {'mass': float(total), 'com': com, 'inertia': about_root, 'inertia_com': about_com}
+        self._key = key
+        return self._report
@@ -0,0 +1,126 @@
+"""Background jobs for the GUI: URDF serialization and parsing off the Qt GUI thread.
+
+Workers only see detached data (a URDFModel.snapshot() or the editor text) and hand
+results back through queued signals; submitting a new job of the same kind cancels
+the previous one, and results of superseded jobs are never delivered.
+"""
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from urdf_model import URDFModel
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """Handle a worker function receives: report progress, notice cancellation."""
+    def __init__(self, job_id, runner):
+        self.id = job_id
+        self._runner = runner
+        self._cancel = threading.Event()
+        self._permille = -1
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def progress(self, fraction):
+        """Report progress in [0, 1]; raises JobCancelled once the job has been superseded."""
+        if self._cancel.is_set(): raise JobCancelled()
+        p = int(fraction * 1000)
+        if p != self._permille:     # at most 1000 signals per job
+            self._permille = p
+            self._runner.progress.emit(self.id, p)
+
+
+class _Task(QRunnable):
+    def __init__(self, job, fn, args):
+        super().__init__()
+        self.job = job; self.fn = fn; self.args = args
+
+    def run(self):
+        job = self.job; runner = job._runner
+        try:
+            result = self.fn(job, *self.args)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            if not job.cancelled: runner.failed.emit(job.id, e)
+        else:
+            if not job.cancelled: runner.finished.emit(job.id, result)
+        finally:
+            runner._tasks.discard(self)
+
+
+class LatestJobRunner(QObject):
+    """Runs jobs of one kind on a thread pool, keeping only the newest one alive.
+
+    fn(job, *args) runs on a pool thread; finished/failed/progress are emitted from there
+    and arrive queued on the thread this object lives in. Slots should still check
+    is_current(job_id), since a result can be in flight when a newer job is submitted.
+    """
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+    progress = pyqtSignal(int, int)     # job id, per-mille
+
+    def __init__(self, pool=None, parent=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._current = None
+        self._next_id = 0
+        self._tasks = set()     # keep Python-side runnables alive until they ran
+
+    def submit(self, fn, *args):
+        self.cancel()
+        self._next_id += 1
+        job = self._current = Job(self._next_id, self)
+        task = _Task(job, fn, args)
+        self._tasks.add(task)
+        self.pool.start(task)
+        return job.id
+
+    def cancel(self):
+        if self._current is not None: self._current.cancel()
+        self._current = None
+
+    def is_current(self, job_id):
+        return self._current is not None and self._current.id == job_id
+
+    def done(self, job_id):
+        """Call from the result slot: the job stops counting as pending."""
+        if self.is_current(job_id): self._current = None
+
+    @property
+    def busy(self):
+        return self._current is not None
+
+
+# ----------------------- Job functions -----------------------
+class ProgressReader:
+    """File-like view of a str/bytes document that reports read progress to a Job."""
+    def __init__(self, data, job):
+        self.data = data if isinstance(data, bytes) else data.encode('utf-8')
+        self.pos = 0
+        self.job = job
+
+    def read(self, size=-1):
+        end = len(self.data) if size is None or size < 0 else min(len(self.data), self.pos + size)
+        chunk = self.data[self.pos:end]; self.pos = end
+        self.job.progress(end / len(self.data) if self.data else 1.0)
+        return chunk
+
+def serialize_job(job, snapshot):
+    """-> (xml text, snapshot) so the caller can reuse the fragments it rendered."""
+    return snapshot.to_urdf_string(), snapshot
+
+def parse_job(job, text):
+    """-> a fresh URDFModel parsed from text; raises URDFParseError."""
+    model = URDFModel()
+    model.load_from_stream(ProgressReader(text, job))
+    return model
@@ -0,0 +1,301 @@
+import csv
+from math import pi
+
+import numpy as np
+
+from urdf_columnar import joint_columns, link_columns
+
+# ----------------------- Batched transforms -----------------------
+def rpy_matrices(rpys):
+    """(N,3) roll/pitch/yaw -> (N,3,3) rotations, R = Rz(yaw) Ry(pitch) Rx(roll) as in URDF."""
+    a = np.asarray(rpys, dtype=float).reshape(-1, 3)
+    cr, cp, cy = np.cos(a).T
+    sr, sp, sy = np.sin(a).T
+    m = np.empty((len(a), 3, 3))
+    m[:, 0, 0] = cy*cp; m[:, 0, 1] = cy*sp*sr - sy*cr; m[:, 0, 2] = cy*sp*cr + sy*sr
+    m[:, 1, 0] = sy*cp; m[:, 1, 1] = sy*sp*sr + cy*cr; m[:, 1, 2] = sy*sp*cr - cy*sr
+    m[:, 2, 0] = -sp;   m[:, 2, 1] = cp*sr;            m[:, 2, 2] = cp*cr
+    return m
+
+def transforms(xyzs, rpys):
+    """(N,3) translations and (N,3) rpy -> (N,4,4) homogeneous transforms."""
+    xyz = np.asarray(xyzs, dtype=float).reshape(-1, 3)
+    m = np.zeros((len(xyz), 4, 4))
+    m[:, :3, :3] = rpy_matrices(rpys)
+    m[:, :3, 3] = xyz
+    m[:, 3, 3] = 1.0
+    return m
+
+def axis_angle_matrices(axes, angles):
+    """Rodrigues rotation about unit (N,3) axes by (N,) angles -> (N,3,3); zero axes give identity."""
+    k = np.asarray(axes, dtype=float).reshape(-1, 3)
+    t = np.asarray(angles, dtype=float).reshape(-1)
+    K = np.zeros((len(k), 3, 3))
+    K[:, 0, 1] = -k[:, 2]; K[:, 0, 2] = k[:, 1]
+    K[:, 1, 0] = k[:, 2];  K[:, 1, 2] = -k[:, 0]
+    K[:, 2, 0] = -k[:, 1]; K[:, 2, 1] = k[:, 0]
+    return np.identity(3) + np.sin(t)[:, None, None] * K + (1.0 - np.cos(t))[:, None, None] * (K @ K)
+
+def unit_axes(axes):
+    a = np.asarray(axes, dtype=float).reshape(-1, 3)
+    n = np.linalg.norm(a, axis=1, keepdims=True)
+    return np.divide(a, n, out=np.zeros_like(a), where=n > 0)
+
+# joint motion kinds
+FIXED, ROTATE, SLIDE = 0, 1, 2
+MOTION = {'revolute': ROTATE, 'continuous': ROTATE, 'prismatic': SLIDE}
+
+# ----------------------- Kinematic tree -----------------------
+class KinematicTree:
+    """Forward kinematics over URDFModel.joints with cached world poses for every link.
+
+    Links are stored in depth-first preorder, so the subtree below any link is the
+    contiguous slice [i, i + subtree_size[i]). World transforms are computed one tree
+    level at a time with batched matmuls, and only for subtrees marked dirty by a joint
+    position change or a joint edit; structural edits rebuild the index lazily.
+
+    A link's world pose is its joint frame; the visual origin is applied on top of it
+    by consumers (see visual_poses).
+    """
+    def __init__(self, model):
+        self.model = model
+        self.positions = {}     # joint name -> joint value (rad or m)
+        self.names = []         # link names in preorder
+        self.index = {}         # link name -> row
+        self.joint_index = {}   # joint name -> row of its child link
+        self._stale = True
+        self._dirty = set()     # rows whose subtree needs recomputation
+        self.version = 0        # bumped whenever cached world poses change
+        model.subscribe(self._on_model_event)
+
+    # ---------- structure ----------
+    def _on_model_event(self, event, kind, name):
+        if self._stale: return
+        if kind == 'joint' and event == 'changed' and name in self.joint_index:
+            row = self.joint_index[name]; p = self.parent[row]
+            j = self.model.joints.get(name)
+            # same parent/child: only the joint frame moved, refresh it and its subtree
+            if j is not None and self.index.get(j.child) == row and p >= 0 and self.names[p] == j.parent:
+                self._load_joint_rows([row])
+                self._dirty.add(row)
+                return
+        if kind == 'link' and event == 'changed' and name in self.index:
+            return   # visual-only edit, the link frame is unaffected
+        self._stale = True
+
+    def rebuild(self):
+        links = self.model.links; joints = self.model.joints
+        children = {}           # parent link -> [(joint name, child link)]
+        parent_joint = {}       # child link -> joint name; first joint wins if a link has two parents
+        for jn, j in joints.items():
+            if j.parent not in links or j.child not in links or j.child in parent_joint or j.child == j.parent:
+                continue
+            parent_joint[j.child] = jn
+            children.setdefault(j.parent, []).append(j.child)
+        names = []; parent = []; depth = []; seen = set()
+        roots = [n for n in links if n not in parent_joint]
+        # links stuck in a cycle have no root; treat the first of each as one
+        for start in roots + [n for n in links if n in parent_joint]:
+            if start in seen: continue
+            stack = [(start, -1, 0)]
+            while stack:
+                n, p, d = stack.pop()
+                if n in seen: continue
+                seen.add(n)
+                row = len(names)
+                names.append(n); parent.append(p); depth.append(d)
+                for c in reversed(children.get(n, ())):
+                    if c not in seen: stack.append((c, row, d + 1))
+        self.names = names
+        self.index = {n: i for i, n in enumerate(names)}
+        self.parent = np.array(parent, dtype=np.int64)
+        self.depth = np.array(depth, dtype=np.int64)
+        # preorder subtree sizes, accumulated bottom-up
+        size = np.ones(len(names), dtype=np.int64)
+        for i in range(len(names) - 1, 0, -1):
+            if parent[i] >= 0: size[parent[i]] += size[i]
+        self.subtree_size = size
+        self.joint_names = [None] * len(names)
+        self.joint_index = {}
+        for child, jn in parent_joint.items():
+            row = self.index[child]
+            if self.parent[row] >= 0 and names[self.parent[row]] == joints[jn].parent:
+                self.joint_names[row] = jn; self.joint_index[jn] = row
+        n = len(names)
+        self.local = np.tile(np.identity(4), (n, 1, 1))
+        self.axis = np.zeros((n, 3))
+        self.motion = np.zeros(n, dtype=np.int64)
+        self.q = np.zeros(n)
+        self.world = np.tile(np.identity(4), (n, 1, 1))
+        self._load_joint_rows(list(self.joint_index.values()))
+        self._stale = False
+        self._dirty = {i for i in range(n) if parent[i] < 0}
+
+    def _load_joint_rows(self, rows):
+        if not rows: return
+        joints = [self.model.joints[self.joint_names[r]] for r in rows]
+        cols = joint_columns(joints)
+        if cols is not None:
+            self.local[rows] = transforms(cols['origin'], cols['rpy'])
+            self.axis[rows] = unit_axes(cols['axis'])
+            self.motion[rows] = [MOTION.get(t, FIXED) for t in cols['type']]
+        else:
+            self.local[rows] = transforms([j.origin_xyz for j in joints], [j.origin_rpy for j in joints])
+            self.axis[rows] = unit_axes([j.axis for j in joints])
+            self.motion[rows] = [MOTION.get(j.jtype, FIXED) for j in joints]
+        self.q[rows] = [self.positions.get(j.name, 0.0) for j in joints]
+
+    # ---------- joint state ----------
+    def set_joint_position(self, name, value):
+        self.set_joint_positions({name: value})
+
+    def set_joint_positions(self, values):
+        """Set several joint values at once; only the subtrees below them get recomputed."""
+        self.positions.update(values)
+        if self._stale: return
+        rows = [self.joint_index[n] for n in values if n in self.joint_index]
+        if rows:
+            self.q[rows] = [values[self.joint_names[r]] for r in rows]
+            self._dirty.update(rows)
+
+    # ---------- evaluation ----------
+    def update(self):
+        """Bring cached world poses up to date; returns the rows that were recomputed."""
+        if self._stale: self.rebuild()
+        if not self._dirty: return np.zeros(0, dtype=np.int64)
+        # drop dirty rows that sit inside another dirty subtree
+        starts = sorted(self._dirty); self._dirty = set()
+        spans = []; end = -1
+        for s in starts:
+            if s < end: continue
+            end = s + self.subtree_size[s]; spans.append(np.arange(s, end))
+        rows = np.concatenate(spans)
+        self._evaluate(rows)
+        self.version += 1
+        return rows
+
+    def _evaluate(self, rows):
+        rows = rows[np.argsort(self.depth[rows], kind='stable')]
+        # joint motion for every row in one batch: local = origin @ motion(q)
+        local = self.local[rows]
+        motion = self.motion[rows]
+        rot = motion == ROTATE
+        if rot.any():
+            local[rot, :3, :3] = local[rot, :3, :3] @ axis_angle_matrices(self.axis[rows[rot]], self.q[rows[rot]])
+        slide = motion == SLIDE
+        if slide.any():
+            # translation along the axis, expressed in the joint frame
+            local[slide, :3, 3] += np.einsum('nij,nj->ni', local[slide, :3, :3], self.axis[rows[slide]] * self.q[rows[slide], None])
+        # then chain onto parents one tree level at a time
+        parent = self.parent[rows]
+        cuts = np.flatnonzero(np.diff(self.depth[rows])) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(rows)]):
+            p = parent[lo:hi]
+            if (p < 0).all():
+                self.world[rows[lo:hi]] = local[lo:hi]
+            elif (p >= 0).all():
+                self.world[rows[lo:hi]] = self.world[p] @ local[lo:hi]
+            else:
+                out = local[lo:hi].copy(); has = p >= 0
+                out[has] = self.world[p[has]] @ out[has]
+                self.world[rows[lo:hi]] = out
+
+    def world_pose(self, link_name):
+        self.update()
+        return self.world[self.index[link_name]].copy()
+
+    def world_poses(self, names=None):
+        """(N,4,4) link frames for `names` (default: every link in model order)."""
+        self.update()
+        names = list(self.model.links) if names is None else names
+        return self.world[[self.index[n] for n in names]] if names else np.zeros((0, 4, 4))
+
+    def world_batch(self, names, values):
+        """World frames of every row for K joint configurations at once -> (K, n, 4, 4).
+
+        values is (K, len(names)) for the joints `names`; other joints keep their current
+        positions. The cached poses are left untouched.
+        """
+        self.update()
+        values = np.asarray(values, dtype=float).reshape(-1, len(names))
+        k = len(values); n = len(self.names)
+        if not n: return np.zeros((k, 0, 4, 4))
+        q = np.repeat(self.q[None], k, axis=0)
+        cols = [i for i, name in enumerate(names) if name in self.joint_index]
+        q[:, [self.joint_index[names[i]] for i in cols]] = values[:, cols]
+        world = np.repeat(self.local[None], k, axis=0)
+        rot = np.flatnonzero(self.motion == ROTATE)
+        if len(rot):
+            R = axis_angle_matrices(np.tile(self.axis[rot], (k, 1)), q[:, rot].reshape(-1)).reshape(k, len(rot), 3, 3)
+            world[:, rot, :3, :3] = world[:, rot, :3, :3] @ R
+        slide = np.flatnonzero(self.motion == SLIDE)
+        if len(slide):
+            world[:, slide, :3, 3] += np.einsum('knij,knj->kni', world[:, slide, :3, :3], self.axis[slide][None] * q[:, slide, None])
+        # chain in place one tree level at a time; parents are final before their children
+        order = np.argsort(self.depth, kind='stable')
+        cuts = np.flatnonzero(np.diff(self.depth[order])) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, n]):
+            rows = order[lo:hi]; p = self.parent[rows]; has = p >= 0
+            if has.any(): world[:, rows[has]] = world[:, p[has]] @ world[:, rows[has]]
+        return world
+
+    def visual_poses(self, links):
+        """World pose of each link's visual origin: link frame @ (origin, rpy)."""
+        links = list(links)
+        if not links: return np.zeros((0, 4, 4))
+        cols = link_columns(links)
+        if cols is not None: local = transforms(cols['origin'], cols['rpy'])
+        else: local = transforms([l.origin for l in links], [l.rpy for l in links])
+        return self.world_poses([l.name for l in links]) @ local
+
+
+# ----------------------- Joint state & trajectories -----------------------
+def movable_joints(model):
+    return [j for j in model.joints.values() if j.jtype in MOTION]
+
+def joint_range(joint):
+    """(lower, upper) a joint value is clamped to; continuous joints wrap one turn."""
+    if joint.jtype == 'continuous':
+        return (-pi, pi)
+    if joint.limit and joint.limit[0] is not None and joint.limit[1] is not None:
+        lo, hi = float(joint.limit[0]), float(joint.limit[1])
+        return (min(lo, hi), max(lo, hi))
+    return (-pi, pi) if joint.jtype == 'revolute' else (-1.0, 1.0)
+
+def load_trajectory_csv(path):
+    """Read a joint trajectory CSV: a header of joint names, then one row of values per frame.
+
+    A leading 'time'/'t' column is accepted and dropped; playback runs at a fixed rate.
+    Returns (joint names, (frames, joints) float array).
+    """
+    with open(path, newline='') as f:
+        header = [h.strip() for h in next(csv.reader(f))]
+        values = np.loadtxt(f, delimiter=',', ndmin=2)
+    if header and header[0].lower() in ('time', 't'):
+        header = header[1:]; values = values[:, 1:]
+    if values.shape[1] != len(header):
+        raise ValueError(f"{path}: {len(header)} joint names but {values.shape[1]} value columns")
+    return header, values
+
+class TrajectoryPlayer:
+    """Steps a KinematicTree through trajectory frames; columns for unknown joints are ignored."""
+    def __init__(self, tree, names, frames):
+        joints = tree.model.joints
+        keep = [i for i, n in enumerate(names) if n in joints and joints[n].jtype in MOTION]
+        self.tree = tree
+        self.names = [names[i] for i in keep]
+        ranges = np.array([joint_range(joints[n]) for n in self.names]).reshape(-1, 2)
+        # clamp every frame to the joint limits once, up front
+        self.frames = np.clip(np.asarray(frames, dtype=float)[:, keep], ranges[:, 0], ranges[:, 1])
+        self.index = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def step(self):
+        """Apply the current frame (looping at the end) and advance; returns the frame index shown."""
+        if not len(self.frames): return -1
+        i = self.index
+        self.tree.set_joint_positions(dict(zip(self.names, self.frames[i].tolist())))
+        self.index = (i + 1) % len(self.frames)
+        return i
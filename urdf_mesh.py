@@ -0,0 +1,227 @@
+"""Mesh files for <mesh> geometry: STL (binary and ASCII) and OBJ readers plus a shared cache.
+
+Readers return interleaved float32 (N, 6) position/normal triangle lists, the vertex
+layout the viewer uploads as-is, with flat per-face normals. MeshCache keeps loaded
+meshes in an LRU bounded by bytes and can load them on a background thread, so opening a
+model with many meshes never waits on disk; every link that names the same file shares
+one entry (and one GPU buffer in the viewer).
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+MESH_EXTENSIONS = ('.stl', '.obj')
+_STL_RECORD = np.dtype([('normal', '<f4', (3,)), ('v', '<f4', (3, 3)), ('attr', '<u2')])
+_ASCII_VERTEX = re.compile(rb'vertex\s+(\S+)\s+(\S+)\s+(\S+)')
+
+
+class MeshError(ValueError):
+    pass
+
+
+# ----------------------- Readers -----------------------
+def _with_normals(tris):
+    """(T,3,3) triangles -> (3T, 6) float32 position + flat normal."""
+    tris = np.asarray(tris, dtype=np.float32).reshape(-1, 3, 3)
+    n = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    length = np.linalg.norm(n, axis=1, keepdims=True)
+    n = np.divide(n, length, out=np.zeros_like(n), where=length > 0)
+    out = np.empty((len(tris), 3, 6), dtype=np.float32)
+    out[..., :3] = tris; out[..., 3:] = n[:, None, :]
+    return out.reshape(-1, 6)
+
+def read_stl(data):
+    """Triangles of an STL file's bytes; binary unless it is well-formed 'solid ...' text."""
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, '<u4', 1, 80)[0])
+        if len(data) == 84 + 50 * count:
+            return _with_normals(np.frombuffer(data, _STL_RECORD, count, 84)['v'])
+    if not data.lstrip()[:5].lower() == b'solid':
+        raise MeshError("not an STL file")
+    v = _ASCII_VERTEX.findall(data)
+    if len(v) % 3: raise MeshError("ASCII STL with an incomplete facet")
+    try:
+        return _with_normals(np.array(b' '.join(b' '.join(t) for t in v).split(), dtype=float))
+    except ValueError:
+        raise MeshError("ASCII STL with a non-numeric vertex") from None
+
+def read_obj(data):
+    """Triangles of a Wavefront OBJ's bytes (faces fan-triangulated; texture/normal indexes ignored)."""
+    verts = []; faces = []
+    for line in data.splitlines():
+        if line[:2] == b'v ': verts.append(line[2:])
+        elif line[:2] == b'f ': faces.append(line[2:].split())
+    try:
+        v = np.array([t.split()[:3] for t in verts], dtype=float).reshape(-1, 3)
+        tris = []
+        for f in faces:
+            idx = [int(t.split(b'/', 1)[0]) for t in f]
+            idx = [i - 1 if i > 0 else len(v) + i for i in idx]     # 1-based; negative = from the end
+            tris += [(idx[0], idx[k], idx[k + 1]) for k in range(1, len(idx) - 1)]
+        tris = np.array(tris, dtype=np.int64).reshape(-1, 3)
+        return _with_normals(v[tris])
+    except (ValueError, IndexError) as e:
+        raise MeshError(f"malformed OBJ: {e}") from None
+
+def load_mesh(path):
+    """-> (N, 6) float32 triangles of an .stl/.obj file; raises OSError or MeshError."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in MESH_EXTENSIONS: raise MeshError(f"unsupported mesh format '{ext}'")
+    with open(path, 'rb') as f:
+        data = f.read()
+    return read_stl(data) if ext == '.stl' else read_obj(data)
+
+
+# ----------------------- Paths -----------------------
+def resolve_mesh_path(filename, search_paths=()):
+    """Local path of a URDF mesh filename ('package://pkg/...', 'file://...', relative), or None.
+
+    package:// URIs are looked up under ROS_PACKAGE_PATH and search_paths (as <dir>/<pkg>/...
+    or, for a directory named like the package, <dir>/...); relative names under search_paths.
+    """
+    if not filename: return None
+    if filename.startswith('file://'):
+        path = filename[7:]
+        return path if os.path.isfile(path) else None
+    roots = list(search_paths)
+    if filename.startswith('package://'):
+        pkg, _, rest = filename[10:].partition('/')
+        roots += [p for p in os.environ.get('ROS_PACKAGE_PATH', '').split(os.pathsep) if p]
+        for root in roots:
+            for cand in (os.path.join(root, pkg, rest), os.path.join(root, rest) if os.path.basename(os.path.normpath(root)) == pkg else None):
+                if cand and os.path.isfile(cand): return cand
+        return None
+    if os.path.isabs(filename): return filename if os.path.isfile(filename) else None
+    for root in roots + [os.getcwd()]:
+        cand = os.path.join(root, filename)
+        if os.path.isfile(cand): return cand
+    return None
+
+
+# ----------------------- Cache -----------------------
+class MeshCache:
+    """Loaded meshes by resolved path, least recently used evicted past max_bytes.
+
+    get() and preload() are synchronous; request() and bounds() return what is cached and
+    otherwise queue a load on a worker thread, calling the subscribers with the filename
+    from that thread when it lands (the viewer re-emits it as a queued Qt signal). Failed
+    loads are remembered as None until clear() so a missing file is not retried on every
+    repaint. Bounds are kept apart from the triangles and survive their eviction.
+    """
+    def __init__(self, max_bytes=256 << 20, search_paths=(), workers=2):
+        self.max_bytes = max_bytes
+        self.search_paths = list(search_paths)
+        self.errors = {}            # filename -> message of the last failed load
+        self._entries = OrderedDict()   # filename -> array or None (failed)
+        self._bounds = {}           # filename -> (min corner, max corner) or None (failed/empty)
+        self._generation = 0        # bumped by clear(); loads started before it are dropped
+        self._bytes = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._pool = None
+        self._workers = workers
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners: self._listeners.remove(callback)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def _lookup(self, filename):
+        with self._lock:
+            if filename not in self._entries: return False, None
+            self._entries.move_to_end(filename)
+            return True, self._entries[filename]
+
+    def _store(self, filename, mesh, generation):
+        bounds = (mesh[:, :3].min(axis=0), mesh[:, :3].max(axis=0)) if mesh is not None and len(mesh) else None
+        with self._lock:
+            if generation != self._generation: return
+            self._bounds[filename] = bounds
+            old = self._entries.pop(filename, None)
+            if old is not None: self._bytes -= old.nbytes
+            self._entries[filename] = mesh
+            if mesh is not None: self._bytes += mesh.nbytes
+            # never evict what was just stored, even if it alone is over budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, gone = self._entries.popitem(last=False)
+                if gone is not None: self._bytes -= gone.nbytes
+
+    def _load(self, filename):
+        generation = self._generation
+        path = resolve_mesh_path(filename, self.search_paths)
+        try:
+            if path is None: raise OSError(f"mesh file not found: {filename}")
+            mesh = load_mesh(path)
+        except (OSError, MeshError) as e:
+            self.errors[filename] = str(e); mesh = None
+        self._store(filename, mesh, generation)
+        return mesh
+
+    def get(self, filename):
+        """Triangles for filename (loading it now if needed), or None if it can't be loaded."""
+        found, mesh = self._lookup(filename)
+        return mesh if found else self._load(filename)
+
+    def request(self, filename):
+        """(cached, triangles or None) without blocking; a miss starts a background load."""
+        found, mesh = self._lookup(filename)
+        if found: return True, mesh
+        with self._lock:
+            if filename in self._pending: return False, None
+            self._pending.add(filename)
+            if self._pool is None: self._pool = ThreadPoolExecutor(self._workers, thread_name_prefix='mesh')
+        self._pool.submit(self._load_async, filename)
+        return False, None
+
+    def _load_async(self, filename):
+        try:
+            self._load(filename)
+        finally:
+            with self._lock: self._pending.discard(filename)
+        for cb in list(self._listeners): cb(filename)
+
+    def preload(self, filenames):
+        """Load every file now (headless callers that need bounds before going on)."""
+        for filename in set(filter(None, filenames)): self.get(filename)
+
+    def bounds(self, filename):
+        """(min corner, max corner) of a mesh, or None while it loads or if it can't be loaded.
+
+        Doesn't block: a file seen for the first time starts loading in the background.
+        """
+        with self._lock:
+            if filename in self._bounds: return self._bounds[filename]
+        self.request(filename)
+        return None
+
+    def bounds_state(self, filename):
+        """Token that changes whenever bounds(filename) may answer differently: loaded/failed, clear()."""
+        with self._lock: return self._generation, filename in self._bounds
+
+    def set_search_paths(self, paths):
+        """Directories relative mesh filenames resolve against; a change forgets what was loaded."""
+        paths = list(paths)
+        if paths != self.search_paths:
+            self.search_paths = paths; self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear(); self._bytes = 0; self.errors.clear(); self._bounds.clear()
+            self._pending.clear(); self._generation += 1
+
+    def shutdown(self):
+        if self._pool is not None: self._pool.shutdown(wait=False)
+        self._pool = None
+
+# shared by the viewer and the inertia estimate, so each file is read once
+default_cache = MeshCache()
@@ -0,0 +1,536 @@
+import copy
+import io
+import re
+from itertools import islice
+from xml.etree import ElementTree as ET
+
+from urdf_profile import profiled
+from urdf_validation import validate_model
+
+# ----------------------- Data classes -----------------------
+class Link:
+    def __init__(self, name,
+                 geom_type='box', size=(0.1,0.1,0.1),
+                 mass=1.0, inertia=None,
+                 manual_inertia=False,
+                 origin=(0.0,0.0,0.0), rpy=(0.0,0.0,0.0),
+                 include_collision=False,
+                 collision_geom=None, collision_size=None, com=None,
+                 mesh=None, collision_mesh=None, com_rpy=None):
+        self.name = name
+        self.geom_type = geom_type
+        self.size = size
+        self.mass = mass
+        self.inertia = inertia  # dict str values or None
+        self.manual_inertia = manual_inertia
+        self.origin = origin
+        self.rpy = rpy
+        self.include_collision = include_collision
+        # collision-specific stored if manual set; otherwise None meaning use visual
+        self.collision_geom = collision_geom
+        self.collision_size = collision_size
+        # center of mass of a manual inertia in the link frame; None = link origin
+        self.com = com
+        # mesh filenames for geom_type / collision_geom 'mesh' (size then holds the scale)
+        self.mesh = mesh
+        self.collision_mesh = collision_mesh
+        # orientation of a manual inertia's axes (its <inertial> origin rpy); None = the link frame
+        self.com_rpy = com_rpy
+
+
+class Joint:
+    def __init__(self, name, jtype, parent, child,
+                 origin_xyz=(0.0,0.0,0.0), origin_rpy=(0.0,0.0,0.0),
+                 axis=(0.0,0.0,1.0), limit=None, effort=10.0, velocity=1.0):
+        self.name = name
+        self.jtype = jtype
+        self.parent = parent
+        self.child = child
+        self.origin_xyz = origin_xyz
+        self.origin_rpy = origin_rpy
+        self.axis = axis
+        self.limit = limit
+        self.effort = effort
+        self.velocity = velocity
+
+
+def _xml_attr(value):
+    # same escaping minidom applies when pretty-printing attribute values
+    return str(value).replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+def _xml_tag(depth, tag, attrs, close=True):
+    """One element line at the given indent depth; self-closing unless close=False."""
+    body = "".join(f' {k}="{_xml_attr(v)}"' for k, v in attrs)
+    return f"{'  ' * depth}<{tag}{body}{'/' if close else ''}>\n"
+
+def _xml_geometry(depth, geom, size, mesh=None):
+    pad = '  ' * depth
+    if geom == 'box':
+        shape = _xml_tag(depth + 1, 'box', [('size', f"{size[0]} {size[1]} {size[2]}")])
+    elif geom == 'cylinder':
+        shape = _xml_tag(depth + 1, 'cylinder', [('radius', size[0]), ('length', size[2])])
+    elif geom == 'sphere':
+        shape = _xml_tag(depth + 1, 'sphere', [('radius', size[0])])
+    elif geom == 'mesh':
+        attrs = [('filename', mesh or "")]
+        if tuple(size) != (1.0, 1.0, 1.0): attrs.append(('scale', f"{size[0]} {size[1]} {size[2]}"))
+        shape = _xml_tag(depth + 1, 'mesh', attrs)
+    else:
+        return f"{pad}<geometry/>\n"
+    return f"{pad}<geometry>\n{shape}{pad}</geometry>\n"
+
+def link_signature(link):
+    """Everything that affects a link's XML; a changed signature invalidates its cached fragment."""
+    inertia = tuple(link.inertia.items()) if link.inertia else link.inertia
+    return (link.name, link.geom_type, tuple(link.size), link.mass, inertia, link.manual_inertia,
+            tuple(link.origin), tuple(link.rpy), link.include_collision,
+            link.collision_geom, tuple(link.collision_size) if link.collision_size else link.collision_size,
+            tuple(link.com) if link.com else link.com, link.mesh, link.collision_mesh,
+            tuple(link.com_rpy) if link.com_rpy else link.com_rpy)
+
+def joint_signature(joint):
+    return (joint.name, joint.jtype, joint.parent, joint.child, tuple(joint.origin_xyz), tuple(joint.origin_rpy),
+            tuple(joint.axis), tuple(joint.limit) if joint.limit else joint.limit, joint.effort, joint.velocity)
+
+def _mesh_state_changed(state):
+    from urdf_mesh import default_cache
+    return default_cache.bounds_state(state[0]) != state[1]
+
+def has_manual_inertia(link):
+    return bool(link.manual_inertia and link.inertia)
+
+def link_to_xml(link, auto_inertia=None):
+    """Pretty-printed <link> fragment (indent depth 1), as minidom would lay it out.
+
+    auto_inertia: <inertia> attributes computed from the geometry (urdf_inertia), used when
+    the link has no manual inertia.
+    """
+    out = [_xml_tag(1, 'link', [('name', link.name)], close=False)]
+    if has_manual_inertia(link):
+        out.append("    <inertial>\n")
+        if link.com is not None or link.com_rpy:
+            r = link.com_rpy or (0, 0, 0)
+            xyz = [('xyz', f"{link.com[0]} {link.com[1]} {link.com[2]}")] if link.com is not None else []
+            out.append(_xml_tag(3, 'origin', xyz + [('rpy', f"{r[0]} {r[1]} {r[2]}")]))
+        out.append(_xml_tag(3, 'mass', [('value', link.mass)]))
+        out.append(_xml_tag(3, 'inertia', list(link.inertia.items())))
+        out.append("    </inertial>\n")
+    elif auto_inertia is not None:
+        # centroid of the visual shape; the tensor is already rotated into the link frame
+        out.append("    <inertial>\n")
+        out.append(_xml_tag(3, 'origin', [('xyz', f"{link.origin[0]} {link.origin[1]} {link.origin[2]}"), ('rpy', "0 0 0")]))
+        out.append(_xml_tag(3, 'mass', [('value', link.mass)]))
+        out.append(_xml_tag(3, 'inertia', auto_inertia))
+        out.append("    </inertial>\n")
+    # Visual with origin (origin always included from link.origin)
+    origin = _xml_tag(3, 'origin', [('xyz', f"{link.origin[0]} {link.origin[1]} {link.origin[2]}"), ('rpy', f"{link.rpy[0]} {link.rpy[1]} {link.rpy[2]}")])
+    out.append("    <visual>\n")
+    out.append(origin)
+    out.append(_xml_geometry(3, link.geom_type, link.size, link.mesh))
+    out.append("    </visual>\n")
+    # Collision: if enabled, use manual collision properties if present else visual
+    if link.include_collision:
+        use_geom = link.collision_geom if link.collision_geom else link.geom_type
+        use_size = link.collision_size if link.collision_size else link.size
+        use_mesh = link.collision_mesh if link.collision_geom else link.mesh
+        out.append("    <collision>\n")
+        out.append(origin)
+        out.append(_xml_geometry(3, use_geom, use_size, use_mesh))
+        out.append("    </collision>\n")
+    out.append("  </link>\n")
+    return "".join(out)
+
+def joint_to_xml(joint):
+    """Pretty-printed <joint> fragment (indent depth 1)."""
+    out = [_xml_tag(1, 'joint', [('name', joint.name), ('type', joint.jtype)], close=False)]
+    out.append(_xml_tag(2, 'parent', [('link', joint.parent)]))
+    out.append(_xml_tag(2, 'child', [('link', joint.child)]))
+    out.append(_xml_tag(2, 'origin', [('xyz', f"{joint.origin_xyz[0]} {joint.origin_xyz[1]} {joint.origin_xyz[2]}"), ('rpy', f"{joint.origin_rpy[0]} {joint.origin_rpy[1]} {joint.origin_rpy[2]}")]))
+    if joint.jtype != 'fixed':
+        out.append(_xml_tag(2, 'axis', [('xyz', f"{joint.axis[0]} {joint.axis[1]} {joint.axis[2]}")]))
+    if joint.limit:
+        out.append(_xml_tag(2, 'limit', [('lower', joint.limit[0]), ('upper', joint.limit[1]), ('effort', joint.effort), ('velocity', joint.velocity)]))
+    out.append("  </joint>\n")
+    return "".join(out)
+
+
+class URDFParseError(ValueError):
+    """Malformed URDF text; line/column locate the problem when expat reported one."""
+    def __init__(self, message, line=None, column=None):
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+def _floats(text, default):
+    return tuple(map(float, text.split())) if text else default
+
+def _child(el, tag):
+    # direct-child lookup without the XPath machinery of find()
+    for c in el:
+        if c.tag == tag: return c
+    return None
+
+def _origin_of(el):
+    o = _child(el, 'origin') if el is not None else None
+    if o is None: return (0.0,0.0,0.0), (0.0,0.0,0.0)
+    return _floats(o.get('xyz'), (0.0,0.0,0.0)), _floats(o.get('rpy'), (0.0,0.0,0.0))
+
+def _shape_of(el):
+    """(geom_type, size, mesh filename) from the <geometry> of a visual/collision element, or Nones.
+
+    Sizes follow the GUI convention: slot x holds the radius for cylinders and spheres;
+    meshes keep their scale there.
+    """
+    g = _child(el, 'geometry') if el is not None else None
+    if g is None: return None, None, None
+    try:
+        for shape in g:
+            if shape.tag == 'box' and shape.get('size'):
+                return 'box', _floats(shape.get('size'), None), None
+            if shape.tag == 'cylinder' and shape.get('radius') and shape.get('length'):
+                r = float(shape.get('radius')); return 'cylinder', (r, r, float(shape.get('length'))), None
+            if shape.tag == 'sphere' and shape.get('radius'):
+                r = float(shape.get('radius')); return 'sphere', (r, r, r), None
+            if shape.tag == 'mesh' and shape.get('filename'):
+                scale = _floats(shape.get('scale'), (1.0, 1.0, 1.0))
+                if len(scale) == 1: scale = scale * 3
+                return 'mesh', scale, shape.get('filename')
+    except ValueError:
+        pass
+    return None, None, None
+
+def link_from_element(l):
+    name = l.get('name')
+    try:
+        inertial = _child(l, 'inertial')
+        mass_el = _child(inertial, 'mass') if inertial is not None else None
+        mass = float(mass_el.get('value')) if mass_el is not None and mass_el.get('value') else 1.0
+        inertia_el = _child(inertial, 'inertia') if inertial is not None else None
+        inertia = None; com = None; com_rpy = None
+        manual_inertia = False
+        if inertia_el is not None:
+            manual_inertia = True
+            inertia = {key: inertia_el.get(key) for key in ('ixx','ixy','ixz','iyy','iyz','izz') if inertia_el.get(key) is not None}
+            com_el = _child(inertial, 'origin')
+            if com_el is not None and com_el.get('xyz'): com = _floats(com_el.get('xyz'), None)
+            if com_el is not None and com_el.get('rpy'):
+                com_rpy = _floats(com_el.get('rpy'), None)
+                if not any(com_rpy): com_rpy = None
+        visual = _child(l, 'visual')
+        xyz, rpy = _origin_of(visual)
+    except ValueError as e:
+        raise URDFParseError(f"link '{name}': {e}") from None
+    geom_type, size, mesh = _shape_of(visual)
+    if geom_type is None: geom_type = 'box'; size = (0.1,0.1,0.1)
+    # check collision
+    coll_el = _child(l, 'collision')
+    collision_geom, collision_size, collision_mesh = _shape_of(coll_el)
+    return Link(name, geom_type, size, mass, inertia, manual_inertia, origin=xyz, rpy=rpy,
+                include_collision=coll_el is not None, collision_geom=collision_geom, collision_size=collision_size, com=com,
+                mesh=mesh, collision_mesh=collision_mesh, com_rpy=com_rpy)
+
+def joint_from_element(j):
+    name = j.get('name'); jtype = j.get('type','fixed')
+    parent_el = _child(j, 'parent'); child_el = _child(j, 'child')
+    parent = parent_el.get('link') if parent_el is not None else ""
+    child = child_el.get('link') if child_el is not None else ""
+    try:
+        xyz, rpy = _origin_of(j)
+        axis_el = _child(j, 'axis')
+        axis = _floats(axis_el.get('xyz'), (0.0,0.0,1.0)) if axis_el is not None else (0.0,0.0,1.0)
+        limit_el = _child(j, 'limit'); limit=None; effort=10.0; velocity=1.0
+        if limit_el is not None:
+            if limit_el.get('lower') and limit_el.get('upper'):
+                try: limit = (float(limit_el.get('lower')), float(limit_el.get('upper')))
+                except ValueError: limit = None
+            if limit_el.get('effort'): effort=float(limit_el.get('effort'))
+            if limit_el.get('velocity'): velocity=float(limit_el.get('velocity'))
+    except ValueError as e:
+        raise URDFParseError(f"joint '{name}': {e}") from None
+    return Joint(name, jtype, parent, child, origin_xyz=xyz, origin_rpy=rpy, axis=axis, limit=limit, effort=effort, velocity=velocity)
+
+
+# ----------------------- Text edits -----------------------
+def _common_prefix(a, b, limit, step=1 << 16):
+    # compare whole blocks first, then bisect the first block that differs
+    p = 0
+    while p < limit:
+        q = min(p + step, limit)
+        if a[p:q] == b[p:q]:
+            p = q; continue
+        lo, hi = p, q
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if a[lo:mid] == b[lo:mid]: lo = mid
+            else: hi = mid
+        return lo
+    return p
+
+def common_affixes(a, b):
+    """(prefix, suffix) lengths two strings share; they never overlap in the shorter string."""
+    n = min(len(a), len(b))
+    p = _common_prefix(a, b, n)
+    return p, _common_prefix(a[::-1], b[::-1], n - p)
+
+_ELEMENT_START = re.compile(r'<(?:link|joint)[\s>/]')
+
+def _element_start_before(old, new, pos):
+    """Last <link>/<joint> tag start before pos that both texts agree on, or -1."""
+    i = pos
+    while True:
+        i = new.rfind('<', 0, i)
+        if i < 0: return -1
+        if _ELEMENT_START.match(new, i) and _ELEMENT_START.match(old, i): return i
+
+def _parse_chunk(text, start, end):
+    """Top-level <link>/<joint> elements of text[start:end] -> (links, joints)."""
+    try:
+        root = ET.fromstring("<robot>" + text[start:end] + "</robot>")
+    except ET.ParseError as e:
+        # map the position back from the wrapped slice to the whole document
+        line, column = e.position
+        if line == 1: column += start - (text.rfind('\n', 0, start) + 1) - len("<robot>")
+        line += text.count('\n', 0, start)
+        raise URDFParseError(f"{str(e).split(':')[0]}: line {line}, column {column}", line, column) from None
+    links = [link_from_element(el) for el in root if el.tag == 'link']
+    joints = [joint_from_element(el) for el in root if el.tag == 'joint']
+    return links, joints
+
+
+def _insert(items, index, name, element):
+    """items[name] = element, placed at position index of the mapping's order.
+
+    Plain dicts have their tail re-inserted after it (O(len - index)); array-backed tables
+    (urdf_columnar) place the row themselves.
+    """
+    if hasattr(items, 'insert'): items.insert(index, name, element); return
+    items.pop(name, None)
+    tail = dict(islice(items.items(), index, None))
+    for k in tail: del items[k]
+    items[name] = element
+    items.update(tail)
+
+
+class URDFModel:
+    ROBOT_NAME = 'generated_robot'
+
+    def __init__(self):
+        self.links = {}   # name -> Link
+        self.joints = {}  # name -> Joint
+        self._fragments = {}  # ('link'|'joint', name) -> (signature, xml fragment, (mesh, bounds_state) for generated mesh inertias)
+        self.revision = 0     # bumped on every edit made through the methods below
+        self._listeners = []  # callback(event, kind, name); event: added | changed | removed | reset
+        self.duplicates = []  # ('link'|'joint', name) defined more than once in the last loaded file
+
+    # ---------- edits (notify listeners such as KinematicTree) ----------
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners: self._listeners.remove(callback)
+
+    def _notify(self, event, kind=None, name=None):
+        self.revision += 1
+        for cb in list(self._listeners):
+            cb(event, kind, name)
+
+    def touch(self, kind=None, name=None):
+        """Report an in-place change to an element, or (no args) to the whole model."""
+        self._notify('changed' if kind else 'reset', kind, name)
+
+    def add_link(self, link):
+        event = 'changed' if link.name in self.links else 'added'
+        self.links[link.name] = link
+        self._notify(event, 'link', link.name)
+
+    def add_joint(self, joint):
+        event = 'changed' if joint.name in self.joints else 'added'
+        self.joints[joint.name] = joint
+        self._notify(event, 'joint', joint.name)
+
+    def insert_link(self, index, link):
+        """add_link, with the link placed at position index of model.links (undoing a removal)."""
+        event = 'changed' if link.name in self.links else 'added'
+        _insert(self.links, index, link.name, link)
+        self._notify(event, 'link', link.name)
+
+    def insert_joint(self, index, joint):
+        event = 'changed' if joint.name in self.joints else 'added'
+        _insert(self.joints, index, joint.name, joint)
+        self._notify(event, 'joint', joint.name)
+
+    def remove_joint(self, name):
+        if self.joints.pop(name, None) is not None:
+            self._notify('removed', 'joint', name)
+
+    def remove_link(self, name, cascade=True):
+        """Remove a link and (cascade) every joint that references it; returns the removed joint names."""
+        if self.links.pop(name, None) is None: return []
+        # remove joints referencing that link
+        to_delete = [jn for jn,j in self.joints.items() if j.parent==name or j.child==name] if cascade else []
+        for jn in to_delete: del self.joints[jn]
+        self._notify('removed', 'link', name)
+        for jn in to_delete: self._notify('removed', 'joint', jn)
+        return to_delete
+
+    def snapshot(self):
+        """Detached copy for readers on another thread (see urdf_jobs).
+
+        Elements are shallow-copied so later in-place edits don't leak into it; the fragment
+        cache is shared, which is safe because to_urdf_string only ever replaces it.
+        """
+        snap = URDFModel()
+        snap.links = {n: copy.copy(l) for n, l in self.links.items()}
+        snap.joints = {n: copy.copy(j) for n, j in self.joints.items()}
+        snap.duplicates = list(self.duplicates)
+        snap._fragments = self._fragments
+        snap.revision = self.revision
+        return snap
+
+    def adopt_fragments(self, other):
+        """Reuse XML fragments another model (usually a snapshot) rendered; stale ones fail their signature check."""
+        self._fragments = other._fragments
+
+    def replace_with(self, other):
+        """Take over the contents of another model (e.g. one parsed on a worker thread)."""
+        self.links = other.links; self.joints = other.joints; self.duplicates = other.duplicates
+        self._notify('reset')
+
+    def validate(self):
+        """All structural and numeric problems as a list of urdf_validation.Diagnostic."""
+        return validate_model(self)
+
+    @profiled('URDFModel.to_urdf_string')
+    def to_urdf_string(self):
+        """Serialize to pretty URDF, re-rendering only links/joints whose signature changed.
+
+        Links without manual inertia get one computed from their shape and mass; those
+        tensors are computed in a single NumPy batch for all re-rendered links.
+        """
+        cache = self._fragments
+        fresh = {}
+        stale = []
+        for kind, items, signature in (('link', self.links, link_signature), ('joint', self.joints, joint_signature)):
+            # array-backed tables (urdf_columnar) hand out bulk signatures and elements
+            bulk = hasattr(items, 'signatures')
+            pairs = zip(items.keys(), items.signatures()) if bulk else ((n, signature(el)) for n, el in items.items())
+            missed = []
+            for name, sig in pairs:
+                key = (kind, name)
+                hit = cache.get(key)
+                if hit is not None and hit[0] == sig and (hit[2] is None or not _mesh_state_changed(hit[2])):
+                    fresh[key] = hit
+                else:
+                    fresh[key] = (sig, None, None); missed.append(name)
+            elements = items.elements(missed) if bulk else [items[n] for n in missed]
+            stale += [((kind, n), el) for n, el in zip(missed, elements)]
+        auto = {}; mesh_states = {}
+        need = [el for (kind, _), el in stale if kind == 'link' and not has_manual_inertia(el)]
+        if need:
+            from urdf_inertia import auto_inertials   # NumPy only when something needs it
+            from urdf_mesh import default_cache
+            # a mesh still loading is estimated from its scale: re-rendered once its bounds state moves on
+            mesh_states = {el.name: (el.mesh, default_cache.bounds_state(el.mesh)) for el in need
+                       if el.geom_type == 'mesh' and el.mesh}
+            auto = auto_inertials(need)
+        for key, el in stale:
+            frag = link_to_xml(el, auto.get(el.name)) if key[0] == 'link' else joint_to_xml(el)
+            fresh[key] = (fresh[key][0], frag, mesh_states.get(el.name) if key[0] == 'link' else None)
+        # entries for removed elements fall out here
+        self._fragments = fresh
+        parts = [frag for _, frag, _ in fresh.values()]
+        head = f'<?xml version="1.0" ?>\n<robot name="{_xml_attr(self.ROBOT_NAME)}"'
+        if not parts:
+            return head + "/>\n"
+        return head + ">\n" + "".join(parts) + "</robot>\n"
+
+    def apply_text_edit(self, old_text, new_text):
+        """Patch the model from an edit of URDF text, re-parsing only the elements it touched.
+
+        old_text is the text the edit started from (normally to_urdf_string() output). Only
+        the top-level <link>/<joint> elements spanning the changed region are parsed; links
+        and joints are added, replaced or removed in place, so untouched elements keep
+        their objects and caches. Returns False, leaving the model alone, when the edit
+        reaches outside those elements (e.g. the <robot> tag): the caller should load the
+        whole document instead. Raises URDFParseError for malformed elements.
+        """
+        if old_text == new_text: return True
+        p, s = common_affixes(old_text, new_text)
+        start = _element_start_before(old_text, new_text, p + 1)
+        if start < 0: return False
+        # end just before the next element (or </robot>) inside the common suffix
+        m = _ELEMENT_START.search(new_text, len(new_text) - s)
+        end = m.start() if m else new_text.rfind('</robot>', len(new_text) - s)
+        if end < 0: return False
+        old_end = end - len(new_text) + len(old_text)
+        try:
+            old_links, old_joints = _parse_chunk(old_text, start, old_end)
+        except URDFParseError:
+            return False
+        new_links, new_joints = _parse_chunk(new_text, start, end)
+        keep_links = {l.name for l in new_links}; keep_joints = {j.name for j in new_joints}
+        for j in old_joints:
+            if j.name not in keep_joints: self.remove_joint(j.name)
+        # joints still naming a removed link stay in the model (and show up as diagnostics)
+        for l in old_links:
+            if l.name not in keep_links: self.remove_link(l.name, cascade=False)
+        was = {l.name: l for l in old_links}
+        for l in new_links:
+            cur = self.links.get(l.name); prev = was.get(l.name)
+            if (cur is not None and not has_manual_inertia(cur) and prev is not None
+                    and (l.inertia, l.com, l.com_rpy) == (prev.inertia, prev.com, prev.com_rpy)):
+                # generated <inertial> left alone: keep deriving it from the shape
+                l.manual_inertia = False; l.inertia = None; l.com = None; l.com_rpy = None
+            if cur is None or link_signature(cur) != link_signature(l): self.add_link(l)
+        for j in new_joints:
+            cur = self.joints.get(j.name)
+            if cur is None or joint_signature(cur) != joint_signature(j): self.add_joint(j)
+        return True
+
+    @profiled('URDFModel.load_from_urdf_string')
+    def load_from_urdf_string(self, urdf_text):
+        try:
+            self.load_from_stream(io.StringIO(urdf_text))
+        except URDFParseError:
+            return False
+        return True
+
+    def load_from_file(self, path):
+        with open(path, 'rb') as f:
+            self.load_from_stream(f)
+
+    @profiled('URDFModel.load_from_stream')
+    def load_from_stream(self, stream):
+        """Parse URDF incrementally with iterparse; raises URDFParseError with line/column.
+
+        Each top-level <link>/<joint> is turned into a Link/Joint as soon as its closing tag
+        arrives and then dropped from the tree, so memory stays bounded by the model rather
+        than the document. The model is only replaced once the whole stream parsed cleanly.
+        """
+        links = {}; joints = {}; duplicates = []
+        root = None; depth = 0
+        try:
+            for event, el in ET.iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    if root is None: root = el
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 1: continue
+                if el.tag == 'link':
+                    link = link_from_element(el)
+                    if link.name in links: duplicates.append(('link', link.name))
+                    links[link.name] = link
+                elif el.tag == 'joint':
+                    joint = joint_from_element(el)
+                    if joint.name in joints: duplicates.append(('joint', joint.name))
+                    joints[joint.name] = joint
+                el.clear(); root.remove(el)
+        except ET.ParseError as e:
+            line, column = e.position
+            raise URDFParseError(str(e), line, column) from None
+        if root is None:
+            raise URDFParseError("empty document", 1, 0)
+        parsed = URDFModel()
+        parsed.links = links; parsed.joints = joints; parsed.duplicates = duplicates
+        self.replace_with(parsed)
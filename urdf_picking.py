@@ -0,0 +1,199 @@
+"""Click-to-select in the 3D view: a ray from the camera against a BVH over link geometry.
+
+The BVH is an implicit 8-ary tree over the links' world bounding boxes, sorted along a
+Morton curve: level boxes are plain arrays reduced eight at a time, so building and refitting
+are a handful of NumPy calls, and a ray walks it one level per step, testing every node of
+the current frontier at once. Leaves that the ray reaches get an exact ray/box, ray/sphere
+or ray/cylinder test in the shape's own frame (mesh files: the box of their scaled bounds).
+"""
+import numpy as np
+
+from urdf_collision import BOX, CYLINDER, SPHERE, shape_of, world_aabbs
+from urdf_kinematics import transforms
+from urdf_mesh import default_cache
+
+FANOUT = 8
+
+
+def ray_through(x, y, width, height, modelview, projection):
+    """World (origin, unit direction) of the ray through window point (x, y), y down.
+
+    modelview/projection are row-major 4x4 arrays (SceneRenderer.view_matrices).
+    """
+    ndc = np.array([2.0 * x / width - 1.0, 1.0 - 2.0 * y / height])
+    inv = np.linalg.inv(np.asarray(projection, float) @ np.asarray(modelview, float))
+    near = inv @ np.r_[ndc, -1.0, 1.0]; far = inv @ np.r_[ndc, 1.0, 1.0]
+    near = near[:3] / near[3]; far = far[:3] / far[3]
+    d = far - near
+    return near, d / np.linalg.norm(d)
+
+def morton_codes(points):
+    """30-bit Morton codes of (N, 3) points, quantized over their bounding box."""
+    lo = points.min(axis=0); span = np.maximum(points.max(axis=0) - lo, 1e-12)
+    q = np.clip(((points - lo) / span * 1023.0).astype(np.uint64), 0, 1023)
+    # spread 10 bits so two zeros follow each one
+    q = (q | (q << np.uint64(16))) & np.uint64(0x030000FF)
+    q = (q | (q << np.uint64(8))) & np.uint64(0x0300F00F)
+    q = (q | (q << np.uint64(4))) & np.uint64(0x030C30C3)
+    q = (q | (q << np.uint64(2))) & np.uint64(0x09249249)
+    return (q[:, 0] << np.uint64(2)) | (q[:, 1] << np.uint64(1)) | q[:, 2]
+
+def _slabs(lo, hi, origin, inv):
+    """(t enter, t exit) of a ray against boxes; inv is 1/direction."""
+    t1 = (lo - origin) * inv; t2 = (hi - origin) * inv
+    return np.minimum(t1, t2).max(axis=1), np.maximum(t1, t2).min(axis=1)
+
+def ray_shapes(kinds, poses, half, origin, direction):
+    """Distance along the ray to each shape's surface (inf where missed or behind the origin)."""
+    R = poses[:, :3, :3]
+    o = np.einsum('nji,nj->ni', R, origin - poses[:, :3, 3])     # ray in each shape's frame
+    d = np.einsum('nji,j->ni', R, direction)
+    t = np.full(len(kinds), np.inf)
+    box = kinds == BOX
+    if box.any():
+        dd = np.where(np.abs(d[box]) < 1e-12, 1e-12, d[box])
+        enter, leave = _slabs(-half[box], half[box], o[box], 1.0 / dd)
+        t[box] = np.where((leave >= enter) & (enter >= 0), enter, np.inf)
+    sph = kinds == SPHERE
+    if sph.any():
+        b = np.einsum('ij,ij->i', o[sph], d[sph]); c = np.einsum('ij,ij->i', o[sph], o[sph]) - half[sph, 0] ** 2
+        disc = b * b - c
+        enter = -b - np.sqrt(np.maximum(disc, 0.0))
+        t[sph] = np.where((disc >= 0) & (enter >= 0), enter, np.inf)
+    cyl = kinds == CYLINDER
+    if cyl.any():
+        oc, dc, r, h = o[cyl], d[cyl], half[cyl, 0], half[cyl, 2]
+        # side wall: x^2 + y^2 = r^2 with |z| <= h
+        a = dc[:, 0] ** 2 + dc[:, 1] ** 2; b = oc[:, 0] * dc[:, 0] + oc[:, 1] * dc[:, 1]
+        c = oc[:, 0] ** 2 + oc[:, 1] ** 2 - r * r
+        disc = b * b - a * c
+        with np.errstate(divide='ignore', invalid='ignore'):
+            side = (-b - np.sqrt(np.maximum(disc, 0.0))) / a
+        side_ok = (a > 1e-12) & (disc >= 0) & (side >= 0) & (np.abs(oc[:, 2] + side * dc[:, 2]) <= h)
+        best = np.where(side_ok, side, np.inf)
+        # end caps: z = +-h with x^2 + y^2 <= r^2
+        for sign in (-1.0, 1.0):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cap = (sign * h - oc[:, 2]) / dc[:, 2]
+            p = oc[:, :2] + cap[:, None] * dc[:, :2]
+            cap_ok = (np.abs(dc[:, 2]) > 1e-12) & (cap >= 0) & ((p ** 2).sum(axis=1) <= r * r)
+            best = np.minimum(best, np.where(cap_ok, cap, np.inf))
+        t[cyl] = best
+    return t
+
+
+class LinkPicker:
+    """Ray picking over the visual geometry of a model's links, posed by a KinematicTree.
+
+    Link additions and removals rebuild the shape list; editing one link refits just its
+    leaf and the boxes above it; joint motion (the tree's version changes) recomputes the
+    boxes in the existing leaf order, all lazily on the next pick.
+    """
+    def __init__(self, model, tree, mesh_cache=None):
+        self.model = model
+        self.tree = tree
+        self.mesh_cache = mesh_cache or default_cache
+        self.names = []
+        self._shapes_stale = True
+        self._version = None        # tree.version the boxes were built for
+        self._changed = set()       # links edited since, refit on the next pick
+        model.subscribe(self._on_model_event)
+
+    def _on_model_event(self, event, kind, name):
+        if kind == 'link' and event == 'changed' and not self._shapes_stale and name in self._index:
+            self._changed.add(name)
+        elif kind == 'link' or kind is None:
+            self._shapes_stale = True
+
+    def mesh_loaded(self, filename):
+        """A mesh file finished loading: links drawn with it get their real boxes on the next pick."""
+        if any(l.mesh == filename for l in self.model.links.values()): self._shapes_stale = True
+
+    def _link_shape(self, link):
+        shape = shape_of(link.geom_type, link.size, link.mesh, self.mesh_cache)
+        return shape if shape is not None else (BOX, np.zeros(3), np.zeros(3))
+
+    def _load_shapes(self):
+        links = list(self.model.links.values())
+        self.names = [l.name for l in links]
+        self._index = {n: i for i, n in enumerate(self.names)}
+        shapes = [self._link_shape(l) for l in links]
+        self.kinds = np.array([s[0] for s in shapes], dtype=np.int64)
+        self.half = np.array([s[1] for s in shapes], dtype=float).reshape(-1, 3)
+        self.offset = np.array([s[2] for s in shapes], dtype=float).reshape(-1, 3)
+        self.rpy = np.array([l.rpy for l in links], dtype=float).reshape(-1, 3)
+        self.origin = np.array([l.origin for l in links], dtype=float).reshape(-1, 3)
+        self._shapes_stale = False; self._changed = set(); self._version = None
+
+    def _poses(self, rows=None):
+        rows = np.arange(len(self.names)) if rows is None else rows
+        local = transforms(self.origin[rows], self.rpy[rows])
+        local[:, :3, 3] += np.einsum('nij,nj->ni', local[:, :3, :3], self.offset[rows])
+        return self.tree.world_poses([self.names[i] for i in rows]) @ local
+
+    def _build(self, resort=True):
+        """Fill the leaf boxes (Morton-sorting them first when resort) and reduce them into levels, root first."""
+        self.poses = self._poses()
+        lo, hi = world_aabbs(self.kinds, self.poses, self.half)
+        n = len(lo)
+        if resort:
+            self.order = np.argsort(morton_codes((lo + hi) / 2), kind='stable')
+            self.slot = np.empty(n, np.int64); self.slot[self.order] = np.arange(n)
+        depth = max(1, int(np.ceil(np.log(n) / np.log(FANOUT) - 1e-9)))
+        size = FANOUT ** depth
+        leaf_lo = np.full((size, 3), np.inf); leaf_hi = np.full((size, 3), -np.inf)
+        leaf_lo[:n] = lo[self.order]; leaf_hi[:n] = hi[self.order]
+        self.levels = [(leaf_lo, leaf_hi)]
+        while len(self.levels[0][0]) > 1:
+            lo, hi = self.levels[0]
+            self.levels.insert(0, (lo.reshape(-1, FANOUT, 3).min(axis=1), hi.reshape(-1, FANOUT, 3).max(axis=1)))
+        # nodes at or past these indices cover only padding
+        self.used = [-(-n // FANOUT ** (len(self.levels) - 1 - i)) for i in range(len(self.levels))]
+
+    def _refit(self, names):
+        rows = np.array([self._index[n] for n in names], dtype=np.int64)
+        shapes = [self._link_shape(self.model.links[n]) for n in names]
+        self.kinds[rows] = [s[0] for s in shapes]; self.half[rows] = [s[1] for s in shapes]
+        self.offset[rows] = [s[2] for s in shapes]
+        links = [self.model.links[n] for n in names]
+        self.rpy[rows] = [l.rpy for l in links]; self.origin[rows] = [l.origin for l in links]
+        self.poses[rows] = self._poses(rows)
+        lo, hi = world_aabbs(self.kinds[rows], self.poses[rows], self.half[rows])
+        nodes = self.slot[rows]
+        leaf_lo, leaf_hi = self.levels[-1]
+        leaf_lo[nodes] = lo; leaf_hi[nodes] = hi
+        for level in range(len(self.levels) - 2, -1, -1):
+            nodes = np.unique(nodes // FANOUT)
+            child_lo, child_hi = self.levels[level + 1]; node_lo, node_hi = self.levels[level]
+            kids = nodes[:, None] * FANOUT + np.arange(FANOUT)
+            node_lo[nodes] = child_lo[kids].min(axis=1); node_hi[nodes] = child_hi[kids].max(axis=1)
+
+    def update(self):
+        if self._shapes_stale: self._load_shapes()
+        if not self.names: return
+        self.tree.update()
+        if self._version != self.tree.version:
+            # joint motion keeps the leaf order (boxes stay tight enough); a fresh shape list re-sorts
+            self._build(resort=self._version is None); self._version = self.tree.version; self._changed = set()
+        elif self._changed:
+            self._refit(sorted(n for n in self._changed if n in self._index)); self._changed = set()
+
+    def pick(self, origin, direction):
+        """(link name, distance) of the first link surface along a ray, or None."""
+        self.update()
+        if not self.names: return None
+        origin = np.asarray(origin, float); direction = np.asarray(direction, float)
+        inv = 1.0 / np.where(np.abs(direction) < 1e-12, 1e-12, direction)
+        nodes = np.zeros(1, np.int64)
+        for level, (lo, hi) in enumerate(self.levels):
+            enter, leave = _slabs(lo[nodes], hi[nodes], origin, inv)
+            nodes = nodes[leave >= np.maximum(enter, 0.0)]
+            if level + 1 < len(self.levels):
+                nodes = (nodes[:, None] * FANOUT + np.arange(FANOUT)).ravel()
+                nodes = nodes[nodes < self.used[level + 1]]
+            if not len(nodes): return None
+        rows = self.order[nodes]
+        t = ray_shapes(self.kinds[rows], self.poses[rows], self.half[rows], origin, direction)
+        best = int(np.argmin(t))
+        if not np.isfinite(t[best]): return None
+        return self.names[rows[best]], float(t[best])
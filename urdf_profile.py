@@ -0,0 +1,141 @@
+"""Built-in profiling of the builder's hot paths: per-call timings, counts and allocations.
+
+Functions decorated with @profiled(name) record every call while profiling is on: call
+count, total and worst wall time, and the net change in allocated memory blocks
+(sys.getallocatedblocks; with PYTHONTRACEMALLOC set, also bytes from tracemalloc). The
+calls are also kept as Chrome trace events, which dump_trace() writes as JSON for
+chrome://tracing or https://ui.perfetto.dev.
+
+Profiling is off unless the URDF_PROFILE environment variable is set (1, or the path to
+write the trace to at exit) or the entry point gets --profile[=trace.json]. While it is
+off, a decorated function costs one extra call and a flag test.
+
+    URDF_PROFILE=trace.json python urdf_builder_gui.py
+    python urdf_builder_gui.py --profile batch robots/
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+
+MAX_EVENTS = 200000     # trace events kept; the oldest are dropped first
+
+
+class Profiler:
+    def __init__(self):
+        self.active = False
+        self.trace_path = None
+        self.stats = {}     # name -> [calls, total s, max s, net blocks, net bytes or None]
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.counters = {}  # name -> last value recorded with count()
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._exit_hook = False
+
+    def enable(self, trace_path=None):
+        """Start recording; with trace_path, the trace and a summary are written at exit."""
+        self.active = True
+        if trace_path: self.trace_path = trace_path
+        if not self._exit_hook:
+            atexit.register(self._at_exit); self._exit_hook = True
+
+    def disable(self):
+        self.active = False
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}; self.events.clear(); self.counters = {}
+
+    def record(self, name, start, seconds, blocks, nbytes=None, args=None):
+        with self._lock:
+            s = self.stats.get(name)
+            if s is None: s = self.stats[name] = [0, 0.0, 0.0, 0, None]
+            s[0] += 1; s[1] += seconds; s[2] = max(s[2], seconds); s[3] += blocks
+            if nbytes is not None: s[4] = (s[4] or 0) + nbytes
+            event = {'name': name, 'ph': 'X', 'ts': (start - self._t0) * 1e6, 'dur': seconds * 1e6,
+                     'pid': os.getpid(), 'tid': threading.get_ident(), 'args': {'blocks': blocks}}
+            if nbytes is not None: event['args']['bytes'] = nbytes
+            if args: event['args'].update(args)
+            self.events.append(event)
+
+    def count(self, name, **values):
+        """Record counter values (drawn as a graph in the trace viewer), e.g. count('frame', draw_calls=12)."""
+        if not self.active: return
+        with self._lock:
+            self.counters[name] = values
+            self.events.append({'name': name, 'ph': 'C', 'ts': (time.perf_counter() - self._t0) * 1e6,
+                                'pid': os.getpid(), 'tid': threading.get_ident(), 'args': dict(values)})
+
+    def summary(self):
+        """[(name, calls, total s, mean s, max s, net blocks, net bytes or None)], slowest total first."""
+        with self._lock:
+            rows = [(n, c, t, t / c, m, b, nb) for n, (c, t, m, b, nb) in self.stats.items()]
+        return sorted(rows, key=lambda r: -r[2])
+
+    def summary_lines(self):
+        lines = [f"{'function':<40} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'blocks':>9} {'bytes':>12}"]
+        for name, calls, total, mean, worst, blocks, nbytes in self.summary():
+            lines.append(f"{name:<40} {calls:>7} {total * 1e3:>10.1f} {mean * 1e3:>9.2f} {worst * 1e3:>9.2f} "
+                         f"{blocks:>+9} {'' if nbytes is None else format(nbytes, '+'):>12}")
+        return lines
+
+    def trace(self):
+        with self._lock:
+            events = list(self.events)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump_trace(self, path):
+        """Write the recorded calls as Chrome trace JSON; returns the number of events written."""
+        data = self.trace()
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return len(data['traceEvents'])
+
+    def _at_exit(self):
+        if not self.stats: return
+        sys.stderr.write("\n".join(self.summary_lines()) + "\n")
+        if self.trace_path:
+            try:
+                n = self.dump_trace(self.trace_path)
+                sys.stderr.write(f"profile: {n} trace events written to {self.trace_path}\n")
+            except OSError as e:
+                sys.stderr.write(f"profile: cannot write {self.trace_path}: {e}\n")
+
+
+profiler = Profiler()
+
+
+def profiled(name):
+    """Decorator: time every call of the function under name while the profiler is active."""
+    def wrap(fn):
+        @wraps(fn)
+        def call(*args, **kwargs):
+            if not profiler.active: return fn(*args, **kwargs)
+            tracing = tracemalloc.is_tracing()
+            t0 = time.perf_counter()
+            mem0 = tracemalloc.get_traced_memory()[0] if tracing else None
+            blocks0 = sys.getallocatedblocks()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                # read in reverse so the profiler's own objects fall outside the deltas (but blocks0 itself)
+                blocks = sys.getallocatedblocks() - blocks0 - 1
+                nbytes = tracemalloc.get_traced_memory()[0] - mem0 if tracing else None
+                profiler.record(name, t0, time.perf_counter() - t0, blocks, nbytes)
+        return call
+    return wrap
+
+def enable_from_env(value=None):
+    """Turn profiling on from URDF_PROFILE (or value): '', '0' and 'off' leave it off, '1' records
+    without writing a trace, anything else is the trace path written at exit."""
+    value = os.environ.get('URDF_PROFILE', '') if value is None else value
+    if value.strip().lower() in ('', '0', 'off', 'false', 'no'): return False
+    profiler.enable(None if value.strip().lower() in ('1', 'on', 'true', 'yes') else value)
+    return True
+
+enable_from_env()
@@ -0,0 +1,319 @@
+"""Binary project files (.urdfp): the model as columnar NumPy arrays plus a string table.
+
+    magic 'URDFPRJ\\0' | u32 version | u32 header size | JSON header | sections...
+
+The JSON header lists every section as [dtype, shape, offset]; sections are 64-byte
+aligned so map_project() can hand out np.frombuffer views straight into an mmap of the
+file. Names, geometry and joint types live in a NUL-separated UTF-8 string table and the
+columns hold indexes into it. Inertia text the float columns cannot hold exactly
+(non-numeric values, "1.50") is kept verbatim in the header's 'inertia_text'
+{row: {key: text}} table. ProjectStore saves incrementally: when only existing
+elements were edited it rewrites just their rows in place.
+"""
+import gc
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from urdf_columnar import (HAS_COLLISION_SIZE, HAS_COM, HAS_COM_RPY, HAS_INERTIA, INCLUDE_COLLISION, MANUAL_INERTIA,
+                           _tuples, decode_inertia, encode_inertia, link_flags)
+from urdf_model import Joint, Link, URDFModel
+
+MAGIC = b'URDFPRJ\0'
+VERSION = 3             # 2: link_mesh / link_collision_mesh columns, 3: link_com_rpy
+READABLE_VERSIONS = (1, 2, 3)
+ALIGN = 64
+NO_STRING = 0xFFFFFFFF
+
+LINK_COLUMNS = (
+    ('link_name', '<u4', ()), ('link_geom', '<u4', ()), ('link_size', '<f8', (3,)),
+    ('link_mass', '<f8', ()), ('link_origin', '<f8', (3,)), ('link_rpy', '<f8', (3,)),
+    ('link_inertia', '<f8', (6,)), ('link_com', '<f8', (3,)),
+    ('link_collision_geom', '<u4', ()), ('link_collision_size', '<f8', (3,)), ('link_flags', 'u1', ()),
+    ('link_mesh', '<u4', ()), ('link_collision_mesh', '<u4', ()), ('link_com_rpy', '<f8', (3,)),
+)
+JOINT_COLUMNS = (
+    ('joint_name', '<u4', ()), ('joint_type', '<u4', ()), ('joint_parent', '<u4', ()), ('joint_child', '<u4', ()),
+    ('joint_origin', '<f8', (3,)), ('joint_rpy', '<f8', (3,)), ('joint_axis', '<f8', (3,)),
+    ('joint_limit', '<f8', (2,)), ('joint_effort', '<f8', ()), ('joint_velocity', '<f8', ()),
+)
+
+
+class ProjectFormatError(ValueError):
+    pass
+
+
+def _float(v):
+    try: return float(v)
+    except (TypeError, ValueError): return float('nan')
+
+def _triple(v):
+    return tuple(v) if v is not None else (float('nan'),) * 3
+
+# ----------------------- Encoding -----------------------
+def _link_rows(links, sid, texts):
+    """Column lists for links; sid(str) -> string index. Inertia dicts the columns cannot
+    hold are added to texts as {position in links: dict}."""
+    cols = {name: [] for name, _, _ in LINK_COLUMNS}
+    for i, l in enumerate(links):
+        inertia, ok = encode_inertia(l.inertia)
+        if not ok: texts[i] = dict(l.inertia)
+        cols['link_name'].append(sid(l.name)); cols['link_geom'].append(sid(l.geom_type))
+        cols['link_size'].append(tuple(l.size)); cols['link_mass'].append(_float(l.mass))
+        cols['link_origin'].append(tuple(l.origin)); cols['link_rpy'].append(tuple(l.rpy))
+        cols['link_inertia'].append(tuple(inertia))
+        cols['link_com'].append(_triple(l.com))
+        cols['link_collision_geom'].append(sid(l.collision_geom) if l.collision_geom is not None else NO_STRING)
+        cols['link_collision_size'].append(_triple(l.collision_size))
+        cols['link_flags'].append(link_flags(l))
+        cols['link_mesh'].append(sid(l.mesh) if l.mesh is not None else NO_STRING)
+        cols['link_collision_mesh'].append(sid(l.collision_mesh) if l.collision_mesh is not None else NO_STRING)
+        cols['link_com_rpy'].append(_triple(l.com_rpy))
+    return cols
+
+def _joint_rows(joints, sid):
+    cols = {name: [] for name, _, _ in JOINT_COLUMNS}
+    for j in joints:
+        cols['joint_name'].append(sid(j.name)); cols['joint_type'].append(sid(j.jtype))
+        cols['joint_parent'].append(sid(j.parent or "")); cols['joint_child'].append(sid(j.child or ""))
+        cols['joint_origin'].append(tuple(j.origin_xyz)); cols['joint_rpy'].append(tuple(j.origin_rpy))
+        cols['joint_axis'].append(tuple(j.axis))
+        cols['joint_limit'].append(tuple(j.limit) if j.limit else (float('nan'),) * 2)
+        cols['joint_effort'].append(_float(j.effort)); cols['joint_velocity'].append(_float(j.velocity))
+    return cols
+
+def _arrays(cols, spec):
+    return {name: np.array(cols[name], dtype=dtype).reshape((-1,) + shape) for name, dtype, shape in spec}
+
+def encode_model(model):
+    """-> (strings {str: index}, {section name: ndarray}, inertia texts {link row: dict}) for a whole model."""
+    strings = {}; texts = {}
+    sid = lambda s: strings.setdefault(s, len(strings))
+    sections = _arrays(_link_rows(model.links.values(), sid, texts), LINK_COLUMNS)
+    sections.update(_arrays(_joint_rows(model.joints.values(), sid), JOINT_COLUMNS))
+    sections['strings'] = np.frombuffer('\0'.join(strings).encode('utf-8'), dtype='u1')
+    return strings, sections, texts
+
+def _layout(sections, counts, texts=None):
+    """-> (header bytes, {name: offset}) with every section aligned to ALIGN."""
+    def build(offsets):
+        meta = {'links': counts[0], 'joints': counts[1], 'robot': URDFModel.ROBOT_NAME,
+                'sections': {n: [a.dtype.str, list(a.shape), offsets.get(n, 0)] for n, a in sections.items()}}
+        if texts: meta['inertia_text'] = {str(r): t for r, t in sorted(texts.items())}
+        body = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+        return MAGIC + struct.pack('<II', VERSION, len(body)) + body
+    # the header size depends on the offsets' digits: repeat until the layout is stable
+    offsets = {}; header = build(offsets)
+    while True:
+        pos = -(-len(header) // ALIGN) * ALIGN
+        new = {}
+        for n, a in sections.items():
+            new[n] = pos; pos += -(-a.nbytes // ALIGN) * ALIGN
+        if new == offsets: return header, offsets
+        offsets = new; header = build(offsets)
+
+def write_project(path, sections, counts, texts=None):
+    """Write sections (and the inertia texts of encode_model) to path atomically (temp file + rename)."""
+    header, offsets = _layout(sections, counts, texts)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        for n, a in sections.items():
+            f.seek(offsets[n]); f.write(np.ascontiguousarray(a).tobytes())
+        f.truncate(max([offsets[n] + a.nbytes for n, a in sections.items()] + [len(header)]))
+    os.replace(tmp, path)
+    return offsets
+
+def save_project(model, path):
+    strings, sections, texts = encode_model(model)
+    write_project(path, sections, (len(model.links), len(model.joints)), texts)
+
+
+# ----------------------- Decoding -----------------------
+class ProjectData:
+    """A mapped project file: zero-copy column views (self.sections) and the string table.
+
+    The views point into the mmap; call close() (or use it as a context manager) once
+    done with them.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None
+        mm = self._mmap
+        if mm is None or mm[:len(MAGIC)] != MAGIC:
+            self.close(); raise ProjectFormatError(f"{path}: not a URDF project file")
+        version, size = struct.unpack_from('<II', mm, len(MAGIC))
+        if version not in READABLE_VERSIONS:
+            self.close(); raise ProjectFormatError(f"{path}: unsupported project version {version}")
+        self.version = version
+        start = len(MAGIC) + 8
+        self.meta = json.loads(bytes(mm[start:start + size]))
+        self.sections = {}
+        for name, (dtype, shape, offset) in self.meta['sections'].items():
+            count = int(np.prod(shape)) if shape else 1
+            if offset + count * np.dtype(dtype).itemsize > len(mm):
+                self.close(); raise ProjectFormatError(f"{path}: section {name} is truncated")
+            self.sections[name] = np.frombuffer(mm, dtype=dtype, count=count, offset=offset).reshape(shape)
+        blob = self.sections['strings']
+        self.strings = blob.tobytes().decode('utf-8').split('\0') if len(blob) else [""]
+        self.inertia_text = {int(r): t for r, t in self.meta.get('inertia_text', {}).items()}
+
+    def close(self):
+        self.sections = {}
+        if self._mmap is not None:
+            try: self._mmap.close()
+            except BufferError: pass    # a caller still holds a view; the map goes with it
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def links(self):
+        s = self.sections; S = self.strings
+        names = [S[i] for i in s['link_name'].tolist()]
+        geoms = [S[i] for i in s['link_geom'].tolist()]
+        opt = lambda col: [S[i] if i != NO_STRING else None for i in s[col].tolist()] if col in s else [None] * len(names)
+        cgeoms = opt('link_collision_geom'); meshes = opt('link_mesh'); cmeshes = opt('link_collision_mesh')
+        texts = self.inertia_text
+        inertias = _tuples(s['link_inertia']); coms = _tuples(s['link_com']); csizes = _tuples(s['link_collision_size'])
+        com_rpys = _tuples(s['link_com_rpy']) if 'link_com_rpy' in s else None
+        out = []
+        for name, geom, size, mass, origin, rpy, cgeom, flags, i in zip(
+                names, geoms, _tuples(s['link_size']), s['link_mass'].tolist(), _tuples(s['link_origin']),
+                _tuples(s['link_rpy']), cgeoms, s['link_flags'].tolist(), range(len(names))):
+            inertia = com = csize = com_rpy = None
+            if flags & (HAS_INERTIA | HAS_COM | HAS_COLLISION_SIZE | HAS_COM_RPY):
+                if flags & HAS_INERTIA: inertia = dict(texts[i]) if i in texts else decode_inertia(inertias[i])
+                if flags & HAS_COM: com = coms[i]
+                if flags & HAS_COLLISION_SIZE: csize = csizes[i]
+                if flags & HAS_COM_RPY: com_rpy = com_rpys[i]
+            out.append(Link(name, geom, size, mass, inertia, bool(flags & MANUAL_INERTIA), origin, rpy,
+                            bool(flags & INCLUDE_COLLISION), cgeom, csize, com, meshes[i], cmeshes[i], com_rpy))
+        return out
+
+    def joints(self):
+        s = self.sections; S = self.strings
+        limits = [l if l[0] == l[0] else None for l in _tuples(s['joint_limit'])]
+        return [Joint(S[name], S[jtype], S[parent], S[child], xyz, rpy, axis, limit, effort, velocity)
+                for name, jtype, parent, child, xyz, rpy, axis, limit, effort, velocity in zip(
+                    s['joint_name'].tolist(), s['joint_type'].tolist(), s['joint_parent'].tolist(), s['joint_child'].tolist(),
+                    _tuples(s['joint_origin']), _tuples(s['joint_rpy']), _tuples(s['joint_axis']), limits,
+                    s['joint_effort'].tolist(), s['joint_velocity'].tolist())]
+
+def _build_model(data):
+    # ~10 container objects per element: the cyclic GC would otherwise rescan them many times over
+    enabled = gc.isenabled(); gc.disable()
+    try:
+        model = URDFModel()
+        model.links = {l.name: l for l in data.links()}
+        model.joints = {j.name: j for j in data.joints()}
+    finally:
+        if enabled: gc.enable()
+    return model
+
+def map_project(path):
+    """Open a project file for reading -> ProjectData; raises ProjectFormatError."""
+    return ProjectData(path)
+
+def load_project(path, model=None):
+    """Load a project file into model (a new URDFModel by default) with one 'reset' event."""
+    with map_project(path) as data:
+        parsed = _build_model(data)
+    if model is None: return parsed
+    model.replace_with(parsed)
+    return model
+
+
+# ----------------------- Incremental saving -----------------------
+class ProjectStore:
+    """Loads and saves one model as a project file, rewriting only edited rows when it can.
+
+    Edit notifications mark elements dirty. save() to the same, externally untouched file
+    after edits that kept the element set (and introduced no new strings) overwrites just
+    the dirty rows of each column in place; anything else rewrites the whole file.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.path = None
+        self._rows = None       # {'link'|'joint': {name: row}} as in the file at self.path
+        self._strings = None    # {str: index} of that file's string table
+        self._offsets = None
+        self._texts = None      # link rows of that file with inertia text in the header
+        self._stamp = None      # (size, mtime_ns) right after our last write/read
+        self._dirty = set()
+        self._structural = True
+        self._loading = False
+        model.subscribe(self._on_model_event)
+
+    def _on_model_event(self, event, kind, name):
+        if self._loading: return
+        if event == 'changed' and kind is not None: self._dirty.add((kind, name))
+        else: self._structural = True
+
+    def _remember(self, path, strings, offsets, texts):
+        self.path = path; self._strings = strings; self._offsets = offsets; self._texts = set(texts)
+        self._rows = {'link': {n: i for i, n in enumerate(self.model.links)},
+                      'joint': {n: i for i, n in enumerate(self.model.joints)}}
+        st = os.stat(path); self._stamp = (st.st_size, st.st_mtime_ns)
+        self._dirty.clear(); self._structural = False
+
+    def load(self, path):
+        with map_project(path) as data:
+            parsed = _build_model(data)
+            strings = {s: i for i, s in enumerate(data.strings)}
+            offsets = {n: v[2] for n, v in data.meta['sections'].items()}
+            texts = data.inertia_text
+            old_format = data.version != VERSION
+        self._loading = True
+        try: self.model.replace_with(parsed)
+        finally: self._loading = False
+        self._remember(path, strings, offsets, texts)
+        self._structural = old_format      # an older file has columns missing: the next save rewrites it
+
+    def save(self, path=None):
+        """Save to path (default: the current file); returns the number of rows rewritten in place, or None for a full write."""
+        path = path or self.path
+        if path is None: raise ValueError("no project path")
+        if path == self.path and not self._structural:
+            patched = self._patch()
+            if patched is not None:
+                st = os.stat(path); self._stamp = (st.st_size, st.st_mtime_ns); self._dirty.clear()
+                return patched
+        strings, sections, texts = encode_model(self.model)
+        offsets = write_project(path, sections, (len(self.model.links), len(self.model.joints)), texts)
+        self._remember(path, strings, offsets, texts)
+        return None
+
+    def _patch(self):
+        try: st = os.stat(self.path)
+        except OSError: return None
+        if (st.st_size, st.st_mtime_ns) != self._stamp: return None
+        links = [self.model.links[n] for k, n in self._dirty if k == 'link' and n in self.model.links]
+        joints = [self.model.joints[n] for k, n in self._dirty if k == 'joint' and n in self.model.joints]
+        strings = self._strings
+        def sid(s):
+            if s not in strings: raise KeyError(s)
+            return strings[s]
+        texts = {}
+        try:
+            cols = _arrays(_link_rows(links, sid, texts), LINK_COLUMNS)
+            cols.update(_arrays(_joint_rows(joints, sid), JOINT_COLUMNS))
+        except KeyError:
+            return None     # a new string: the table has to grow
+        if texts or any(self._rows['link'][l.name] in self._texts for l in links):
+            return None     # inertia text lives in the header, which is only written whole
+        with open(self.path, 'r+b') as f:
+            for elements, rows, spec in ((links, self._rows['link'], LINK_COLUMNS), (joints, self._rows['joint'], JOINT_COLUMNS)):
+                idx = [rows[e.name] for e in elements]
+                for name, _, _ in spec:
+                    a = cols[name]; size = a.itemsize * int(np.prod(a.shape[1:]))
+                    for i, row in enumerate(idx):
+                        f.seek(self._offsets[name] + row * size); f.write(a[i].tobytes())
+        return len(links) + len(joints)
@@ -0,0 +1,246 @@
+"""Headless PNG previews: render URDFs from N turntable angles without opening a window.
+
+    python urdf_builder_gui.py render robots/ --out previews/ --views 8 --size 256 --jobs 8
+
+Images are drawn by the viewer's own SceneRenderer (urdf_viewer.OffscreenRenderer) into a
+framebuffer object. The GL context comes from EGL (Mesa's surfaceless platform needs neither
+a GPU nor a display and falls back to llvmpipe software GL), OSMesa, or a Qt offscreen
+surface. PyOpenGL picks its platform when it is first imported, so use_backend() has to run
+before anything imports OpenGL; run_render() does that before starting its workers, and each
+worker process keeps one context for all the models it renders.
+"""
+import argparse
+import ctypes.util
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+from urdf_batch import find_urdfs
+from urdf_model import URDFModel, URDFParseError
+
+BACKENDS = ('auto', 'egl', 'osmesa', 'qt')
+
+
+class RenderError(RuntimeError):
+    pass
+
+
+# ----------------------- GL contexts -----------------------
+def use_backend(backend='auto'):
+    """Resolve 'auto' and point PyOpenGL at the backend; returns the backend used."""
+    if backend == 'auto':
+        backend = os.environ.get('PYOPENGL_PLATFORM') if os.environ.get('PYOPENGL_PLATFORM') in ('egl', 'osmesa') else None
+        backend = backend or ('egl' if ctypes.util.find_library('EGL') else
+                              'osmesa' if ctypes.util.find_library('OSMesa') else 'qt')
+    if backend not in BACKENDS:
+        raise RenderError(f"unknown render backend '{backend}'")
+    if 'OpenGL' in sys.modules and backend != 'qt' and os.environ.get('PYOPENGL_PLATFORM') != backend:
+        raise RenderError(f"OpenGL was imported before selecting the '{backend}' backend")
+    if backend in ('egl', 'osmesa'):
+        os.environ['PYOPENGL_PLATFORM'] = backend
+    if backend == 'egl':
+        os.environ.setdefault('EGL_PLATFORM', 'surfaceless')    # Mesa: no X/Wayland display needed
+    return backend
+
+
+class _EGLContext:
+    def __init__(self):
+        from OpenGL import EGL
+        self.egl = EGL
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not self.display or not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RenderError("no EGL display")
+        attrs = (EGL.EGLint * 13)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                                  EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+                                  EGL.EGL_DEPTH_SIZE, 24, EGL.EGL_NONE)
+        config = EGL.EGLConfig(); count = EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, attrs, ctypes.pointer(config), 1, ctypes.pointer(count)) or not count.value:
+            raise RenderError("no EGL config for desktop OpenGL")
+        # drawing goes to a framebuffer object, the surface only has to exist
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not self.context or not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RenderError("could not make an EGL OpenGL context current")
+
+    def release(self):
+        EGL = self.egl
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context); EGL.eglDestroySurface(self.display, self.surface)
+        EGL.eglTerminate(self.display)
+
+
+class _OSMesaContext:
+    def __init__(self):
+        from OpenGL import GL, arrays, osmesa
+        self.osmesa = osmesa
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        self.buffer = arrays.GLubyteArray.zeros((1, 1, 4))
+        if not self.context or not osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL.GL_UNSIGNED_BYTE, 1, 1):
+            raise RenderError("could not create an OSMesa context")
+
+    def release(self):
+        self.osmesa.OSMesaDestroyContext(self.context)
+
+
+class _QtContext:
+    def __init__(self):
+        from PyQt5.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext, QSurfaceFormat
+        self.app = QGuiApplication.instance() or QGuiApplication([sys.argv[0]])
+        fmt = QSurfaceFormat()
+        fmt.setDepthBufferSize(24); fmt.setVersion(3, 3); fmt.setProfile(QSurfaceFormat.CompatibilityProfile)
+        self.context = QOpenGLContext(); self.context.setFormat(fmt)
+        if not self.context.create():
+            raise RenderError(f"Qt platform '{self.app.platformName()}' cannot create an OpenGL context")
+        self.surface = QOffscreenSurface(); self.surface.setFormat(self.context.format()); self.surface.create()
+        if not self.context.makeCurrent(self.surface):
+            raise RenderError("could not make the Qt offscreen context current")
+
+    def release(self):
+        self.context.doneCurrent(); self.surface.destroy()
+
+
+def create_context(backend='auto'):
+    """Create and make current an offscreen GL context; keep the result alive while rendering."""
+    backend = use_backend(backend)
+    return {'egl': _EGLContext, 'osmesa': _OSMesaContext, 'qt': _QtContext}[backend]()
+
+
+# ----------------------- Rendering -----------------------
+def turntable(views, elevation=-30.0, start=30.0):
+    """(rot_x, rot_y) camera angles evenly spaced around the vertical axis."""
+    return [(elevation, start + 360.0 * k / views) for k in range(views)]
+
+
+def write_png(path, rgb):
+    """Write a (height, width, 3) uint8 array as an 8-bit RGB PNG."""
+    h, w = rgb.shape[:2]
+    rows = b''.join(b'\x00' + rgb[y].tobytes() for y in range(h))     # filter type 0 per row
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0))
+                + chunk(b'IDAT', zlib.compress(rows, 6)) + chunk(b'IEND', b''))
+
+
+def render_model(model, views, size=(256, 256), render_mode='auto', mesh_cache=None):
+    """Images of model from each (rot_x, rot_y) in views; needs a current context (create_context)."""
+    from urdf_viewer import OffscreenRenderer
+    renderer = OffscreenRenderer(model, render_mode, mesh_cache)
+    try:
+        return renderer.render_views(views, *size)
+    finally:
+        renderer.release_gl()
+
+
+_context = None     # one per worker process, made on its first model
+
+def render_file(task):
+    """Worker: (path, relative path, output dir, views, size, backend, render mode) -> result dict."""
+    global _context
+    path, rel, out_dir, views, size, backend, render_mode = task
+    t0 = time.perf_counter()
+    result = {'path': rel, 'ok': False}
+    model = URDFModel()
+    try:
+        model.load_from_file(path)
+        if _context is None: _context = create_context(backend)
+        from urdf_mesh import MeshCache
+        # relative mesh names resolve next to the URDF; a cache per model keeps them apart
+        images = render_model(model, views, size, render_mode, MeshCache(search_paths=[os.path.dirname(os.path.abspath(path))]))
+    except URDFParseError as e:
+        result.update(error=str(e), line=e.line, column=e.column)
+    except (OSError, RuntimeError) as e:     # RenderError, incomplete framebuffer
+        result.update(error=str(e))
+    else:
+        stem = os.path.join(out_dir, os.path.splitext(rel)[0])
+        os.makedirs(os.path.dirname(stem) or '.', exist_ok=True)
+        result['images'] = []
+        for k, img in enumerate(images):
+            dest = f"{stem}.png" if len(images) == 1 else f"{stem}_{k:02d}.png"
+            write_png(dest, img); result['images'].append(dest)
+        result['links'] = len(model.links)
+        result['ok'] = True
+    result['seconds'] = round(time.perf_counter() - t0, 6)
+    return result
+
+
+def run_render(root, out_dir, views=8, size=(256, 256), elevation=-30.0, jobs=None, backend='auto',
+               render_mode='auto', recursive=True, exts=('.urdf',)):
+    backend = use_backend(backend)
+    angles = turntable(views, elevation)
+    tasks = [(path, rel, out_dir, angles, size, backend, render_mode) for path, rel in find_urdfs(root, recursive, exts)]
+    t0 = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        results = [render_file(t) for t in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        # the initializer repeats use_backend for start methods that don't inherit os.environ changes
+        with ProcessPoolExecutor(max_workers=jobs, initializer=use_backend, initargs=(backend,)) as pool:
+            results = list(pool.map(render_file, tasks, chunksize=max(1, len(tasks) // (jobs * 8))))
+    failed = [r for r in results if not r['ok']]
+    return {
+        'root': root,
+        'files': len(results),
+        'ok': len(results) - len(failed),
+        'failed': len(failed),
+        'images': sum(len(r.get('images', ())) for r in results),
+        'backend': backend,
+        'jobs': jobs,
+        'seconds': round(time.perf_counter() - t0, 3),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='urdf_builder_gui.py render',
+                                 description="Render PNG previews of URDF files without a window.")
+    ap.add_argument('path', help="directory of URDF files (or a single file)")
+    ap.add_argument('--out', '-o', required=True, help="output directory, mirroring the input tree")
+    ap.add_argument('--views', '-n', type=int, default=8, help="turntable angles per model (default: 8)")
+    ap.add_argument('--size', default='256', help="image size, N or WxH (default: 256)")
+    ap.add_argument('--elevation', type=float, default=-30.0, help="camera tilt in degrees (default: -30)")
+    ap.add_argument('--jobs', '-j', type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument('--backend', choices=BACKENDS, default='auto',
+                    help="GL context: egl (headless, software GL without a GPU), osmesa, qt (default: auto)")
+    ap.add_argument('--render-mode', choices=('auto', 'instanced', 'fixed'), default='auto')
+    ap.add_argument('--summary', default=None, help="also write the JSON summary here ('-' for stdout)")
+    ap.add_argument('--no-recursive', action='store_true', help="only look at the top-level directory")
+    ap.add_argument('--ext', action='append', help="file extension to pick up, repeatable (default: .urdf)")
+    args = ap.parse_args(argv)
+    if not os.path.exists(args.path):
+        ap.error(f"{args.path} does not exist")
+    try:
+        w, _, h = args.size.lower().partition('x')
+        size = (int(w), int(h or w))
+    except ValueError:
+        ap.error(f"bad --size '{args.size}'")
+    if args.views < 1 or min(size) < 1:
+        ap.error("--views and --size must be positive")
+
+    try:
+        summary = run_render(args.path, args.out, args.views, size, args.elevation, args.jobs, args.backend,
+                             args.render_mode, recursive=not args.no_recursive, exts=args.ext or ('.urdf',))
+    except RenderError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.summary:
+        text = json.dumps(summary, indent=2)
+        if args.summary == '-': print(text)
+        else:
+            with open(args.summary, 'w') as f:
+                f.write(text + "\n")
+    for r in summary['results']:
+        if not r['ok']: print(f"{r['path']}: {r['error']}", file=sys.stderr)
+    print(f"{summary['files']} files, {summary['images']} images, {summary['failed']} failed "
+          f"in {summary['seconds']}s ({summary['backend']}, {summary['jobs']} jobs) -> {args.out}", file=sys.stderr)
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Parametric link/joint templates, expanded xacro-style into a URDFModel.
+
+A Template is a fragment of URDF (<link> and <joint> elements) whose attribute values and
+text may contain ${expression}s over named parameters and the instance index i. An
+Expansion stamps a template out count times and applies the result to a model as plain
+add/remove edits, so one History.command() records it as a single undo step and the GUI
+refreshes once for the lot.
+
+Each instance remembers which parameters its expressions actually read and their values;
+applying again after a parameter change re-renders only the instances that read it, and
+only elements whose signature changed are written back to the model.
+
+    leg = Template('''
+      <link name="seg_${i}"><visual><geometry><box size="${w} ${w} ${length}"/></geometry></visual></link>
+      <joint name="j_${i}" type="revolute">
+        <parent link="${base if i == 0 else 'seg_%d' % (i - 1)}"/><child link="seg_${i}"/>
+        <origin xyz="0 0 ${0.05 if i == 0 else length}"/><axis xyz="0 1 0"/>
+        <limit lower="-0.5" upper="0.5" effort="10" velocity="1"/>
+      </joint>''')
+    snake = Expansion(leg, count=40, params={'base': 'base_link', 'w': 0.04, 'length': 0.1})
+    with history.command("Expand snake"): snake.apply(model)
+"""
+import ast
+import math
+import re
+import sys
+from xml.etree import ElementTree as ET
+
+from urdf_model import URDFParseError, joint_from_element, joint_signature, link_from_element, link_signature
+
+_EXPR = re.compile(r'\$\{(.*?)\}', re.S)
+
+# callables and constants usable inside ${...}
+FUNCTIONS = {name: getattr(math, name) for name in
+             ('sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'atan2', 'sqrt', 'radians', 'degrees', 'floor', 'ceil', 'hypot')}
+FUNCTIONS.update(pi=math.pi, abs=abs, min=min, max=max, round=round, int=int, float=float, str=str)
+
+_ALLOWED = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call, ast.Name,
+            ast.Load, ast.operator, ast.unaryop, ast.boolop, ast.cmpop)
+_ALLOWED += (ast.Constant,) if sys.version_info >= (3, 8) else (ast.Num, ast.Str)
+MISSING = object()
+
+
+class TemplateError(ValueError):
+    """A template that does not compile, or an expansion that cannot be applied."""
+
+
+def compile_expression(text):
+    """Compile one ${...} body; only arithmetic, comparisons, if/else and FUNCTIONS calls are allowed."""
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+    except SyntaxError as e:
+        raise TemplateError(f"${{{text}}}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED):
+            raise TemplateError(f"${{{text}}}: {type(node).__name__} is not allowed")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+            raise TemplateError(f"${{{text}}}: only {', '.join(sorted(k for k, v in FUNCTIONS.items() if callable(v)))} can be called")
+        if isinstance(node, ast.Name) and node.id.startswith('__'):
+            raise TemplateError(f"${{{text}}}: '{node.id}' is not allowed")
+    return compile(tree, '<template>', 'eval')
+
+def format_value(value):
+    if isinstance(value, bool): return str(value).lower()
+    if isinstance(value, float): return '%.12g' % value
+    return str(value)
+
+def parse_params(text):
+    """'length=0.1, base=base_link' -> {'length': 0.1, 'base': 'base_link'}.
+
+    Values are evaluated as constant expressions (0.1, pi/4, 3); anything else is kept as
+    a string. Raises TemplateError for entries without a name.
+    """
+    params = {}
+    for item in filter(None, (p.strip() for p in re.split(r'[,\n;]', text))):
+        name, sep, value = item.partition('=')
+        name = name.strip(); value = value.strip()
+        if not sep or not name.isidentifier():
+            raise TemplateError(f"parameter '{item}' is not name=value")
+        try:
+            params[name] = eval(compile_expression(value), {'__builtins__': {}}, dict(FUNCTIONS))
+        except Exception:
+            params[name] = value
+    return params
+
+
+class _Reads(dict):
+    """Evaluation namespace that records every parameter an expression looks up (MISSING if absent)."""
+    def __init__(self, env, reads):
+        super().__init__()
+        self.env = env; self.reads = reads
+
+    def __getitem__(self, name):
+        value = self.env.get(name, MISSING)
+        self.reads[name] = value
+        if value is MISSING: raise KeyError(name)
+        return value
+
+
+class Template:
+    """URDF text with ${expression} placeholders, split and compiled once."""
+    def __init__(self, body):
+        self.body = body
+        self.parts = []     # literal text and compiled expressions, alternating
+        pos = 0
+        for m in _EXPR.finditer(body):
+            self.parts.append(body[pos:m.start()])
+            self.parts.append((m.group(1), compile_expression(m.group(1))))
+            pos = m.end()
+        self.parts.append(body[pos:])
+
+    def render(self, env, reads=None):
+        """Template text with every expression evaluated in env; looked-up names go into reads."""
+        reads = {} if reads is None else reads
+        scope = _Reads(env, reads)
+        out = []
+        for part in self.parts:
+            if isinstance(part, str): out.append(part); continue
+            try:
+                out.append(format_value(eval(part[1], {'__builtins__': {}, **FUNCTIONS}, scope)))
+            except NameError as e:
+                raise TemplateError(f"${{{part[0]}}}: {e}") from None
+            except Exception as e:
+                raise TemplateError(f"${{{part[0]}}}: {type(e).__name__}: {e}") from None
+        return "".join(out)
+
+    def instance(self, env, reads=None):
+        """Render and parse one instance -> (links, joints)."""
+        text = self.render(env, reads)
+        try:
+            root = ET.fromstring("<robot>" + text + "</robot>")
+        except ET.ParseError as e:
+            line, column = e.position
+            raise URDFParseError(f"template instance: {str(e).split(':')[0]}: line {line}", line, column) from None
+        for el in root:
+            if el.tag not in ('link', 'joint'):
+                raise TemplateError(f"<{el.tag}> is not allowed in a template, only <link> and <joint>")
+        return [link_from_element(el) for el in root if el.tag == 'link'], \
+               [joint_from_element(el) for el in root if el.tag == 'joint']
+
+
+class Expansion:
+    """count instances of a Template with shared params and per-instance overrides {i: {name: value}}.
+
+    apply() writes the instances into a model and remembers every element name it has
+    written; later calls update them in place, expanding again only the instances whose
+    inputs changed and removing those elements no instance produces any more. Names are
+    remembered across calls so that an undone apply() can be re-applied.
+    """
+    def __init__(self, template, count=1, params=None, overrides=None):
+        self.template = template
+        self.count = count
+        self.params = dict(params or {})
+        self.overrides = {int(i): dict(p) for i, p in (overrides or {}).items()}
+        self.owned = {'link': set(), 'joint': set()}    # element names apply() has written
+        self._cache = {}        # instance index -> (reads, links, joints)
+        self.expanded = 0       # instances rendered by the last apply()
+
+    def set_template(self, template):
+        if template.body != self.template.body: self._cache = {}
+        self.template = template
+
+    def environment(self, i):
+        env = dict(self.params); env.update(self.overrides.get(i, ()))
+        env['i'] = i; env['count'] = self.count
+        return env
+
+    def _instance(self, i):
+        env = self.environment(i)
+        hit = self._cache.get(i)
+        if hit is not None and all(env.get(k, MISSING) == v for k, v in hit[0].items()):
+            return hit[1], hit[2]
+        reads = {}
+        links, joints = self.template.instance(env, reads)
+        self._cache[i] = (reads, links, joints); self.expanded += 1
+        return links, joints
+
+    def elements(self):
+        """(links, joints) of every instance; raises TemplateError when two instances share a name."""
+        self.expanded = 0
+        for i in [i for i in self._cache if i >= self.count]: del self._cache[i]
+        links = {}; joints = {}
+        for i in range(self.count):
+            ls, js = self._instance(i)
+            for kind, items, found in (('link', ls, links), ('joint', js, joints)):
+                for el in items:
+                    if el.name in found:
+                        raise TemplateError(f"instance {i} repeats {kind} '{el.name}'; use ${{i}} in the name")
+                    found[el.name] = el
+        return links, joints
+
+    def apply(self, model):
+        """Bring model in line with the expansion; returns (elements written, elements removed).
+
+        Nothing is edited when expansion fails, or when an element it would write already
+        exists in the model without having come from this expansion.
+        """
+        links, joints = self.elements()
+        for kind, items, current in (('link', links, model.links), ('joint', joints, model.joints)):
+            taken = [n for n in items if n in current and n not in self.owned[kind]]
+            if taken: raise TemplateError(f"{kind} '{taken[0]}' already exists in the model")
+        removed = 0
+        for name in sorted(self.owned['joint'] - set(joints)):
+            if name in model.joints: model.remove_joint(name); removed += 1
+        for name in sorted(self.owned['link'] - set(links)):
+            if name in model.links: model.remove_link(name, cascade=False); removed += 1
+        written = 0
+        for l in links.values():
+            cur = model.links.get(l.name)
+            if cur is None or link_signature(cur) != link_signature(l): model.add_link(l); written += 1
+        for j in joints.values():
+            cur = model.joints.get(j.name)
+            if cur is None or joint_signature(cur) != joint_signature(j): model.add_joint(j); written += 1
+        self.owned['link'].update(links); self.owned['joint'].update(joints)
+        return written, removed
@@ -0,0 +1,199 @@
+from collections import namedtuple
+
+# ----------------------- Diagnostics -----------------------
+class Diagnostic(namedtuple('Diagnostic', 'severity kind name message')):
+    """One problem: severity 'error'|'warning', kind 'link'|'joint'|'model', element name."""
+    __slots__ = ()
+
+    def __str__(self):
+        where = f"{self.kind} '{self.name}'" if self.name is not None else self.kind
+        return f"{self.severity}: {where}: {self.message}"
+
+JOINT_TYPES = ('revolute', 'continuous', 'prismatic', 'fixed', 'floating', 'planar')
+LIMITED_TYPES = ('revolute', 'prismatic')
+
+
+def _num(v):
+    try: return float(v)
+    except (TypeError, ValueError): return None
+
+def _positive(values):
+    try: return all(float(v) > 0 for v in values)
+    except (TypeError, ValueError): return False
+
+
+def link_diagnostics(link):
+    """Checks that only depend on the link itself."""
+    out = []
+    def err(msg): out.append(Diagnostic('error', 'link', link.name, msg))
+    if not link.name:
+        err("empty name")
+    if not _positive((link.mass,)):
+        err(f"non-positive mass {link.mass}")
+    if link.manual_inertia and link.inertia:
+        vals = {k: _num(link.inertia.get(k, 0.0)) for k in ('ixx','ixy','ixz','iyy','iyz','izz')}
+        bad = [k for k, v in vals.items() if v is None]
+        if bad:
+            err(f"non-numeric inertia {', '.join(bad)}")
+        else:
+            a, b, c = vals['ixx'], vals['ixy'], vals['ixz']
+            d, e, f = vals['iyy'], vals['iyz'], vals['izz']
+            # Sylvester's criterion on [[a b c] [b d e] [c e f]]
+            det = a*(d*f - e*e) - b*(b*f - e*c) + c*(b*e - d*c)
+            if not (a > 0 and a*d - b*b > 0 and det > 0):
+                err("inertia tensor is not positive definite")
+    for label, geom, size, mesh in (('visual', link.geom_type, link.size, link.mesh),
+                                    ('collision', link.collision_geom, link.collision_size, link.collision_mesh)):
+        if geom is None or size is None: continue
+        if geom == 'mesh':
+            if not mesh: err(f"{label} mesh without a filename")
+            try: flat = any(float(v) == 0 for v in size)
+            except (TypeError, ValueError): flat = True
+            if flat: err(f"zero {label} mesh scale {tuple(size)}")
+            continue
+        used = size if geom == 'box' else (size[0], size[2]) if geom == 'cylinder' else size[:1]
+        if not _positive(used):
+            err(f"non-positive {label} {geom} size {tuple(size)}")
+    return out
+
+
+def joint_diagnostics(joint):
+    """Checks that only depend on the joint itself (not on which links exist)."""
+    out = []
+    def err(msg): out.append(Diagnostic('error', 'joint', joint.name, msg))
+    def warn(msg): out.append(Diagnostic('warning', 'joint', joint.name, msg))
+    if not joint.name:
+        err("empty name")
+    if joint.jtype not in JOINT_TYPES:
+        err(f"unknown joint type '{joint.jtype}'")
+    if not joint.parent: err("no parent link")
+    if not joint.child: err("no child link")
+    if joint.parent and joint.parent == joint.child:
+        err(f"parent and child are the same link '{joint.parent}'")
+    if joint.jtype not in ('fixed', 'floating'):
+        try: x, y, z = map(float, joint.axis); zero = x*x + y*y + z*z == 0.0
+        except (TypeError, ValueError): zero = True
+        if zero: err("zero-length axis")
+    if joint.limit:
+        lo, hi = _num(joint.limit[0]), _num(joint.limit[1])
+        if lo is not None and hi is not None and lo > hi:
+            err(f"lower limit {lo} > upper limit {hi}")
+    elif joint.jtype in LIMITED_TYPES:
+        warn(f"{joint.jtype} joint without limits")
+    for label, v in (('effort', joint.effort), ('velocity', joint.velocity)):
+        f = _num(v)
+        if f is None or f < 0:
+            warn(f"invalid {label} {v}")
+    return out
+
+
+def graph_diagnostics(links, joints, duplicates=()):
+    """Kinematic-graph checks in one linear pass over parent/child indexes built once."""
+    out = []
+    parents = {}    # child link -> [joint names]
+    children = {}   # parent link -> [child links]
+    for jn, j in joints.items():
+        p, c = j.parent, j.child
+        if p in links and c in links:
+            if p == c: continue
+            if c in parents: parents[c].append(jn)
+            else: parents[c] = [jn]
+            if p in children: children[p].append(c)
+            else: children[p] = [c]
+            continue
+        for role, ln in (('parent', p), ('child', c)):
+            if ln and ln not in links:
+                out.append(Diagnostic('error', 'joint', jn, f"{role} link '{ln}' does not exist"))
+    for child, jns in parents.items():
+        if len(jns) > 1:
+            out.append(Diagnostic('error', 'link', child, f"has {len(jns)} parent joints: {', '.join(jns)}"))
+    for kind, name in duplicates:
+        out.append(Diagnostic('error', kind, name, "duplicate name; only the last definition was kept"))
+    if not links:
+        return out
+
+    # Kahn's algorithm: whatever never reaches in-degree 0 sits on (or below) a cycle
+    indeg = {n: len(parents.get(n, ())) for n in links}
+    roots = [n for n, d in indeg.items() if d == 0]
+    queue = list(roots); seen = 0
+    while queue:
+        n = queue.pop(); seen += 1
+        for c in children.get(n, ()):
+            indeg[c] -= 1
+            if indeg[c] == 0: queue.append(c)
+    if seen < len(links):
+        stuck = {n for n, d in indeg.items() if d > 0}
+        # report each cycle once by walking parent pointers inside the stuck set
+        done = set()
+        for start in stuck:
+            if start in done: continue
+            path = []; pos = {}; n = start
+            while n in stuck and n not in done and n not in pos:
+                pos[n] = len(path); path.append(n)
+                n = joints[parents[n][0]].parent
+            if n in pos:
+                cycle = path[pos[n]:]
+                out.append(Diagnostic('error', 'model', None, "kinematic cycle: " + " <- ".join(cycle + [cycle[0]])))
+            done.update(path)
+
+    if not roots:
+        out.append(Diagnostic('error', 'model', None, "no root link (every link has a parent)"))
+    elif len(roots) > 1:
+        shown = ', '.join(roots[:10]) + (' ...' if len(roots) > 10 else '')
+        out.append(Diagnostic('error', 'model', None, f"{len(roots)} root links (expected 1): {shown}"))
+        for n in roots:
+            if n not in children:
+                out.append(Diagnostic('warning', 'link', n, "not attached to any joint"))
+    return out
+
+
+def validate_model(model):
+    """Full validation of a model in a single linear-time pass."""
+    out = []
+    for link in model.links.values(): out += link_diagnostics(link)
+    for joint in model.joints.values(): out += joint_diagnostics(joint)
+    out += graph_diagnostics(model.links, model.joints, getattr(model, 'duplicates', ()))
+    return out
+
+
+# ----------------------- Incremental validator -----------------------
+class ModelValidator:
+    """Live diagnostics for an edited model.
+
+    Per-element results are cached and recomputed only for elements reported changed by
+    the model's edit notifications; the graph pass reruns only after structural edits
+    (links added/removed, joints added/removed/re-parented), never for numeric tweaks.
+    """
+    def __init__(self, model):
+        self.model = model
+        self._local = {}        # ('link'|'joint', name) -> [Diagnostic]
+        self._edges = {}        # joint name -> (parent, child) seen by the last graph pass
+        self._graph = None
+        model.subscribe(self._on_model_event)
+
+    def _on_model_event(self, event, kind, name):
+        if event == 'reset' or kind is None:
+            self._local.clear(); self._graph = None; return
+        self._local.pop((kind, name), None)
+        if kind == 'link' and event == 'changed':
+            return
+        if kind == 'joint' and event == 'changed':
+            j = self.model.joints.get(name)
+            if j is not None and self._edges.get(name) == (j.parent, j.child):
+                return
+        self._graph = None
+
+    def diagnostics(self):
+        out = []
+        for kind, items, check in (('link', self.model.links, link_diagnostics),
+                                   ('joint', self.model.joints, joint_diagnostics)):
+            for name, el in items.items():
+                key = (kind, name)
+                diags = self._local.get(key)
+                if diags is None:
+                    diags = self._local[key] = check(el)
+                out += diags
+        if self._graph is None:
+            self._graph = graph_diagnostics(self.model.links, self.model.joints, getattr(self.model, 'duplicates', ()))
+            self._edges = {jn: (j.parent, j.child) for jn, j in self.model.joints.items()}
+        return out + self._graph
@@ -0,0 +1,971 @@
+import ctypes
+import sys
+import time
+from math import pi
+
+import numpy as np
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QSurfaceFormat
+from PyQt5.QtWidgets import QLabel, QOpenGLWidget
+
+# OpenGL
+from OpenGL.GL import *
+from OpenGL.GLU import *
+
+from urdf_kinematics import KinematicTree, axis_angle_matrices
+from urdf_mesh import default_cache
+from urdf_picking import LinkPicker, ray_through
+from urdf_profile import profiled, profiler
+
+# ----------------------- Geometry cache -----------------------
+VISUAL_COLOR = (0.35, 0.65, 0.9)
+COLLISION_COLOR = (1.0, 0.3, 0.3, 0.28)
+HIGHLIGHT_COLOR = (1.0, 0.55, 0.0, 0.6)
+
+def _quads_to_tris(grid):
+    """(rows, cols, k) vertex grid -> (N, k) triangle list covering every cell."""
+    a = grid[:-1, :-1]; b = grid[:-1, 1:]; c = grid[1:, 1:]; d = grid[1:, :-1]
+    return np.stack([a, b, c, a, c, d], axis=2).reshape(-1, grid.shape[-1])
+
+def box_mesh(sx, sy, sz):
+    # (normal, u axis, v axis) per face; corners at +-0.5 then scaled to size
+    faces = [((0,0,1),(1,0,0),(0,1,0)), ((0,0,-1),(0,1,0),(1,0,0)),
+             ((-1,0,0),(0,0,1),(0,1,0)), ((1,0,0),(0,1,0),(0,0,1)),
+             ((0,1,0),(0,0,1),(1,0,0)), ((0,-1,0),(1,0,0),(0,0,1))]
+    out = []
+    for n, u, v in faces:
+        n = np.array(n, float); u = np.array(u, float); v = np.array(v, float)
+        corners = [0.5*n - 0.5*u - 0.5*v, 0.5*n + 0.5*u - 0.5*v, 0.5*n + 0.5*u + 0.5*v, 0.5*n - 0.5*u + 0.5*v]
+        for i in (0, 1, 2, 0, 2, 3):
+            out.append(np.concatenate([corners[i] * (sx, sy, sz), n]))
+    return np.array(out, dtype=np.float32)
+
+def cylinder_mesh(radius, length, slices, caps=True):
+    # centred on the origin along z, like the old translated gluCylinder
+    a = np.linspace(0.0, 2*pi, slices + 1)
+    c = np.cos(a); s = np.sin(a)
+    z = np.array([-length/2.0, length/2.0])
+    grid = np.zeros((2, slices + 1, 6))
+    grid[..., 0] = radius * c; grid[..., 1] = radius * s; grid[..., 2] = z[:, None]
+    grid[..., 3] = c; grid[..., 4] = s
+    parts = [_quads_to_tris(grid)]
+    if caps:
+        for zc, nz in ((z[0], -1.0), (z[1], 1.0)):
+            rim = np.zeros((slices + 1, 6))
+            rim[:, 0] = radius * c; rim[:, 1] = radius * s; rim[:, 2] = zc; rim[:, 5] = nz
+            centre = np.array([0.0, 0.0, zc, 0.0, 0.0, nz])
+            fan = np.empty((slices, 3, 6))
+            fan[:, 0] = centre; fan[:, 1] = rim[:-1]; fan[:, 2] = rim[1:]
+            parts.append(fan.reshape(-1, 6))
+    return np.concatenate(parts).astype(np.float32)
+
+def sphere_mesh(radius, slices, stacks):
+    theta = np.linspace(0.0, pi, stacks + 1)[:, None]
+    phi = np.linspace(0.0, 2*pi, slices + 1)[None, :]
+    n = np.stack(np.broadcast_arrays(np.sin(theta)*np.cos(phi), np.sin(theta)*np.sin(phi), np.cos(theta)), axis=-1)
+    grid = np.concatenate([n * radius, n], axis=-1)
+    return _quads_to_tris(grid).astype(np.float32)
+
+# ----------------------- Level of detail -----------------------
+# tessellation per level, coarse to fine; DEFAULT_LOD is what every link used to get
+CYLINDER_SLICES = {'visual': (8, 16, 32, 64), 'collision': (6, 12, 24, 48)}
+SPHERE_SLICES = ((8, 6), (12, 10), (20, 20), (40, 32))
+LOD_LEVELS = 4
+DEFAULT_LOD = 2
+# projected radius in pixels at which a link moves up to the next level
+LOD_PIXELS = (6.0, 24.0, 96.0)
+FOV_Y = 45.0
+
+def lod_levels(geom):
+    """Number of tessellation levels a geometry type has (boxes and mesh files have one)."""
+    return LOD_LEVELS if geom in ('cylinder', 'sphere') else 1
+
+def geometry_mesh(key, level=DEFAULT_LOD):
+    """Tessellate a cache key (role, geom_type, size) into interleaved position/normal triangles."""
+    role, geom, (sx, sy, sz) = key
+    if geom == 'box':
+        return box_mesh(sx, sy, sz)
+    if geom == 'cylinder':
+        # visual cylinders get end caps; collision overlay is the open tube
+        return cylinder_mesh(sx, sz, CYLINDER_SLICES[role][level], caps=role == 'visual')
+    if geom == 'sphere':
+        return sphere_mesh(sx, *SPHERE_SLICES[level])
+    return np.zeros((0, 6), dtype=np.float32)
+
+def bounding_radius(geom, size, mesh_radius=0.0):
+    """Radius of a sphere around the shape's origin that contains it.
+
+    For meshes size is the scale and mesh_radius the largest vertex distance of the file.
+    """
+    sx, sy, sz = (abs(float(v)) for v in size)
+    if geom == 'box': return 0.5 * (sx*sx + sy*sy + sz*sz) ** 0.5
+    if geom == 'cylinder': return (sx*sx + 0.25*sz*sz) ** 0.5
+    if geom == 'sphere': return sx
+    if geom == 'mesh': return mesh_radius * max(sx, sy, sz)
+    return 0.0
+
+def frustum_planes(modelview, projection):
+    """Six (a, b, c, d) planes, normals inward, of the view frustum in world space.
+
+    Both matrices are as glGetFloatv returns them (column-major).
+    """
+    clip = np.asarray(projection, float).reshape(4, 4).T @ np.asarray(modelview, float).reshape(4, 4).T
+    planes = np.array([clip[3] + clip[0], clip[3] - clip[0], clip[3] + clip[1],
+                       clip[3] - clip[1], clip[3] + clip[2], clip[3] - clip[2]])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+def cull_and_lod(centers, radii, modelview, projection, viewport_height, fov_y=FOV_Y):
+    """(visible bool (N,), level int (N,)) for world bounding spheres under a camera.
+
+    A sphere is culled when it lies entirely outside one frustum plane; the level comes
+    from its projected radius in pixels (LOD_PIXELS).
+    """
+    centers = np.asarray(centers, float).reshape(-1, 3); radii = np.asarray(radii, float).reshape(-1)
+    if not len(centers): return np.zeros(0, bool), np.zeros(0, np.int64)
+    planes = frustum_planes(modelview, projection)
+    dist = centers @ planes[:, :3].T + planes[:, 3]
+    visible = (dist >= -radii[:, None]).all(axis=1)
+    mv = np.asarray(modelview, float).reshape(4, 4).T
+    depth = np.maximum(-(centers @ mv[2, :3] + mv[2, 3]), 1e-6)
+    focal = 0.5 * viewport_height / np.tan(np.radians(fov_y) / 2.0)
+    pixels = radii * focal / depth
+    return visible, np.searchsorted(np.asarray(LOD_PIXELS), pixels, side='right')
+
+def unit_scale(geom, size):
+    """Scale that maps the unit mesh of a geometry type onto a link of the given size."""
+    sx, sy, sz = size
+    if geom in ('box', 'mesh'): return (sx, sy, sz)
+    if geom == 'cylinder': return (sx, sx, sz)
+    return (sx, sx, sx)
+
+class GLMesh:
+    """Vertex data uploaded once; drawn from a VBO, or from a display list when VBOs are unavailable."""
+    def __init__(self, data, mode=GL_TRIANGLES, attrib='normal', use_vbo=True):
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        self.count = len(data); self.mode = mode; self.attrib = attrib
+        self.vbo = None; self.list_id = None
+        if use_vbo:
+            self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        else:
+            self.list_id = glGenLists(1)
+            glNewList(self.list_id, GL_COMPILE)
+            self._emit(np.ascontiguousarray(data[:, :3]), np.ascontiguousarray(data[:, 3:]), 0)
+            glEndList()
+
+    def update(self, data):
+        """Replace vertex data in place when the vertex count is unchanged (VBO path)."""
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        if self.vbo is not None and len(data) == self.count:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            return
+        use_vbo = self.vbo is not None
+        self.release()
+        self.__init__(data, self.mode, self.attrib, use_vbo)
+
+    def _emit(self, pos, extra, stride):
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, stride, pos)
+        if self.attrib == 'normal':
+            glEnableClientState(GL_NORMAL_ARRAY); glNormalPointer(GL_FLOAT, stride, extra)
+        else:
+            glEnableClientState(GL_COLOR_ARRAY); glColorPointer(3, GL_FLOAT, stride, extra)
+        glDrawArrays(self.mode, 0, self.count)
+        glDisableClientState(GL_NORMAL_ARRAY if self.attrib == 'normal' else GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def draw(self):
+        if self.list_id is not None:
+            glCallList(self.list_id); return
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        self._emit(ctypes.c_void_p(0), ctypes.c_void_p(12), 24)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vbo is not None: glDeleteBuffers(1, [self.vbo])
+        if self.list_id is not None: glDeleteLists(self.list_id, 1)
+        self.vbo = None; self.list_id = None
+
+def mesh_key(filename):
+    # one GPU buffer per mesh file, whatever role or scale the links use it with
+    return ('mesh', filename)
+
+class GeometryCache:
+    """GPU meshes keyed on (role, geom_type, size), shared by all links with identical geometry.
+
+    Only sync() tessellates: a mesh is built when a key first appears and released
+    once no link references it, so camera moves never touch vertex data. Mesh files are
+    keyed on the file alone (see mesh_key) and scaled at draw time; one that is still
+    loading in the MeshCache is left out until it arrives. meshes holds the DEFAULT_LOD
+    tessellation; mesh() builds other levels the first time a link needs them.
+    """
+    def __init__(self, mesh_cache=None):
+        self.meshes = {}     # key -> GLMesh
+        self.lods = {}       # key -> {level: GLMesh} for levels other than DEFAULT_LOD
+        self.link_keys = {}  # link name -> (visual key, collision key or None)
+        self.mesh_cache = mesh_cache or default_cache
+        self.waiting = set()    # mesh files requested from the cache but not loaded yet
+        self.use_vbo = None
+
+    @staticmethod
+    def keys_for(link):
+        """((visual key, scale), (collision key, scale) or None); scale is None for primitives."""
+        def key(role, geom, size, mesh):
+            if geom == 'mesh': return mesh_key(mesh), tuple(size)
+            return (role, geom, tuple(size)), None
+        vkey = key('visual', link.geom_type, link.size, link.mesh)
+        ckey = None
+        if link.include_collision:
+            cgeom = link.collision_geom if link.collision_geom else link.geom_type
+            csize = link.collision_size if link.collision_size else link.size
+            cmesh = link.collision_mesh if link.collision_geom else link.mesh
+            ckey = key('collision', cgeom, csize, cmesh)
+        return vkey, ckey
+
+    def _data(self, key):
+        if key[0] != 'mesh': return geometry_mesh(key)
+        ready, data = self.mesh_cache.request(key[1])
+        if not ready: self.waiting.add(key[1])
+        return data if ready else None
+
+    def sync(self, links):
+        if self.use_vbo is None:
+            self.use_vbo = bool(glGenBuffers)
+        self.link_keys = {link.name: self.keys_for(link) for link in links}
+        self.waiting = set()
+        live = {k[0] for pair in self.link_keys.values() for k in pair if k is not None}
+        for k in [k for k in self.meshes if k not in live]:
+            self.meshes.pop(k).release()
+            for mesh in self.lods.pop(k, {}).values(): mesh.release()
+        for k in live:
+            if k not in self.meshes:
+                data = self._data(k)
+                if data is not None: self.meshes[k] = GLMesh(data, use_vbo=self.use_vbo)
+
+    def mesh(self, key, level=DEFAULT_LOD):
+        """GLMesh of key at a tessellation level, or None while its mesh file is loading."""
+        if level == DEFAULT_LOD or key not in self.meshes or lod_levels(key[1]) == 1:
+            return self.meshes.get(key)
+        levels = self.lods.setdefault(key, {})
+        if level not in levels: levels[level] = GLMesh(geometry_mesh(key, level), use_vbo=self.use_vbo)
+        return levels[level]
+
+    def release(self):
+        for mesh in self.meshes.values(): mesh.release()
+        for levels in self.lods.values():
+            for mesh in levels.values(): mesh.release()
+        self.meshes.clear(); self.lods.clear(); self.link_keys.clear()
+
+class InstancedRenderer:
+    """Modern-GL path: links grouped by (role, geom_type) share one unit mesh and are drawn
+    with one glDrawArraysInstanced per group and level from a per-instance transform buffer.
+
+    Each group keeps a unit mesh per tessellation level (see geometry_mesh); cull()
+    re-uploads just the visible instances, sorted by level.
+    """
+    VERTEX_SHADER = """
+        #version 330
+        layout(location = 0) in vec3 a_position;
+        layout(location = 1) in vec3 a_normal;
+        layout(location = 2) in mat4 a_model;   // locations 2..5, one column each
+        uniform mat4 u_view;
+        uniform mat4 u_proj;
+        out vec3 v_normal;
+        out vec3 v_eye;
+        void main() {
+            mat4 mv = u_view * a_model;
+            vec4 eye = mv * vec4(a_position, 1.0);
+            v_eye = eye.xyz;
+            v_normal = transpose(inverse(mat3(mv))) * a_normal;
+            gl_Position = u_proj * eye;
+        }
+    """
+    FRAGMENT_SHADER = """
+        #version 330
+        in vec3 v_normal;
+        in vec3 v_eye;
+        uniform vec4 u_color;
+        uniform bool u_lighting;
+        uniform vec3 u_light_pos;
+        out vec4 frag_color;
+        void main() {
+            if (!u_lighting) { frag_color = u_color; return; }
+            // same terms as the fixed pipeline: 0.2 global ambient + LIGHT0 diffuse
+            float diffuse = max(dot(normalize(v_normal), normalize(u_light_pos - v_eye)), 0.0);
+            frag_color = vec4(u_color.rgb * (0.2 + diffuse), u_color.a);
+        }
+    """
+
+    def __init__(self, mesh_cache=None):
+        self.program = None
+        self.uniforms = {}
+        self.meshes = {}   # ((role, geom_type) or mesh_key(file), level) -> unit GLMesh
+        # (role, geom_type[, file]) -> (mesh key, VAO per level, instance vbo, link indices, unit scales,
+        #                               [(level, first instance, count)] drawn this frame)
+        self.groups = {}
+        self.poses = None
+        self.mesh_cache = mesh_cache or default_cache
+        self.waiting = set()
+
+    @staticmethod
+    def supported():
+        return all(bool(f) for f in (glCreateShader, glGenVertexArrays, glVertexAttribDivisor, glDrawArraysInstanced))
+
+    def initialize(self):
+        """Compile the shader program; raises if the context can't run it."""
+        from OpenGL.GL import shaders
+        if not self.supported():
+            raise RuntimeError("instanced rendering needs OpenGL 3.3")
+        self.program = shaders.compileProgram(
+            shaders.compileShader(self.VERTEX_SHADER, GL_VERTEX_SHADER),
+            shaders.compileShader(self.FRAGMENT_SHADER, GL_FRAGMENT_SHADER), validate=False)
+        for name in ('u_view', 'u_proj', 'u_color', 'u_lighting', 'u_light_pos'):
+            self.uniforms[name] = glGetUniformLocation(self.program, name)
+
+    @staticmethod
+    def _instances(poses, idx, scales):
+        mats = poses[idx].copy()
+        mats[:, :, :3] *= scales[:, None, :]
+        # column-major per instance, matching the mat4 attribute layout
+        return np.ascontiguousarray(np.transpose(mats, (0, 2, 1)), dtype=np.float32)
+
+    def sync(self, links, poses):
+        """Rebuild groups (one instance buffer each) for links; transforms go up in cull()."""
+        self._release_groups()
+        batches = {}   # group key -> ([link index], [scale])
+        for i, link in enumerate(links):
+            for role, key in zip(('visual', 'collision'), GeometryCache.keys_for(link)):
+                if key is None: continue
+                (kind, *rest), scale = key
+                if kind == 'mesh': gkey = (role, 'mesh', rest[0]); size = scale
+                else: gkey = (role, rest[0]); size = rest[1]
+                idx, scales = batches.setdefault(gkey, ([], []))
+                idx.append(i); scales.append(unit_scale(gkey[1], size))
+        live = set(); self.waiting = set()
+        for gkey, (idx, scales) in batches.items():
+            mkey = mesh_key(gkey[2]) if gkey[1] == 'mesh' else gkey
+            levels = lod_levels(gkey[1])
+            if (mkey, 0) not in self.meshes:
+                if gkey[1] == 'mesh':
+                    ready, data = self.mesh_cache.request(gkey[2])
+                    if not ready: self.waiting.add(gkey[2])
+                    if data is None: continue     # still loading, or unreadable
+                    self.meshes[(mkey, 0)] = GLMesh(data)
+                else:
+                    for level in range(levels):
+                        self.meshes[(mkey, level)] = GLMesh(geometry_mesh(gkey + ((1.0, 1.0, 1.0),), level))
+            live.add(mkey)
+            vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, 64 * len(idx), None, GL_DYNAMIC_DRAW)
+            vaos = []
+            for level in range(levels):
+                vao = glGenVertexArrays(1)
+                glBindVertexArray(vao)
+                glBindBuffer(GL_ARRAY_BUFFER, self.meshes[(mkey, level)].vbo)
+                glEnableVertexAttribArray(0); glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 24, ctypes.c_void_p(0))
+                glEnableVertexAttribArray(1); glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 24, ctypes.c_void_p(12))
+                for col in range(4):
+                    glEnableVertexAttribArray(2 + col); glVertexAttribDivisor(2 + col, 1)
+                vaos.append(vao)
+            glBindVertexArray(0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            self.groups[gkey] = (mkey, vaos, vbo, np.array(idx), np.array(scales, dtype=float), [])
+        for k in [k for k in self.meshes if k[0][0] == 'mesh' and k[0] not in live]:
+            self.meshes.pop(k).release()
+        self.poses = poses
+
+    def update_poses(self, poses):
+        """New link transforms; they are uploaded by the next cull()."""
+        self.poses = poses
+
+    def cull(self, visible=None, levels=None):
+        """Upload the transforms of visible links, grouped by level.
+
+        visible/levels are per-link arrays (see cull_and_lod); None draws everything at
+        DEFAULT_LOD. Only visible instances are uploaded, sorted so that each level is one
+        contiguous range of the group's buffer.
+        """
+        drawn = 0
+        for mkey, vaos, vbo, idx, scales, draws in self.groups.values():
+            sel = np.arange(len(idx)) if visible is None else np.flatnonzero(visible[idx])
+            if len(vaos) == 1: lv = np.zeros(len(sel), np.int64)
+            elif levels is None: lv = np.full(len(sel), DEFAULT_LOD)
+            else: lv = np.minimum(levels[idx[sel]], len(vaos) - 1)
+            order = np.argsort(lv, kind='stable'); sel = sel[order]; lv = lv[order]
+            counts = np.bincount(lv, minlength=len(vaos))
+            draws[:] = [(level, start, n) for level, (start, n) in
+                        enumerate(zip(np.concatenate([[0], np.cumsum(counts)[:-1]]).tolist(), counts.tolist())) if n]
+            if len(sel):
+                inst = self._instances(self.poses, idx[sel], scales[sel])
+                glBindBuffer(GL_ARRAY_BUFFER, vbo)
+                glBufferSubData(GL_ARRAY_BUFFER, 0, inst.nbytes, inst)
+            drawn += len(sel)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        return drawn
+
+    def draw(self, role, color, lighting, light_pos=(5.0, 5.0, 10.0)):
+        """Draw every group of one role using the current fixed-function camera matrices."""
+        groups = [g for gkey, g in self.groups.items() if gkey[0] == role and g[5]]
+        if not groups: return
+        glUseProgram(self.program)
+        glUniformMatrix4fv(self.uniforms['u_view'], 1, GL_FALSE, glGetFloatv(GL_MODELVIEW_MATRIX))
+        glUniformMatrix4fv(self.uniforms['u_proj'], 1, GL_FALSE, glGetFloatv(GL_PROJECTION_MATRIX))
+        glUniform4f(self.uniforms['u_color'], *(tuple(color) + (1.0,))[:4])
+        glUniform1i(self.uniforms['u_lighting'], 1 if lighting else 0)
+        glUniform3f(self.uniforms['u_light_pos'], *light_pos)
+        for mkey, vaos, vbo, _, _, draws in groups:
+            for level, start, count in draws:
+                glBindVertexArray(vaos[level])
+                # point the instance attributes at this level's range of the buffer
+                glBindBuffer(GL_ARRAY_BUFFER, vbo)
+                for col in range(4):
+                    glVertexAttribPointer(2 + col, 4, GL_FLOAT, GL_FALSE, 64, ctypes.c_void_p(64 * start + 16 * col))
+                glDrawArraysInstanced(GL_TRIANGLES, 0, self.meshes[(mkey, level)].count, count)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def frame_counts(self):
+        """(draw calls, vertices) that draw() issues for every role."""
+        calls = vertices = 0
+        for mkey, _, _, _, _, draws in self.groups.values():
+            for level, _, count in draws:
+                calls += 1; vertices += self.meshes[(mkey, level)].count * count
+        return calls, vertices
+
+    def _release_groups(self):
+        for _, vaos, vbo, *_ in self.groups.values():
+            glDeleteVertexArrays(len(vaos), vaos); glDeleteBuffers(1, [vbo])
+        self.groups.clear()
+
+    def release(self):
+        self._release_groups()
+        for mesh in self.meshes.values(): mesh.release()
+        self.meshes.clear()
+        if self.program is not None: glDeleteProgram(self.program)
+        self.program = None
+
+# ----------------------- Scene (camera + draw calls) -----------------------
+class SceneRenderer:
+    """Camera, cached geometry and the draw calls of the 3D preview, independent of any widget.
+
+    GLWidget mixes it in for the interactive view and OffscreenRenderer for headless
+    previews: with a GL context current, call setup_gl() once, set_projection() when the
+    viewport size changes and render_scene() per frame.
+    """
+    RENDER_MODES = ('auto', 'instanced', 'fixed')
+
+    def _init_scene(self, model, render_mode='auto', mesh_cache=None):
+        self.model = model
+        self.rot_x = -30.0
+        self.rot_y = 30.0
+        self.zoom = -6.0
+        self.pan_x = 0.0
+        self.pan_y = 0.0
+        self.target = (0.0, 0.0, 0.0)    # point the camera orbits around
+        self.render_mode = render_mode   # requested: auto | instanced | fixed
+        self.active_mode = None          # what render_scene actually uses, resolved with a current context
+        self.mode_error = None           # why an explicitly requested instanced mode fell back, or None
+        self.kinematics = KinematicTree(model)
+        self.mesh_cache = mesh_cache or default_cache
+        self.geometry = GeometryCache(self.mesh_cache)
+        self.instanced = InstancedRenderer(self.mesh_cache)
+        self._scene_dirty = True
+        self._poses_dirty = False
+        self._links = []
+        self._draw_items = []   # fixed path: (column-major pose, visual key, collision pose, collision key or None)
+        self._grid = None; self._frames = None
+        self._view_height = 1
+        self._view = (1, 1, 0.1, 100.0)     # width, height, near, far of the last set_projection
+        # view-frustum culling and level of detail from world bounding spheres
+        self.culling = True; self.lod = True
+        self._radii = np.zeros(0); self._centers = np.zeros((0, 3))
+        self._mesh_radius = {}      # mesh file -> largest vertex distance
+        self._cull_key = None       # camera/viewport the visible set was computed for
+        self._visible = None; self._levels = None
+        self.stats = {'links': 0, 'drawn': 0, 'culled': 0}
+        # links drawn marked on top of everything (colliding pairs), with their own small cache
+        self.highlighted = ()
+        self.highlight_geometry = GeometryCache(self.mesh_cache)
+        self.picker = LinkPicker(model, self.kinematics, self.mesh_cache)
+
+    def setup_gl(self):
+        glEnable(GL_DEPTH_TEST)
+        glEnable(GL_COLOR_MATERIAL)
+        glEnable(GL_LIGHTING)
+        glEnable(GL_LIGHT0)
+        glClearColor(0.95,0.95,0.95,1)
+        self.active_mode = None
+        self._scene_dirty = True
+
+    def set_projection(self, w, h, near=0.1, far=100.0):
+        glViewport(0,0,w,h)
+        glMatrixMode(GL_PROJECTION); glLoadIdentity()
+        gluPerspective(FOV_Y, w/h if h else 1.0, near, far)
+        glMatrixMode(GL_MODELVIEW)
+        self._view_height = h
+        self._view = (w, h, near, far)
+
+    def viewport_height(self):
+        """Viewport height in device pixels, for level-of-detail selection."""
+        return self._view_height
+
+    def view_matrices(self):
+        """(modelview, projection) of the current camera as row-major arrays, as render_scene sets them up."""
+        w, h, near, far = self._view
+        mv = np.identity(4)
+        mv[:3, 3] = (self.pan_x, self.pan_y, self.zoom)
+        rx, ry = axis_angle_matrices([(1.0, 0.0, 0.0), (0.0, 1.0, 0.0)], np.radians([self.rot_x, self.rot_y]))
+        mv[:3, :3] = rx @ ry
+        mv[:3, 3] -= mv[:3, :3] @ np.asarray(self.target, float)
+        f = 1.0 / np.tan(np.radians(FOV_Y) / 2)
+        proj = np.zeros((4, 4))
+        proj[0, 0] = f / (w / h if h else 1.0); proj[1, 1] = f
+        proj[2, 2] = (far + near) / (near - far); proj[2, 3] = 2 * far * near / (near - far); proj[3, 2] = -1.0
+        return mv, proj
+
+    def pick(self, x, y):
+        """Name of the link under window point (x, y) (y down, in set_projection units), or None."""
+        w, h = self._view[:2]
+        if not (w and h): return None
+        hit = self.picker.pick(*ray_through(x, y, w, h, *self.view_matrices()))
+        return hit[0] if hit else None
+
+    def set_render_mode(self, mode):
+        if mode not in self.RENDER_MODES: return
+        self.render_mode = mode
+        self.active_mode = None
+        self._scene_dirty = True
+
+    def set_highlight(self, names):
+        """Links to mark; returns whether that changed anything."""
+        names = tuple(sorted(set(names)))
+        if names == self.highlighted: return False
+        self.highlighted = names
+        return True
+
+    def _resolve_mode(self):
+        self.active_mode = 'fixed'; error = None
+        if self.render_mode != 'fixed':
+            try:
+                if self.instanced.program is None: self.instanced.initialize()
+                self.active_mode = 'instanced'
+            except Exception as e:
+                if self.render_mode == 'instanced':
+                    error = f"Instanced rendering unavailable, using fixed-function path: {e}"
+        if error != self.mode_error:
+            self.mode_error = error
+            self.mode_error_changed(error)
+
+    def mode_error_changed(self, error):
+        """Hook: the fallback reason changed (None once the requested mode works); headless use logs it."""
+        if error: sys.stderr.write(error + "\n")
+
+    def _sync_scene(self):
+        links = list(self.model.links.values())
+        use_vbo = bool(glGenBuffers)
+        if self._grid is None:
+            lines = []
+            for i in range(-6,7):
+                lines += [(i,-6,0), (i,6,0), (-6,i,0), (6,i,0)]
+            grid = np.hstack([np.array(lines, float), np.full((len(lines),3), 0.85)])
+            self._grid = GLMesh(grid, GL_LINES, 'color', use_vbo)
+        if self.active_mode == 'instanced':
+            self.geometry.release(); self._draw_items = []
+        else:
+            self.instanced.release()
+            self.geometry.sync(links)
+        self._links = links
+        self._radii = np.array([self._link_radius(l) for l in links], dtype=float)
+        self._sync_poses(rebuild=True)
+        self._scene_dirty = False
+
+    def _link_radius(self, link):
+        r = 0.0
+        for key in GeometryCache.keys_for(link):
+            if key is None: continue
+            (kind, *rest), scale = key
+            if kind == 'mesh':
+                if rest[0] not in self._mesh_radius:
+                    ready, data = self.mesh_cache.request(rest[0])
+                    if not ready: continue      # re-synced when it arrives
+                    self._mesh_radius[rest[0]] = float(np.sqrt((data[:, :3] ** 2).sum(axis=1).max())) if data is not None and len(data) else 0.0
+                r = max(r, bounding_radius('mesh', scale, self._mesh_radius[rest[0]]))
+            else:
+                r = max(r, bounding_radius(rest[0], rest[1]))
+        return r
+
+    def _sync_poses(self, rebuild=False):
+        """Refresh world poses from forward kinematics; geometry buffers are left alone."""
+        links = self._links
+        frames_at = self.kinematics.world_poses([l.name for l in links])
+        poses = self.kinematics.visual_poses(links)
+        self._centers = poses[:, :3, 3] if len(links) else np.zeros((0, 3))
+        self._cull_key = None
+        if self.active_mode == 'instanced':
+            if rebuild: self.instanced.sync(links, poses)
+            else: self.instanced.update_poses(poses)
+        else:
+            cols = np.ascontiguousarray(np.transpose(poses, (0, 2, 1)), dtype=np.float32).reshape(-1, 16)
+            self._draw_items = []
+            for l, pose, col in zip(links, poses, cols):
+                (vkey, vscale), ckey = self.geometry.link_keys[l.name]
+                # mesh files are shared unscaled: fold the scale into the pose
+                vcol = col if vscale is None else self._scaled(pose, vscale)
+                if ckey is None: self._draw_items.append((vcol, vkey, None, None)); continue
+                ckey, cscale = ckey
+                self._draw_items.append((vcol, vkey, col if cscale is None else self._scaled(pose, cscale), ckey))
+        # link (joint) frame axes, pre-transformed so they all go out in a single draw
+        if not links:
+            if self._frames is not None: self._frames.release()
+            self._frames = None
+        else:
+            frames = np.zeros((len(links), 3, 2, 6))
+            frames[:, :, 0, :3] = frames_at[:, None, :3, 3]
+            frames[:, :, 1, :3] = frames_at[:, None, :3, 3] + 0.25 * np.transpose(frames_at[:, :3, :3], (0, 2, 1))
+            frames[:, :, :, 3:] = np.identity(3)[None, :, None, :]
+            if self._frames is None: self._frames = GLMesh(frames.reshape(-1, 6), GL_LINES, 'color', bool(glGenBuffers))
+            else: self._frames.update(frames.reshape(-1, 6))
+        self._poses_dirty = False
+
+    def _cull(self):
+        """Recompute visible links and their levels when the camera, viewport or poses changed."""
+        mv = glGetFloatv(GL_MODELVIEW_MATRIX); proj = glGetFloatv(GL_PROJECTION_MATRIX)
+        height = self.viewport_height()
+        key = (np.asarray(mv).tobytes(), np.asarray(proj).tobytes(), height, self.culling, self.lod)
+        if key == self._cull_key: return
+        self._cull_key = key
+        n = len(self._links)
+        visible, levels = cull_and_lod(self._centers, self._radii, mv, proj, height)
+        if not self.culling: visible = np.ones(n, bool)
+        if not self.lod: levels = np.full(n, DEFAULT_LOD)
+        self._visible = visible; self._levels = levels
+        if self.active_mode == 'instanced': self.instanced.cull(visible, levels)
+        drawn = int(visible.sum())
+        self.stats = {'links': n, 'drawn': drawn, 'culled': n - drawn}
+
+    @staticmethod
+    def _scaled(pose, scale):
+        m = np.array(pose, dtype=float); m[:3, :3] *= scale
+        return np.ascontiguousarray(m.T, dtype=np.float32).reshape(16)
+
+    def release_gl(self):
+        """Free every GL object; the context they were made in must be current."""
+        self.geometry.release()
+        self.instanced.release()
+        self.highlight_geometry.release()
+        for mesh in (self._grid, self._frames):
+            if mesh is not None: mesh.release()
+        self._grid = None; self._frames = None
+        self.active_mode = None
+        self._scene_dirty = True
+
+    def render_scene(self):
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glLoadIdentity()
+        # GL transforms the light by the current modelview: set it in eye space every frame,
+        # not once under whatever matrix an earlier frame (or model) left behind
+        glLightfv(GL_LIGHT0, GL_POSITION, [5,5,10,1])
+        # camera transform: pan -> zoom -> rotate (orbit-like)
+        glTranslatef(self.pan_x, self.pan_y, self.zoom)
+        glRotatef(self.rot_x, 1.0, 0.0, 0.0)
+        glRotatef(self.rot_y, 0.0, 1.0, 0.0)
+        glTranslatef(-self.target[0], -self.target[1], -self.target[2])
+
+        if self.active_mode is None:
+            self._resolve_mode()
+            self._scene_dirty = True
+        if self._scene_dirty:
+            self._sync_scene()
+        elif self._poses_dirty:
+            self._sync_poses()
+        self._cull()
+
+        # simple grid ground + local frame axes of every link
+        glDisable(GL_LIGHTING)
+        glLineWidth(1.0)
+        self._grid.draw()
+        if self._frames is not None:
+            glLineWidth(2.0)
+            self._frames.draw()
+        glEnable(GL_LIGHTING)
+
+        if self.active_mode == 'instanced':
+            self.instanced.draw('visual', VISUAL_COLOR, lighting=True)
+            glEnable(GL_BLEND)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            self.instanced.draw('collision', COLLISION_COLOR, lighting=False)
+            glDisable(GL_BLEND)
+            self._draw_highlight()
+            return
+
+        # fixed-function fallback: draw each visible link at its world pose and level
+        mesh = self.geometry.mesh
+        items = [(self._draw_items[i], level) for i, level in
+                 zip(np.flatnonzero(self._visible).tolist(), self._levels[self._visible].tolist())]
+        glColor3f(*VISUAL_COLOR)
+        glEnable(GL_NORMALIZE)      # scaled mesh files
+        for (pose, vkey, _, _), level in items:
+            m = mesh(vkey, level)
+            if m is None: continue     # mesh file still loading
+            glPushMatrix(); glMultMatrixf(pose)
+            m.draw()
+            glPopMatrix()
+        glDisable(GL_NORMALIZE)
+
+        # Collision (if enabled) drawn as translucent overlay after all opaque geometry
+        overlays = [(pose, mesh(ckey, level)) for (_, _, pose, ckey), level in items if ckey is not None]
+        overlays = [(pose, m) for pose, m in overlays if m is not None]
+        if overlays:
+            glEnable(GL_BLEND)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            glDisable(GL_LIGHTING)
+            glColor4f(*COLLISION_COLOR)
+            for pose, m in overlays:
+                glPushMatrix(); glMultMatrixf(pose)
+                m.draw()
+                glPopMatrix()
+            glEnable(GL_LIGHTING)
+            glDisable(GL_BLEND)
+        self._draw_highlight()
+
+    def frame_counts(self):
+        """(draw calls, vertices) of the last render_scene(); the context must be current."""
+        calls = vertices = 0
+        meshes = [m for m in (self._grid, self._frames) if m is not None]
+        if self.active_mode == 'instanced':
+            calls, vertices = self.instanced.frame_counts()
+        elif self._visible is not None:
+            mesh = self.geometry.mesh
+            for i, level in zip(np.flatnonzero(self._visible).tolist(), self._levels[self._visible].tolist()):
+                _, vkey, _, ckey = self._draw_items[i]
+                meshes.append(mesh(vkey, level))
+                if ckey is not None: meshes.append(mesh(ckey, level))
+        for name in self.highlighted:
+            keys = self.highlight_geometry.link_keys.get(name)
+            if keys: meshes.append(self.highlight_geometry.meshes.get((keys[1] or keys[0])[0]))
+        meshes = [m for m in meshes if m is not None]
+        return calls + len(meshes), vertices + sum(m.count for m in meshes)
+
+    def _draw_highlight(self):
+        # collision shape (visual if it has none) of each marked link, over everything else
+        links = [self.model.links[n] for n in self.highlighted if n in self.model.links]
+        if not links: return
+        geometry = self.highlight_geometry
+        geometry.sync(links)
+        glDisable(GL_DEPTH_TEST); glDisable(GL_LIGHTING)
+        glEnable(GL_BLEND); glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glColor4f(*HIGHLIGHT_COLOR)
+        for link, pose in zip(links, self.kinematics.visual_poses(links)):
+            vkey, ckey = geometry.link_keys[link.name]
+            key, scale = ckey or vkey
+            mesh = geometry.meshes.get(key)
+            if mesh is None: continue
+            glPushMatrix()
+            glMultMatrixf(np.ascontiguousarray(pose.T, dtype=np.float32).reshape(16) if scale is None else self._scaled(pose, scale))
+            mesh.draw()
+            glPopMatrix()
+        glDisable(GL_BLEND)
+        glEnable(GL_LIGHTING); glEnable(GL_DEPTH_TEST)
+
+
+# ----------------------- GL Viewer (QOpenGLWidget) -----------------------
+class GLWidget(QOpenGLWidget, SceneRenderer):
+    mesh_loaded = pyqtSignal(str)     # emitted from MeshCache worker threads, delivered queued
+    link_picked = pyqtSignal(str)     # a link was clicked (press and release without dragging)
+    render_mode_error = pyqtSignal(str)   # SceneRenderer.mode_error changed; '' when cleared
+
+    def __init__(self, model, render_mode='auto'):
+        fmt = QSurfaceFormat()
+        fmt.setDepthBufferSize(24)
+        # 3.3 compatibility keeps the fixed-function calls valid alongside the instancing shaders;
+        # drivers without it hand back an older context and we fall back to the fixed path
+        fmt.setVersion(3, 3)
+        fmt.setProfile(QSurfaceFormat.CompatibilityProfile)
+        QSurfaceFormat.setDefaultFormat(fmt)
+        super().__init__()
+        self._init_scene(model, render_mode)
+        self.last_pos = None; self.press_pos = None
+        self.overlay = None     # QLabel with frame time/draw calls/vertices, see set_overlay
+        self.mesh_loaded.connect(self._on_mesh_loaded)
+        self.mesh_cache.subscribe(self.mesh_loaded.emit)
+
+    def initializeGL(self):
+        self.setup_gl()
+        self.context().aboutToBeDestroyed.connect(self._release_gl)
+
+    def resizeGL(self, w, h):
+        self.set_projection(w, h)
+
+    def viewport_height(self):
+        return self.height() * self.devicePixelRatioF()
+
+    def model_changed(self):
+        """Mark cached geometry/poses stale after a model edit; camera-only repaints skip this."""
+        self._scene_dirty = True
+        self.update()
+
+    def _on_mesh_loaded(self, filename):
+        if filename in self.geometry.waiting or filename in self.instanced.waiting:
+            self.model_changed()
+
+    def poses_changed(self):
+        """Joint values moved: re-upload transforms on the next paint, keep geometry."""
+        self._poses_dirty = True
+        self.update()
+
+    def set_render_mode(self, mode):
+        SceneRenderer.set_render_mode(self, mode)
+        self.update()
+
+    def mode_error_changed(self, error):
+        self.render_mode_error.emit(error or "")
+
+    def set_highlight(self, names):
+        if SceneRenderer.set_highlight(self, names): self.update()
+
+    def _release_gl(self):
+        self.makeCurrent()
+        self.release_gl()
+        self.doneCurrent()
+
+    def set_overlay(self, on):
+        """Show the profiler's frame statistics in the corner of the view."""
+        if on and self.overlay is None:
+            self.overlay = QLabel(self)
+            self.overlay.setStyleSheet("background: rgba(0, 0, 0, 150); color: white; padding: 3px; font-family: monospace;")
+            self.overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+            self.overlay.move(6, 6)
+        if self.overlay is not None: self.overlay.setVisible(on)
+        self.update()
+
+    def paintGL(self):
+        if not profiler.active:
+            self.render_scene(); return
+        t0 = time.perf_counter()
+        self._paint()
+        frame = time.perf_counter() - t0
+        calls, vertices = self.frame_counts()
+        profiler.count('frame', draw_calls=calls, vertices=vertices, drawn=self.stats['drawn'])
+        if self.overlay is not None and not self.overlay.isHidden():
+            self.overlay.setText(f"frame {frame * 1000:.1f} ms  draw calls {calls}  vertices {vertices:,}\n"
+                                 f"links {self.stats['links']}  drawn {self.stats['drawn']}  culled {self.stats['culled']}")
+            self.overlay.adjustSize()
+
+    @profiled('GLWidget.paintGL')
+    def _paint(self):
+        self.render_scene()
+
+    def mousePressEvent(self, ev):
+        self.last_pos = ev.pos(); self.press_pos = ev.pos()
+
+    def mouseReleaseEvent(self, ev):
+        # a click, not the end of an orbit drag
+        if ev.button() == Qt.LeftButton and self.press_pos is not None \
+                and (ev.pos() - self.press_pos).manhattanLength() <= 3:
+            name = self.pick(ev.x(), ev.y())
+            if name: self.link_picked.emit(name)
+        self.press_pos = None
+
+    def mouseMoveEvent(self, ev):
+        if not self.last_pos:
+            self.last_pos = ev.pos(); return
+        dx = ev.x() - self.last_pos.x(); dy = ev.y() - self.last_pos.y()
+        buttons = ev.buttons()
+        if buttons & Qt.LeftButton:
+            self.rot_x += dy * 0.5
+            self.rot_y += dx * 0.5
+        elif buttons & Qt.RightButton:
+            self.pan_x += dx * 0.01; self.pan_y -= dy * 0.01
+        self.last_pos = ev.pos()
+        self.update()
+
+    def wheelEvent(self, ev):
+        self.zoom += ev.angleDelta().y() / 120.0 * 0.3
+        self.update()
+
+# ----------------------- Offscreen (thumbnails) -----------------------
+class OffscreenRenderer(SceneRenderer):
+    """Draws the model into a framebuffer object of the current GL context and reads it back.
+
+    urdf_render supplies the context (EGL, OSMesa or a Qt offscreen surface). Mesh files
+    are loaded synchronously first, so no image is taken while a mesh is still loading.
+    """
+    def __init__(self, model, render_mode='auto', mesh_cache=None):
+        self._init_scene(model, render_mode, mesh_cache)
+        self._fbo = None    # (width, height, framebuffer, color renderbuffer, depth renderbuffer)
+        self.setup_gl()
+
+    def _bind_target(self, width, height):
+        if self._fbo is not None and self._fbo[:2] == (width, height):
+            glBindFramebuffer(GL_FRAMEBUFFER, self._fbo[2]); return
+        self._release_fbo()
+        fbo = glGenFramebuffers(1); color, depth = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, color); glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, depth); glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, depth)
+        self._fbo = (width, height, fbo, color, depth)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"offscreen framebuffer {width}x{height} is incomplete")
+
+    def _release_fbo(self):
+        if self._fbo is None: return
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glDeleteRenderbuffers(2, list(self._fbo[3:])); glDeleteFramebuffers(1, [self._fbo[2]])
+        self._fbo = None
+
+    def _load_meshes(self):
+        for link in self.model.links.values():
+            for filename in (link.mesh, link.collision_mesh):
+                if filename: self.mesh_cache.get(filename)
+
+    def frame_model(self, aspect, margin=1.1):
+        """Point the camera at the bounding sphere of all links; -> (near, far) planes for it."""
+        if self.active_mode is None: self._resolve_mode(); self._scene_dirty = True
+        if self._scene_dirty: self._sync_scene()
+        c, r = self._centers, self._radii
+        if len(c):
+            lo = (c - r[:, None]).min(axis=0); hi = (c + r[:, None]).max(axis=0)
+            center = (lo + hi) / 2
+            radius = float((np.sqrt(((c - center) ** 2).sum(axis=1)) + r).max())
+        else:
+            center = np.zeros(3); radius = 0.0
+        radius = max(radius, 0.25)
+        half = np.radians(FOV_Y) / 2
+        half = min(half, np.arctan(np.tan(half) * aspect))     # portrait: the width is the limit
+        distance = radius * margin / np.sin(half)
+        self.target = tuple(float(v) for v in center)
+        self.pan_x = self.pan_y = 0.0; self.zoom = -distance
+        # far enough for the ground grid (6 m in x/y around the origin) behind the model
+        far = distance + radius + float(np.linalg.norm(center)) + 8.5
+        return max(distance - radius * 1.5, distance * 1e-3), far
+
+    def render_views(self, views, width, height, fit=True):
+        """(height, width, 3) uint8 RGB images of the model, one per (rot_x, rot_y) in views."""
+        self._load_meshes()
+        self._bind_target(width, height)
+        try:
+            near, far = self.frame_model(width / height) if fit else (0.1, 100.0)
+            self.set_projection(width, height, near, far)
+            glPixelStorei(GL_PACK_ALIGNMENT, 1)
+            images = []
+            for rot_x, rot_y in views:
+                self.rot_x, self.rot_y = rot_x, rot_y
+                self.render_scene()
+                data = glReadPixels(0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE)
+                # GL rows start at the bottom
+                images.append(np.frombuffer(data, np.uint8).reshape(height, width, 3)[::-1].copy())
+        finally:
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        return images
+
+    def release_gl(self):
+        SceneRenderer.release_gl(self)
+        self._release_fbo()